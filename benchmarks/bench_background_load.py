@@ -0,0 +1,145 @@
+"""
+Load a diagram file into a shown view synchronously (parse, then create every
+item) and with SceneLoader (parse on a worker thread, then create items in
+time slices), and report the time to the first paint showing diagram items,
+the total load time and the longest time the event loop was blocked.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_background_load
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QEvent, QEventLoop, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from models.diagram import Diagram
+from export.renderer import build_scene, ensure_application
+from views.diagram_view import DiagramView
+from views.scene_loader import SceneLoader
+from benchmarks.synthetic import make_diagram
+
+
+class _LoadMonitor(QObject):
+    """
+    Event filter noting the first paint with items in the scene, and a
+    heartbeat timer measuring the longest gap between event loop passes.
+    """
+    
+    def __init__(self, scene):
+        super().__init__()
+        self.scene = scene
+        self.start = 0.0
+        self.first_paint = None
+        self.longest_stall = 0.0
+        self._last_beat = 0.0
+        self._heartbeat = QTimer()
+        self._heartbeat.setInterval(1)
+        self._heartbeat.timeout.connect(self._beat)
+    
+    def begin(self):
+        self.start = self._last_beat = time.perf_counter()
+        self.first_paint = None
+        self.longest_stall = 0.0
+        self._heartbeat.start()
+    
+    def end(self):
+        self._beat()
+        self._heartbeat.stop()
+    
+    def _beat(self):
+        now = time.perf_counter()
+        self.longest_stall = max(self.longest_stall, now - self._last_beat)
+        self._last_beat = now
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and self.first_paint is None and \
+                self.start and self.scene.show_center and self.scene.diagram.swimlanes:
+            self.first_paint = time.perf_counter() - self.start
+        return False
+
+
+def _setup():
+    """
+    Show an empty scene in a view; return (scene, view, monitor).
+    """
+    scene = build_scene(Diagram())
+    view = DiagramView(scene)
+    view.resize(800, 800)
+    view.show()
+    QApplication.processEvents()
+    monitor = _LoadMonitor(scene)
+    view.viewport().installEventFilter(monitor)
+    return scene, view, monitor
+
+
+def _wait_for_paint(monitor, timeout=5.0):
+    """
+    Run the event loop until the monitor has seen a paint with items.
+    """
+    deadline = time.perf_counter() + timeout
+    while monitor.first_paint is None and time.perf_counter() < deadline:
+        QApplication.processEvents(QEventLoop.AllEvents, 10)
+
+
+def load_synchronously(path):
+    """
+    Parse and build every item on the GUI thread, as the main window used to.
+    """
+    scene, view, monitor = _setup()
+    monitor.begin()
+    diagram = Diagram.load_from_file(path)
+    scene.reset(diagram)
+    scene.init_scene()
+    total = time.perf_counter() - monitor.start
+    monitor._beat()
+    _wait_for_paint(monitor)
+    monitor.end()
+    view.close()
+    return monitor.first_paint, total, monitor.longest_stall
+
+
+def load_in_background(path, slice_time=SceneLoader.DEFAULT_SLICE_TIME):
+    """
+    Load with SceneLoader and run the event loop until it finishes.
+    """
+    scene, view, monitor = _setup()
+    loader = SceneLoader(scene, slice_time=slice_time)
+    loop = QEventLoop()
+    loader.finished.connect(loop.quit)
+    loader.failed.connect(loop.quit)
+    monitor.begin()
+    loader.load(path)
+    loop.exec_()
+    total = time.perf_counter() - monitor.start
+    _wait_for_paint(monitor)
+    monitor.end()
+    view.close()
+    return monitor.first_paint, total, monitor.longest_stall, loader.timings
+
+
+def main(sizes=((36, 1000, 100), (72, 5000, 500), (144, 10000, 1000))):
+    ensure_application()
+    with tempfile.TemporaryDirectory() as directory:
+        for swimlanes, outcomes, blobs in sizes:
+            path = os.path.join(directory, 'diagram.json')
+            make_diagram(swimlanes, outcomes, blobs).save_to_file(path, fsync=False)
+            print(f"{swimlanes} swimlanes, {outcomes} outcomes, {blobs} blobs")
+            
+            first_paint, total, stall = load_synchronously(path)
+            print(f"  synchronous  first paint {first_paint * 1000:8.1f} ms  total {total * 1000:8.1f} ms"
+                  f"  longest stall {stall * 1000:8.1f} ms")
+            first_paint, total, stall, timings = load_in_background(path)
+            print(f"  SceneLoader  first paint {first_paint * 1000:8.1f} ms  total {total * 1000:8.1f} ms"
+                  f"  longest stall {stall * 1000:8.1f} ms  (parsed after {timings['parsed'] * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
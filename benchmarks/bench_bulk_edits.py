@@ -0,0 +1,135 @@
+"""
+Recolor 500 items, delete 400 blobs and spread 36 swimlanes evenly, once with
+one command per item and once as a single BatchCommand, and report the time
+to make the changes and to repaint the view afterwards, the undo entries, the
+viewport paint events and the background invalidations.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_bulk_edits
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QObject, QEvent
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication
+
+from commands.swimlane_commands import RotateSwimlaneCommand
+from export.renderer import build_scene, ensure_application
+from views.diagram_view import DiagramView
+from benchmarks.synthetic import make_diagram
+
+
+class _PaintCounter(QObject):
+    """
+    Event filter counting paint events.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.paints = 0
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.paints += 1
+        return False
+
+
+def _setup():
+    """
+    Build a scene shown in a view; return (scene, view, paint counter, invalidation counter).
+    """
+    diagram = make_diagram(swimlanes=36, outcomes=500, blobs=464)
+    scene = build_scene(diagram)
+    # Synthetic swimlanes are evenly spaced; unsettle them
+    rng = random.Random(1)
+    for swimlane in diagram.swimlanes.values():
+        swimlane.item.set_geometry(swimlane.angle + rng.uniform(-4, 4))
+    view = DiagramView(scene)
+    view.resize(800, 800)
+    view.show()
+    QApplication.processEvents()
+    
+    counter = _PaintCounter()
+    view.viewport().installEventFilter(counter)
+    invalidations = [0]
+    invalidate = scene.invalidate
+    
+    def counted_invalidate(*args):
+        invalidations[0] += 1
+        invalidate(*args)
+    
+    scene.invalidate = counted_invalidate
+    return scene, view, counter, invalidations
+
+
+def _run(edit, batched):
+    """
+    Apply one bulk edit; return (edit seconds, repaint seconds, undo entries,
+    paint events, invalidations).
+    """
+    scene, view, counter, invalidations = _setup()
+    start_count = scene.undo_stack.count()
+    start = time.perf_counter()
+    edit(scene, batched)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    QApplication.processEvents()
+    repaint = time.perf_counter() - start
+    result = (elapsed, repaint, scene.undo_stack.count() - start_count, counter.paints, invalidations[0])
+    view.close()
+    return result
+
+
+def _recolor(scene, batched):
+    items = [swimlane.item for swimlane in scene.diagram.swimlanes.values()]
+    items += [blob.polygon_item for blob in scene.diagram.blobs]
+    color = QColor('#8e44ad')
+    if batched:
+        scene.change_items_color(items, color)
+    else:
+        for item in items:
+            scene.change_item_color(item, color)
+
+
+def _delete(scene, batched):
+    items = [blob.polygon_item for blob in scene.diagram.blobs[:400]]
+    if batched:
+        scene.delete_blobs(items)
+    else:
+        for item in items:
+            scene.delete_blob(item)
+
+
+def _distribute(scene, batched):
+    if batched:
+        scene.distribute_swimlanes()
+        return
+    swimlanes = sorted(scene.diagram.swimlanes.values(), key=lambda swimlane: swimlane.angle)
+    step = 360.0 / len(swimlanes)
+    for index, swimlane in enumerate(swimlanes):
+        new_angle = (swimlanes[0].angle + index * step) % 360
+        scene.undo_stack.push(RotateSwimlaneCommand(swimlane.item, swimlane.angle, new_angle))
+
+
+def main():
+    ensure_application()
+    for name, edit in (("recolor 500 items", _recolor), ("delete 400 blobs", _delete),
+                       ("distribute 36 swimlanes", _distribute)):
+        print(name)
+        for label, batched in (("command per item", False), ("BatchCommand", True)):
+            elapsed, repaint, entries, paints, invalidations = _run(edit, batched)
+            print(f"  {label:18s} {elapsed * 1000:8.1f} ms edit  {repaint * 1000:6.1f} ms repaint  "
+                  f"{entries:4d} undo entries  "
+                  f"{paints:3d} paints  {invalidations:4d} background invalidations")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Compare the object and columnar Diagram backends: parity of the public API
+on the same edits, and the time to compute every outcome position.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_columnar
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import QPointF
+
+from models.diagram import diagram_class
+from models.outcome import Outcome
+from benchmarks.synthetic import make_diagram
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _same_positions(a, b):
+    return a.keys() == b.keys() and all(
+        math.isclose(a[k][0], b[k][0], abs_tol=1e-9) and math.isclose(a[k][1], b[k][1], abs_tol=1e-9)
+        for k in a)
+
+
+def _edit(diagram, rng):
+    """
+    Apply the same sequence of edits through the public API.
+    """
+    swimlane_ids = sorted(diagram.swimlanes)
+    outcome_ids = sorted(diagram.outcomes)
+    for outcome_id in outcome_ids[::7]:
+        outcome = diagram.get_outcome_by_id(outcome_id)
+        diagram.move_outcome(outcome, rng.choice(swimlane_ids), rng.uniform(20, 400))
+    for outcome_id in outcome_ids[::11]:
+        diagram.remove_outcome(outcome_id)
+    diagram.remove_swimlane(swimlane_ids[0])
+    for swimlane in list(diagram.swimlanes.values())[::3]:
+        swimlane.angle = (swimlane.angle + 5) % 360
+        swimlane.length += 10
+    added = diagram.add_outcome(swimlane_ids[1], 123.0, "Added")
+    diagram.add_outcome(Outcome(swimlane_ids[2], 77.5, "Added object", id=10 ** 9))
+    diagram.center = QPointF(10, -20)
+    return added
+
+
+def check_parity(source, directory):
+    """
+    Check that both backends give identical results for the same data and edits.
+    
+    Returns:
+        bool: True if the backends agree
+    """
+    path = os.path.join(directory, 'parity.json')
+    source.save_to_file(path)
+    
+    results = []
+    for storage in ('objects', 'columnar'):
+        diagram = diagram_class(storage).load_from_file(path)
+        added = _edit(diagram, random.Random(7))
+        problems = diagram.check_consistency()
+        if problems:
+            print(f"  {storage}: {problems[:3]}")
+            return False
+        # IDs are generated globally, so the two runs give the added outcome different ones
+        data = diagram.to_dict()
+        for outcome in data['outcomes']:
+            if outcome['id'] == added.id:
+                outcome['id'] = None
+        positions = diagram.outcome_positions()
+        positions[None] = positions.pop(added.id)
+        results.append((data, positions))
+    
+    (dict_a, positions_a), (dict_b, positions_b) = results
+    ok = dict_a == dict_b and _same_positions(positions_a, positions_b)
+    print(f"  parity: {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+
+def main(sizes=((36, 1000), (72, 10000), (144, 100000))):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        ok = check_parity(make_diagram(24, 2000, 0), directory)
+        
+        for swimlanes, outcomes in sizes:
+            data = make_diagram(swimlanes, outcomes, 0).to_dict()
+            print(f"{swimlanes} swimlanes, {outcomes} outcomes")
+            for storage in ('objects', 'columnar'):
+                diagram = diagram_class(storage).from_dict(data)
+                _, elapsed = _timed(diagram.outcome_positions)
+                print(f"  {storage:8s} outcome_positions {elapsed * 1000:8.1f} ms")
+            _, elapsed = _timed(diagram.outcome_position_arrays)
+            diagram.center = QPointF(1, 1)
+            _, elapsed = _timed(diagram.outcome_position_arrays)
+            print(f"  columnar outcome_position_arrays {elapsed * 1000:8.1f} ms")
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
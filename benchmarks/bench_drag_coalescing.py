@@ -0,0 +1,114 @@
+"""
+Drag a swimlane's resize handle with bursts of synthetic mouse moves, applying
+every event directly versus coalescing them into one update per frame, and
+report events received versus layout passes run.
+
+Label layout is on. During a drag, labels take their preferred position and
+are placed properly once on release (LabelLayout.begin_drag); the last row
+places them every frame instead, for comparison. The time the release takes
+is reported separately.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_drag_coalescing
+"""
+
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt, QPointF
+
+from export.renderer import build_scene, ensure_application
+from benchmarks.synthetic import make_diagram
+
+
+class _MouseEvent:
+    """
+    Left-button mouse event at a scene position (QGraphicsSceneMouseEvent
+    cannot be created from Python).
+    """
+    
+    def __init__(self, scene_pos):
+        self._pos = QPointF(scene_pos)
+    
+    def scenePos(self):
+        return self._pos
+    
+    def pos(self):
+        return self._pos
+    
+    def button(self):
+        return Qt.LeftButton
+    
+    def buttons(self):
+        return Qt.LeftButton
+    
+    def accept(self):
+        pass
+    
+    def ignore(self):
+        pass
+
+
+def _drag(scene, handle, frames, events_per_frame, coalesce, place_labels=False):
+    """
+    Sweep the handle through a quarter turn; return (seconds for the moves,
+    seconds for the release, coalescer stats).
+    """
+    swimlane = handle.parent_item
+    center = swimlane.line().p1()
+    length = swimlane.line().length()
+    start_angle = math.radians(swimlane.swimlane.angle)
+    coalescer = scene.update_coalescer
+    coalescer.reset_stats()
+    
+    handle.mousePressEvent(_MouseEvent(swimlane.line().p2()))
+    if place_labels:
+        # Leave the drag mode the press started
+        scene.label_layout.end_drag()
+    start = time.perf_counter()
+    step = 0
+    total = frames * events_per_frame
+    for _ in range(frames):
+        for _ in range(events_per_frame):
+            step += 1
+            angle = start_angle + math.pi / 2 * step / total
+            pos = QPointF(center.x() + length * math.cos(angle), center.y() + length * math.sin(angle))
+            handle.mouseMoveEvent(_MouseEvent(pos))
+            if not coalesce:
+                coalescer.flush()
+        # One frame: the event loop runs the pending updates
+        QApplication.processEvents()
+    moved = time.perf_counter()
+    if place_labels:
+        scene.label_layout.begin_drag()
+    handle.mouseReleaseEvent(_MouseEvent(pos))
+    return moved - start, time.perf_counter() - moved, coalescer.stats()
+
+
+def main(frames=60, events_per_frame=8):
+    ensure_application()
+    diagram = make_diagram(swimlanes=36, outcomes=1000, blobs=0)
+    scene = build_scene(diagram)
+    swimlane = next(iter(diagram.swimlanes.values()))
+    handle = swimlane.item.resize_handle
+    outcomes = len(diagram.get_outcomes_for_swimlane(swimlane.id))
+    print(f"{frames} frames x {events_per_frame} mouse moves, swimlane with {outcomes} outcomes")
+    
+    for name, coalesce, place_labels in (("every event", False, False), ("coalesced", True, False),
+                                         ("coalesced, labels placed every frame", True, True)):
+        elapsed, release, stats = _drag(scene, handle, frames, events_per_frame, coalesce, place_labels)
+        print(f"  {name:37s} {stats['events']:4d} events  {stats['passes']:4d} passes  "
+              f"{elapsed * 1000:8.1f} ms  ({elapsed / frames * 1000:6.2f} ms per frame)  "
+              f"release {release * 1000:6.1f} ms")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
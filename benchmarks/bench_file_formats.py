@@ -0,0 +1,87 @@
+"""
+Compare the JSON and binary diagram formats: file size, save/load time, and
+round-trip equivalence of the binary path against the JSON path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_file_formats
+"""
+
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+from models.diagram import Diagram
+from benchmarks.synthetic import make_diagram
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _close(a, b, rel_tol):
+    """
+    Compare two to_dict() structures, allowing float differences up to rel_tol.
+    """
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k], rel_tol) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_close(x, y, rel_tol) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=rel_tol, abs_tol=rel_tol)
+    return a == b
+
+
+def check_round_trip(diagram, directory):
+    """
+    Check that the binary format loads back to the same diagram as JSON.
+    
+    Returns:
+        bool: True if both float64 and float32 files match the JSON result
+    """
+    json_path = os.path.join(directory, 'roundtrip.json')
+    diagram.save_to_file(json_path)
+    expected = Diagram.load_from_file(json_path).to_dict()
+    
+    ok = True
+    for precision, tolerance in (('float64', 0), ('float32', 1e-6)):
+        path = os.path.join(directory, f'roundtrip_{precision}.rdgb')
+        diagram.save_to_file(path, precision=precision)
+        actual = Diagram.load_from_file(path).to_dict()
+        same = actual == expected if tolerance == 0 else _close(actual, expected, tolerance)
+        print(f"  round trip {precision:8s}: {'OK' if same else 'MISMATCH'}")
+        ok = ok and same
+    return ok
+
+
+def main(sizes=((36, 1000, 100), (72, 10000, 1000), (144, 50000, 5000))):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        for swimlanes, outcomes, blobs in sizes:
+            diagram = make_diagram(swimlanes, outcomes, blobs)
+            print(f"{swimlanes} swimlanes, {outcomes} outcomes, {blobs} blobs x 40 points")
+            ok = check_round_trip(diagram, directory) and ok
+            
+            for name, format, precision in (('json', 'json', 'float64'),
+                                            ('binary f64', 'binary', 'float64'),
+                                            ('binary f32', 'binary', 'float32')):
+                path = os.path.join(directory, 'bench.' + format)
+                _, save_time = _timed(diagram.save_to_file, path, format=format, precision=precision)
+                _, load_time = _timed(Diagram.load_from_file, path)
+                size = os.path.getsize(path)
+                print(f"  {name:11s} {size / 1024:10.1f} KiB  save {save_time * 1000:8.1f} ms"
+                      f"  load {load_time * 1000:8.1f} ms")
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Compare the per-point geometry functions in utils.geometry with their batch
+variants (numpy and pure-Python paths) at several sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_geometry
+"""
+
+import math
+import random
+import sys
+import time
+
+from PyQt5.QtCore import QPointF
+
+from utils.geometry import (calculate_point_on_line, distance_point_to_line, calculate_arc_points,
+                            calculate_points_on_lines, distances_points_to_line,
+                            calculate_arc_points_between, np)
+
+
+def _best_time(fn, repeat=5):
+    """
+    Return the best of several runs of fn, in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _report(name, count, timings):
+    cells = "  ".join(f"{label} {count / t / 1e6:7.2f} M/s" for label, t in timings)
+    print(f"  {name:18s} {cells}")
+
+
+def _check(expected, actual):
+    """
+    Check batch results against the per-point results.
+    """
+    for e, a in zip(expected, actual):
+        if isinstance(e, QPointF):
+            e = (e.x(), e.y())
+        if isinstance(e, tuple):
+            assert math.isclose(e[0], a[0], abs_tol=1e-9) and math.isclose(e[1], a[1], abs_tol=1e-9), (e, a)
+        else:
+            assert math.isclose(e, a, abs_tol=1e-9), (e, a)
+
+
+def main(sizes=(10, 1000, 100000)):
+    rng = random.Random(1)
+    center = QPointF(400, 300)
+    line_start, line_end = QPointF(-100, 20), QPointF(250, 180)
+    paths = [('loop', None), ('python', False)]
+    if np is not None:
+        paths.append(('numpy', True))
+    
+    for count in sizes:
+        angles = [rng.uniform(0, 2 * math.pi) for _ in range(count)]
+        distances = [rng.uniform(0, 500) for _ in range(count)]
+        points = [(rng.uniform(-500, 500), rng.uniform(-500, 500)) for _ in range(count)]
+        qpoints = [QPointF(x, y) for x, y in points]
+        arrays = {True: (np.array(angles), np.array(distances), np.array(points))} if np is not None else {}
+        print(f"{count} points")
+        
+        # Points on lines
+        expected = [calculate_point_on_line(center, a, d) for a, d in zip(angles, distances)]
+        timings = []
+        for label, use_numpy in paths:
+            if use_numpy is None:
+                fn = lambda: [calculate_point_on_line(center, a, d) for a, d in zip(angles, distances)]
+            else:
+                a, d = arrays[True][:2] if use_numpy else (angles, distances)
+                fn = lambda a=a, d=d, u=use_numpy: calculate_points_on_lines(center, a, d, use_numpy=u)
+                _check(expected, fn())
+            timings.append((label, _best_time(fn)))
+        _report("points on lines", count, timings)
+        
+        # Distances to a segment
+        expected = [distance_point_to_line(p, line_start, line_end) for p in qpoints]
+        timings = []
+        for label, use_numpy in paths:
+            if use_numpy is None:
+                fn = lambda: [distance_point_to_line(p, line_start, line_end) for p in qpoints]
+            else:
+                pts = arrays[True][2] if use_numpy else points
+                fn = lambda pts=pts, u=use_numpy: distances_points_to_line(pts, line_start, line_end, use_numpy=u)
+                _check(expected, fn())
+            timings.append((label, _best_time(fn)))
+        _report("distances to line", count, timings)
+        
+        # One arc of count points
+        start_point, end_point = QPointF(500, 300), QPointF(400, 150)
+        expected = calculate_arc_points(center, start_point, end_point, count)
+        timings = []
+        for label, use_numpy in paths:
+            if use_numpy is None:
+                fn = lambda: calculate_arc_points(center, start_point, end_point, count)
+            else:
+                fn = lambda u=use_numpy: calculate_arc_points_between(center, start_point, end_point, count, use_numpy=u)
+                _check(expected, fn())
+            timings.append((label, _best_time(fn)))
+        _report("arc points", count, timings)
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
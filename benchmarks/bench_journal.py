@@ -0,0 +1,121 @@
+"""
+Record an editing session (swimlane rotations and recolors, outcome moves,
+blob recolors, additions and removals) to the autosave journal and compare:
+
+- the GUI thread time per edit of journaling against saving the whole file;
+- recovering from the journal (snapshot load + replay) against a full
+  Diagram.load_from_file of the same diagram, and the replay throughput.
+
+Recovery is checked to rebuild the edited diagram exactly.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_journal
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from models.diagram import Diagram
+from models.journal import SNAPSHOT_SUFFIX, DiagramJournal, apply_record, read_records, recover
+from models.scope_blob import ScopeBlob
+from utils import fast_json
+from benchmarks.synthetic import make_diagram
+
+
+def _edit(diagram, rng, step):
+    """
+    Make one random model change, as the views and commands would.
+    """
+    r = rng.random()
+    if r < 0.35:
+        swimlane = diagram.swimlanes[rng.choice(list(diagram.swimlanes))]
+        swimlane.angle = (swimlane.angle + rng.uniform(-5, 5)) % 360
+        diagram.record_change('swimlanes', swimlane)
+    elif r < 0.65:
+        outcome = diagram.outcomes[rng.choice(list(diagram.outcomes))]
+        diagram.move_outcome(outcome, rng.choice(list(diagram.swimlanes)), rng.uniform(20, 400))
+    elif r < 0.85:
+        blob = rng.choice(diagram.blobs)
+        blob.color = '#%06x' % rng.randrange(0x1000000)
+        diagram.record_change('blobs', blob)
+    elif r < 0.95:
+        start, end = rng.sample(list(diagram.outcomes.values()), 2)
+        blob = ScopeBlob([[rng.uniform(-400, 400), rng.uniform(-400, 400)] for _ in range(40)],
+                         label=f"New blob {step}")
+        blob.start_outcome, blob.end_outcome = start, end
+        diagram.add_blob(blob)
+    else:
+        diagram.remove_blob(rng.choice(diagram.blobs))
+
+
+def main(sizes=((36, 1000, 100), (72, 10000, 1000), (144, 50000, 5000)), edits=5000, flush_every=20):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        for swimlanes, outcomes, blobs in sizes:
+            print(f"{swimlanes} swimlanes, {outcomes} outcomes, {blobs} blobs; "
+                  f"{edits} edits, flushed every {flush_every}")
+            diagram = make_diagram(swimlanes, outcomes, blobs)
+            path = os.path.join(directory, 'autosave')
+            # Never compact during the session, so recovery replays every record
+            journal = DiagramJournal(path, compact_every=edits + 1)
+            journal.start(diagram)
+            journal.wait()
+            
+            rng = random.Random(1)
+            recording = 0.0
+            for step in range(edits):
+                _edit(diagram, rng, step)
+                start = time.perf_counter()
+                if step % flush_every == flush_every - 1:
+                    journal.flush()
+                recording += time.perf_counter() - start
+            start = time.perf_counter()
+            journal.flush()
+            recording += time.perf_counter() - start
+            journal.wait()
+            journal.stop()
+            
+            full_path = os.path.join(directory, 'full.json')
+            start = time.perf_counter()
+            diagram.save_to_file(full_path, fast=True)
+            full_save = time.perf_counter() - start
+            print(f"  journal  {os.path.getsize(path + '.journal') / 1024:9.1f} KiB"
+                  f"  {recording / edits * 1e6:8.1f} us/edit on the GUI thread")
+            print(f"  full save (fast) {os.path.getsize(full_path) / 1024:9.1f} KiB"
+                  f"  {full_save * 1000:8.1f} ms/save")
+            
+            start = time.perf_counter()
+            recovered = recover(path)
+            recover_time = time.perf_counter() - start
+            start = time.perf_counter()
+            Diagram.load_from_file(full_path)
+            load_time = time.perf_counter() - start
+            same = recovered.to_dict() == diagram.to_dict()
+            ok = ok and same
+            
+            # Replay alone, on a diagram loaded from the snapshot
+            with open(path + SNAPSHOT_SUFFIX, 'rb') as f:
+                snapshot = fast_json.loads(f.read())
+            replayed = Diagram.from_dict(snapshot['diagram'])
+            records = read_records(path, snapshot['generation'])
+            start = time.perf_counter()
+            for record in records:
+                apply_record(replayed, record)
+            replay = time.perf_counter() - start
+            print(f"  recover  {recover_time * 1000:8.1f} ms  vs load_from_file {load_time * 1000:8.1f} ms"
+                  f"  {'OK' if same else 'MISMATCH'}")
+            print(f"  replay   {replay * 1000:8.1f} ms for {len(records)} records"
+                  f"  ({len(records) / replay:10.0f} records/s)")
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Compare the time to paint 5000 labels drawn as QGraphicsTextItem with the
+cached LabelItem, on the first paint and on repaints.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_labels
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QGraphicsScene, QGraphicsTextItem, QGraphicsItem, QGraphicsView
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QFont, QColor, QPixmapCache
+
+from export.renderer import ensure_application
+from views.label_item import LabelItem, clear_static_text_cache, reserve_pixmap_cache
+
+WIDTH, HEIGHT = 1600, 1000
+
+
+def _make_scene(item_class, count, cache_mode=QGraphicsItem.NoCache):
+    """
+    Build a scene of count labels laid out in a grid that fills the view.
+    """
+    scene = QGraphicsScene(0, 0, WIDTH, HEIGHT)
+    columns = 50
+    font = QFont("Arial", 8)
+    for i in range(count):
+        item = item_class(f"Outcome {i % 700}")
+        item.setFont(font)
+        item.setDefaultTextColor(QColor('#212121'))
+        item.setCacheMode(cache_mode)
+        item.setPos((i % columns) * WIDTH / columns, (i // columns) * HEIGHT / (count / columns))
+        scene.addItem(item)
+    return scene
+
+
+def _paint_times(scene, frames=5):
+    """
+    Return (first paint, best repaint) times in seconds for a view of the scene.
+    """
+    view = QGraphicsView(scene)
+    view.resize(WIDTH + 4, HEIGHT + 4)
+    view.setSceneRect(QRectF(0, 0, WIDTH, HEIGHT))
+    view.show()
+    QPixmapCache.clear()
+    
+    start = time.perf_counter()
+    view.viewport().grab()
+    first = time.perf_counter() - start
+    
+    best = None
+    for _ in range(frames):
+        start = time.perf_counter()
+        view.viewport().grab()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    view.close()
+    return first, best
+
+
+def main(count=5000):
+    ensure_application()
+    reserve_pixmap_cache()
+    
+    variants = [
+        ("QGraphicsTextItem", QGraphicsTextItem, QGraphicsItem.NoCache),
+        ("LabelItem, no pixmap cache", LabelItem, QGraphicsItem.NoCache),
+        ("LabelItem", LabelItem, QGraphicsItem.DeviceCoordinateCache),
+    ]
+    print(f"{count} labels")
+    for name, item_class, cache_mode in variants:
+        clear_static_text_cache()
+        start = time.perf_counter()
+        scene = _make_scene(item_class, count, cache_mode)
+        build = time.perf_counter() - start
+        first, repaint = _paint_times(scene)
+        print(f"  {name:28s} build {build * 1000:7.1f} ms  first paint {first * 1000:7.1f} ms  "
+              f"repaint {repaint * 1000:7.1f} ms")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
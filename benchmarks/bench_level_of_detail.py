@@ -0,0 +1,74 @@
+"""
+Measure the time to paint one frame of a dense diagram at several zoom levels,
+with level-of-detail rendering on and off.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_level_of_detail
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage, QPainter, QColor
+
+from export.renderer import build_scene
+from views import level_of_detail
+from benchmarks.synthetic import make_diagram
+
+WIDTH, HEIGHT = 1280, 800
+
+
+def _frame_time(scene, zoom, repeat=5):
+    """
+    Return the best time to paint the view of the diagram center at a zoom level.
+    """
+    image = QImage(WIDTH, HEIGHT, QImage.Format_ARGB32_Premultiplied)
+    center = scene.center
+    source = QRectF(center.x() - WIDTH / zoom / 2, center.y() - HEIGHT / zoom / 2, WIDTH / zoom, HEIGHT / zoom)
+    target = QRectF(0, 0, WIDTH, HEIGHT)
+    best = None
+    for _ in range(repeat):
+        image.fill(QColor('white'))
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        start = time.perf_counter()
+        scene.render(painter, target, source)
+        elapsed = time.perf_counter() - start
+        painter.end()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(zooms=(1.0, 0.5, 0.25, 0.1), rounds=3):
+    diagram = make_diagram(swimlanes=72, outcomes=5000, blobs=500, points_per_blob=40)
+    scene = build_scene(diagram)
+    items = scene.items()
+    print(f"{len(items)} items, {WIDTH}x{HEIGHT} frame")
+    
+    thresholds = dict(level_of_detail.LOD_THRESHOLDS)
+    off = {name: 0.0 for name in thresholds}
+    
+    for zoom in zooms:
+        # Alternate the settings, since timings drift between runs
+        times = {'full': [], 'reduced': []}
+        for _ in range(rounds):
+            for name, values in (('full', off), ('reduced', thresholds)):
+                level_of_detail.set_thresholds(**values)
+                # Labels cache their painting; repaint them with the new thresholds
+                for item in items:
+                    item.update()
+                times[name].append(_frame_time(scene, zoom))
+        full, reduced = min(times['full']), min(times['reduced'])
+        print(f"  zoom {zoom * 100:5.0f}%  full detail {full * 1000:8.1f} ms  "
+              f"level of detail {reduced * 1000:8.1f} ms  ({full / reduced:4.1f}x)")
+    
+    level_of_detail.set_thresholds(**thresholds)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Measure the per-object memory footprint of the model classes, against
+unslotted replicas of the classes as they were before __slots__ and packed
+colors, so both figures come from one run.
+
+tracemalloc does not see the C++ side of a QColor, so the saving from not
+keeping one per swimlane and blob is larger than shown.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_model_memory
+"""
+
+import sys
+import tracemalloc
+
+from PyQt5.QtGui import QColor
+
+from models.swimlane import Swimlane
+from models.outcome import Outcome
+from models.scope_blob import ScopeBlob
+from styles.colors import COLORS
+
+
+class _DictOutcome:
+    """
+    Outcome before __slots__: attributes in a per-object __dict__.
+    """
+    
+    def __init__(self, swimlane_id, distance, label="", id=None):
+        self.id = id
+        self.swimlane_id = swimlane_id
+        self.distance = distance
+        self.label = label
+        self.item = None
+        self.associated_blobs = []
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['swimlane_id'], data['distance'], data.get('label', ""), data.get('id'))
+
+
+class _DictSwimlane:
+    """
+    Swimlane before __slots__, holding a QColor.
+    """
+    
+    def __init__(self, label="", angle=0, color=None, id=None, length=250):
+        self.id = id
+        self.angle = angle
+        self.label = label
+        self.color = color or QColor(COLORS['segment1'])
+        self.length = length
+        self.outcomes = []
+        self.item = None
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('label', ""), data['angle'], QColor(data.get('color', COLORS['segment1'])),
+                   data.get('id'), data.get('length', 250))
+
+
+class _DictScopeBlob:
+    """
+    ScopeBlob before __slots__, holding a QColor.
+    """
+    
+    def __init__(self, points, color=None, id=None, label=""):
+        self.id = id
+        self._points = points
+        self.store = None
+        self.point_offset = 0
+        self.point_count = 0
+        self.color = color or QColor(255, 0, 0, 50)
+        self.polygon_item = None
+        self.label = label
+        self.label_item = None
+        self.start_swimlane = None
+        self.end_swimlane = None
+        self.start_outcome = None
+        self.end_outcome = None
+        self.associated_blobs = []
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('points'), QColor(data.get('color', '#32ff0000')), data.get('id'),
+                   data.get('label', ""))
+
+
+def _per_object(factory, count):
+    """
+    Create count objects and return the traced bytes per object.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def main(count=100000):
+    # Colors as they come out of a file
+    lane_colors = ['#00bcd4', '#2196f3', '#e91e63', '#f44336']
+    blob_colors = ['#3200bcd4', '#322196f3', '#32e91e63', '#32f44336']
+    
+    # (name, unslotted replica factory, model class factory)
+    cases = (
+        ('Outcome',
+         lambda i: _DictOutcome.from_dict({'id': i + 1, 'swimlane_id': 1, 'distance': float(i), 'label': ''}),
+         lambda i: Outcome.from_dict({'id': i + 1, 'swimlane_id': 1, 'distance': float(i), 'label': ''})),
+        ('Swimlane',
+         lambda i: _DictSwimlane.from_dict(
+             {'id': i + 1, 'angle': float(i), 'label': '', 'color': lane_colors[i % 4], 'length': 250.0}),
+         lambda i: Swimlane.from_dict(
+             {'id': i + 1, 'angle': float(i), 'label': '', 'color': lane_colors[i % 4], 'length': 250.0})),
+        ('Swimlane (default color)',
+         lambda i: _DictSwimlane(angle=float(i), id=i + 1),
+         lambda i: Swimlane(angle=float(i), id=i + 1)),
+        ('ScopeBlob',
+         lambda i: _DictScopeBlob.from_dict({'id': i + 1, 'points': None, 'color': blob_colors[i % 4], 'label': ''}),
+         lambda i: ScopeBlob.from_dict({'id': i + 1, 'points': None, 'color': blob_colors[i % 4], 'label': ''})),
+    )
+    
+    print(f"{count} objects each, bytes/object")
+    print(f"  {'':26s} {'unslotted':>10s} {'slotted':>10s}")
+    for name, before, after in cases:
+        unslotted = _per_object(before, count)
+        slotted = _per_object(after, count)
+        print(f"  {name:26s} {unslotted:10.1f} {slotted:10.1f}  ({unslotted / slotted:4.2f}x)")
+    
+    # Materializing a color on demand must not change it
+    blob = ScopeBlob(None, QColor(1, 2, 3, 4))
+    lane = Swimlane(color=QColor('#123456'))
+    assert blob.to_dict()['color'] == '#04010203', blob.to_dict()['color']
+    assert lane.to_dict()['color'] == '#123456', lane.to_dict()['color']
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Load the same diagram into a scene three ways and compare the time taken:
+
+- legacy: the main window's old loader, reading its own nested file format and
+  adding each outcome through DiagramScene.add_outcome, which looks the
+  swimlane up by label;
+- migrated: the persistence service reading the legacy file (migrating it to
+  the current schema), then building the scene in one pass;
+- current: the persistence service reading a current-schema file.
+
+The migrated diagram is checked to match the original (apart from the swimlane
+lengths, which the legacy format did not store).
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_persistence
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from models.diagram import Diagram
+from models.persistence import read_diagram, write_diagram
+from models.scope_blob import ScopeBlob
+from export.renderer import build_scene, ensure_application
+from benchmarks.synthetic import make_diagram
+
+
+def legacy_data(diagram):
+    """
+    Describe a diagram in the main window's old file format.
+    """
+    outcomes = {}
+    for outcome in diagram.outcomes.values():
+        outcomes.setdefault(outcome.swimlane_id, []).append(
+            {'id': outcome.id, 'label': outcome.label, 'distance': outcome.distance})
+    blobs = []
+    for blob in diagram.blobs:
+        color = blob.color
+        blobs.append({
+            'id': blob.id,
+            'points': blob.points,
+            'color': {'r': color.red(), 'g': color.green(), 'b': color.blue(), 'a': color.alpha()},
+            'label': blob.label,
+            'outcome_ids': [o.id for o in (blob.start_outcome, blob.end_outcome) if o is not None]
+        })
+    return {
+        'swimlanes': [{'id': s.id, 'name': s.label, 'angle': s.angle, 'outcomes': outcomes.get(s.id, [])}
+                      for s in diagram.swimlanes.values()],
+        'blobs': blobs
+    }
+
+
+def load_legacy(path):
+    """
+    Load a legacy file as the main window used to: one scene call per object,
+    with a swimlane scan by label for every outcome.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    scene = build_scene(Diagram())
+    outcome_lookup = {}
+    for sl_data in data['swimlanes']:
+        scene.add_swimlane(sl_data['name'], sl_data['angle'])
+        for o_data in sl_data['outcomes']:
+            outcome = scene.add_outcome(sl_data['name'], o_data['distance'], o_data['label'])
+            outcome_lookup[o_data['id']] = outcome
+    for b_data in data['blobs']:
+        c = b_data['color']
+        blob = ScopeBlob(b_data['points'], (c['a'] << 24) | (c['r'] << 16) | (c['g'] << 8) | c['b'],
+                         label=b_data.get('label', ''))
+        ids = [i for i in b_data['outcome_ids'] if i in outcome_lookup]
+        if ids:
+            blob.start_outcome, blob.end_outcome = outcome_lookup[ids[0]], outcome_lookup[ids[-1]]
+        scene.add_blob_visual(scene.diagram.add_blob(blob))
+    return scene
+
+
+def load_service(path):
+    """
+    Load a file through the persistence service and build its scene in one pass.
+    """
+    return build_scene(read_diagram(path))
+
+
+def _by_id(diagram):
+    """
+    Index a diagram's dictionary by kind and ID, leaving out the swimlane
+    lengths the legacy format did not store.
+    """
+    data = diagram.to_dict()
+    for swimlane in data['swimlanes']:
+        del swimlane['length']
+    return {kind: {entry['id']: entry for entry in data[kind]}
+            for kind in ('swimlanes', 'outcomes', 'blobs')}
+
+
+def _timed(load, path):
+    start = time.perf_counter()
+    scene = load(path)
+    return time.perf_counter() - start, scene
+
+
+def main(sizes=((36, 1000, 100), (72, 2500, 250), (72, 5000, 500))):
+    ensure_application()
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, 'legacy.json')
+        current_path = os.path.join(directory, 'current.json')
+        for swimlanes, outcomes, blobs in sizes:
+            diagram = make_diagram(swimlanes, outcomes, blobs)
+            with open(legacy_path, 'w') as f:
+                json.dump(legacy_data(diagram), f, indent=2)
+            write_diagram(diagram, current_path, fsync=False)
+            print(f"{swimlanes} swimlanes, {outcomes} outcomes, {blobs} blobs")
+            
+            legacy, legacy_scene = _timed(load_legacy, legacy_path)
+            migrated, migrated_scene = _timed(load_service, legacy_path)
+            current, current_scene = _timed(load_service, current_path)
+            items = len(current_scene.items())
+            same = (_by_id(migrated_scene.diagram) == _by_id(current_scene.diagram) and
+                    len(legacy_scene.items()) == len(migrated_scene.items()) == items)
+            ok = ok and same
+            print(f"  legacy loader  {legacy * 1000:9.1f} ms")
+            print(f"  migrated       {migrated * 1000:9.1f} ms  ({legacy / migrated:5.1f}x)")
+            print(f"  current        {current * 1000:9.1f} ms  ({legacy / current:5.1f}x)"
+                  f"  {items} items  {'OK' if same else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Compare blob geometry held as per-blob point lists with the shared PointStore:
+memory used by the points and time to build a QPolygonF for every blob.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_point_store
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QPolygonF
+
+from models.diagram import Diagram
+from benchmarks.synthetic import make_diagram
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _traced_size(fn):
+    """
+    Return the memory still allocated by fn's result, in bytes.
+    """
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def _list_polygons(point_lists):
+    return [QPolygonF([QPointF(p[0], p[1]) for p in points]) for points in point_lists]
+
+
+def _store_polygons(diagram):
+    return [blob.to_polygon() for blob in diagram.blobs]
+
+
+def main(sizes=((1000, 40), (5000, 40), (2000, 400))):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for blobs, points_per_blob in sizes:
+            diagram = make_diagram(36, 1000, blobs, points_per_blob)
+            path = os.path.join(directory, 'bench.rdgb')
+            diagram.save_to_file(path)
+            mapped = Diagram.load_from_file(path)
+            point_lists = [blob.points for blob in diagram.blobs]
+            print(f"{blobs} blobs x {points_per_blob} points")
+            
+            list_size = _traced_size(lambda: [blob.points for blob in diagram.blobs])
+            store_size = len(diagram.point_store) * 16
+            print(f"  point lists  {list_size / 1024:10.1f} KiB")
+            print(f"  point store  {store_size / 1024:10.1f} KiB"
+                  f"  (mapped from file: {mapped.point_store.is_mapped})")
+            
+            _, list_time = _timed(_list_polygons, point_lists)
+            _, store_time = _timed(_store_polygons, diagram)
+            _, mapped_time = _timed(_store_polygons, mapped)
+            print(f"  polygons from lists   {list_time * 1000:8.1f} ms")
+            print(f"  polygons from store   {store_time * 1000:8.1f} ms")
+            print(f"  polygons from mapping {mapped_time * 1000:8.1f} ms")
+            mapped.point_store.close()
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
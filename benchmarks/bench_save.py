@@ -0,0 +1,114 @@
+"""
+Compare diagram save paths: the old in-place indent=2 json.dump, the atomic
+save (temporary file, fsync, rename) with and without fsync, and the fast mode
+that serializes compact bytes in memory, with orjson and with the standard
+library. Also checks that a failed save leaves the previous file intact and
+that every path loads back to the same diagram.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_save
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from models.diagram import Diagram
+from utils import fast_json
+from benchmarks.synthetic import make_diagram
+
+
+def _save_in_place(diagram, path):
+    """
+    The save path before atomic saves: truncate the target and stream into it.
+    """
+    with open(path, 'w') as f:
+        json.dump(diagram.to_dict(), f, indent=2)
+
+
+def _save_stdlib_fast(diagram, path):
+    """
+    Fast mode with the standard library encoder, as without orjson installed.
+    """
+    orjson = fast_json.orjson
+    fast_json.orjson = None
+    try:
+        diagram.save_to_file(path, fast=True)
+    finally:
+        fast_json.orjson = orjson
+
+
+VARIANTS = (
+    ("in place indent=2", _save_in_place),
+    ("atomic indent=2", lambda diagram, path: diagram.save_to_file(path)),
+    ("atomic no fsync", lambda diagram, path: diagram.save_to_file(path, fsync=False)),
+    ("atomic fast stdlib", _save_stdlib_fast),
+    ("atomic fast orjson", lambda diagram, path: diagram.save_to_file(path, fast=True)),
+)
+
+
+def check_failed_save(diagram, directory):
+    """
+    Check that a save failing halfway leaves the old file and no temporary files.
+    
+    Returns:
+        bool: True if the old file is unchanged
+    """
+    path = os.path.join(directory, 'crash.json')
+    diagram.save_to_file(path)
+    with open(path, 'rb') as f:
+        before = f.read()
+    
+    def failing_to_dict():
+        raise RuntimeError("simulated crash")
+    
+    diagram.to_dict = failing_to_dict
+    try:
+        diagram.save_to_file(path)
+    except RuntimeError:
+        pass
+    finally:
+        del diagram.to_dict
+    
+    with open(path, 'rb') as f:
+        intact = f.read() == before
+    leftovers = [name for name in os.listdir(directory) if name.endswith('.tmp')]
+    ok = intact and not leftovers
+    print(f"  failed save: {'old file intact' if ok else 'FILE DAMAGED'}")
+    return ok
+
+
+def main(sizes=((36, 1000, 100), (72, 10000, 1000), (144, 50000, 5000))):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    
+    if fast_json.orjson is None:
+        print("orjson is not installed; 'atomic fast orjson' uses the standard library")
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        for swimlanes, outcomes, blobs in sizes:
+            diagram = make_diagram(swimlanes, outcomes, blobs)
+            expected = diagram.to_dict()
+            print(f"{swimlanes} swimlanes, {outcomes} outcomes, {blobs} blobs x 40 points")
+            ok = check_failed_save(diagram, directory) and ok
+            
+            path = os.path.join(directory, 'bench.json')
+            for name, save in VARIANTS:
+                if os.path.exists(path):
+                    os.remove(path)
+                start = time.perf_counter()
+                save(diagram, path)
+                elapsed = time.perf_counter() - start
+                same = Diagram.load_from_file(path).to_dict() == expected
+                ok = ok and same
+                print(f"  {name:19s} {os.path.getsize(path) / 1024:10.1f} KiB"
+                      f"  save {elapsed * 1000:8.1f} ms  {'OK' if same else 'MISMATCH'}")
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
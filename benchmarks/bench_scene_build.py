@@ -0,0 +1,105 @@
+"""
+Build the scene of a diagram shown in a view three ways and compare the time
+until it is ready: items built, spatial index built (first itemAt query) and
+the first frame painted.
+
+- item by item: one add_model_visual call per object, each outcome looking up
+  its swimlane, as init_scene used to;
+- add_model_visuals: init_scene's bulk path (outcome positions computed in one
+  batch, one background invalidation and repaint), with Qt's BSP index
+  indexing the queued items on the first query;
+- NoIndex build: add_model_visuals with indexing switched off (NoIndex) during
+  the build and back on, rebuilding the index, at the end.
+
+Labels take their preferred position (the label layout is disabled) so the
+numbers show item construction and indexing; bench_labels covers labels.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_scene_build
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtGui import QTransform
+from PyQt5.QtWidgets import QApplication, QGraphicsScene
+
+from models.diagram import Diagram
+from export.renderer import build_scene, ensure_application
+from views.diagram_view import DiagramView
+from benchmarks.synthetic import make_diagram
+
+
+def _item_by_item(scene):
+    with scene.label_layout.deferred():
+        for kind, obj in scene.model_items():
+            scene.add_model_visual(kind, obj)
+
+
+def _bulk(scene):
+    scene.add_model_visuals(scene.model_items())
+
+
+def _no_index(scene):
+    method = scene.itemIndexMethod()
+    scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+    scene.add_model_visuals(scene.model_items())
+    scene.setItemIndexMethod(method)
+
+
+VARIANTS = (
+    ('item by item', _item_by_item),
+    ('add_model_visuals', _bulk),
+    ('NoIndex build', _no_index),
+)
+
+
+def build_times(diagram, build):
+    """
+    Build a diagram's scene in a shown view.
+    
+    Returns:
+        tuple: (build, index, paint) seconds and the number of items
+    """
+    scene = build_scene(Diagram())
+    scene.label_layout.enabled = False
+    view = DiagramView(scene)
+    view.resize(800, 800)
+    view.show()
+    QApplication.processEvents()
+    
+    scene.reset(diagram)
+    start = time.perf_counter()
+    build(scene)
+    built = time.perf_counter()
+    scene.itemAt(diagram.center, QTransform())
+    indexed = time.perf_counter()
+    view.viewport().grab()
+    painted = time.perf_counter()
+    items = len(scene.items())
+    view.close()
+    scene.reset()
+    return built - start, indexed - built, painted - indexed, items
+
+
+def main(sizes=(1000, 10000, 50000)):
+    ensure_application()
+    # Warm up fonts and caches before timing
+    build_times(make_diagram(8, 100, 5), _bulk)
+    for outcomes in sizes:
+        diagram = make_diagram(max(36, outcomes // 100), outcomes, outcomes // 20)
+        print(f"{len(diagram.swimlanes)} swimlanes, {outcomes} outcomes, {len(diagram.blobs)} blobs")
+        for name, build in VARIANTS:
+            built, indexed, painted, items = build_times(diagram, build)
+            print(f"  {name:17} build {built * 1000:9.1f} ms  index {indexed * 1000:8.1f} ms"
+                  f"  paint {painted * 1000:8.1f} ms  total {(built + indexed + painted) * 1000:9.1f} ms"
+                  f"  ({items} items)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Compare the scene's spatial index modes (DiagramScene.set_index_mode) on the
+same diagram:
+
+- bsp: Qt's BSP tree with its default depth and the growing scene rect;
+- auto: a BSP tree with its depth tuned to the item count and a fixed scene
+  rect sized from the longest swimlane;
+- none: no index (NoIndex).
+
+For each mode the scene is built fresh and timed until indexed (the first
+itemAt query), then itemAt at random points and items() over random small
+rects are timed. A swimlane rotation is then replayed with the index kept
+(each frame moves the swimlane's outcomes and queries the visible area, as
+painting does) and, in 'auto' mode, with the index switched off for the
+rotation by begin_animation() and rebuilt at the end. Query results are
+checked to match across modes.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_scene_index
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QPointF, QRectF, QSizeF, Qt
+from PyQt5.QtGui import QTransform
+
+from models.diagram import Diagram
+from export.renderer import build_scene, ensure_application
+from benchmarks.synthetic import make_diagram
+
+MODES = ('bsp', 'auto', 'none')
+
+
+def _queries(diagram, points=100, rects=50, size=50, seed=2):
+    """
+    Random query points and rects over the diagram's area.
+    """
+    rng = random.Random(seed)
+    extent = max(s.length for s in diagram.swimlanes.values())
+    center = diagram.center
+    
+    def point():
+        return QPointF(center.x() + rng.uniform(-extent, extent), center.y() + rng.uniform(-extent, extent))
+    
+    return ([point() for _ in range(points)],
+            [QRectF(point(), QSizeF(size, size)) for _ in range(rects)])
+
+
+def _rotate(scene, swimlane, frames, view_rect):
+    """
+    Turn a swimlane a degree per frame, finding the items to paint in the
+    visible area after each move, then turn it back; return the mean seconds
+    per frame.
+    """
+    angle = swimlane.angle
+    # Labels follow their outcomes without being laid out again, so the
+    # frames time moving the items and the index
+    with scene.label_layout.deferred(relayout=False):
+        start = time.perf_counter()
+        for _ in range(frames):
+            swimlane.item.set_geometry(swimlane.angle + 1)
+            scene.items(view_rect, Qt.IntersectsItemBoundingRect)
+        elapsed = time.perf_counter() - start
+        swimlane.item.set_geometry(angle)
+    return elapsed / frames
+
+
+def measure(diagram, mode, points, rects, frames=20):
+    """
+    Build a diagram's scene with an index mode and time its queries.
+    
+    Returns:
+        dict: Timings in seconds, the BSP depth and the query results
+    """
+    scene = build_scene(Diagram())
+    scene.label_layout.enabled = False
+    scene.set_index_mode(mode)
+    scene.reset(diagram)
+    result = {}
+    
+    start = time.perf_counter()
+    scene.add_model_visuals(scene.model_items())
+    scene.itemAt(diagram.center, QTransform())
+    result['build'] = time.perf_counter() - start
+    result['depth'] = scene.bspTreeDepth() if mode != 'none' else 0
+    
+    start = time.perf_counter()
+    hits = [scene.itemAt(p, QTransform()) for p in points]
+    result['itemAt'] = (time.perf_counter() - start) / len(points)
+    result['hits'] = [hit is not None and hit.boundingRect().width() for hit in hits]
+    
+    start = time.perf_counter()
+    result['counts'] = [len(scene.items(r)) for r in rects]
+    result['items'] = (time.perf_counter() - start) / len(rects)
+    
+    # The swimlane with the most outcomes, seen through an 800x800 view
+    swimlane = max(diagram.swimlanes.values(),
+                   key=lambda s: len(diagram.get_outcomes_for_swimlane(s.id)))
+    result['moving'] = 2 * len(diagram.get_outcomes_for_swimlane(swimlane.id)) + 2
+    view_rect = QRectF(diagram.center.x() - 400, diagram.center.y() - 400, 800, 800)
+    result['frame'] = _rotate(scene, swimlane, frames, view_rect)
+    if mode == 'auto':
+        scene.ANIMATION_NO_INDEX_ITEMS = 0
+        scene.begin_animation(result['moving'])
+        result['frame_no_index'] = _rotate(scene, swimlane, frames, view_rect)
+        start = time.perf_counter()
+        scene.end_animation()
+        scene.itemAt(diagram.center, QTransform())
+        result['restore'] = time.perf_counter() - start
+    scene.reset()
+    return result
+
+
+def main(sizes=(1000, 10000, 50000)):
+    ensure_application()
+    ok = True
+    for outcomes in sizes:
+        diagram = make_diagram(36, outcomes, max(10, outcomes // 100))
+        points, rects = _queries(diagram)
+        print(f"{len(diagram.swimlanes)} swimlanes, {outcomes} outcomes, {len(diagram.blobs)} blobs")
+        reference = None
+        for mode in MODES:
+            result = measure(diagram, mode, points, rects)
+            same = reference is None or (result['hits'], result['counts']) == reference
+            reference = reference or (result['hits'], result['counts'])
+            ok = ok and same
+            print(f"  {mode:5} depth {result['depth']:2}  build {result['build'] * 1000:8.1f} ms"
+                  f"  itemAt {result['itemAt'] * 1e6:8.1f} us  items(rect) {result['items'] * 1e6:8.1f} us"
+                  f"  rotate {result['frame'] * 1000:6.1f} ms/frame  {'OK' if same else 'MISMATCH'}")
+            if 'frame_no_index' in result:
+                print(f"        rotate without index {result['frame_no_index'] * 1000:6.1f} ms/frame"
+                      f"  + rebuild {result['restore'] * 1000:7.1f} ms  ({result['moving']} items moving)")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
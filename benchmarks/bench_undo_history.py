@@ -0,0 +1,106 @@
+"""
+Simulate a long editing session of swimlane rotations and blob deletions and
+compare an unbounded QUndoStack with UndoHistory limited by command count and
+by memory budget.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_undo_history
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import sip
+from PyQt5.QtWidgets import QGraphicsItem, QUndoStack
+
+from commands.swimlane_commands import RotateSwimlaneCommand
+from commands.undo_history import UndoHistory, estimate_size
+from export.renderer import build_scene, ensure_application
+from benchmarks.synthetic import make_diagram
+
+
+def _detached_items():
+    """
+    Count graphics items that are alive but not in a scene.
+    
+    tracemalloc only sees Python allocations, not the C++ side of Qt items,
+    so items kept by undo commands are counted instead.
+    """
+    gc.collect()
+    return sum(1 for obj in gc.get_objects()
+               if isinstance(obj, QGraphicsItem) and not sip.isdeleted(obj) and obj.scene() is None)
+
+
+def _session(make_stack, edits, trace, seed=1):
+    """
+    Run the edits on a new scene.
+    
+    With trace, returns (undo entries, estimated bytes, items held), where the
+    items held are the detached graphics items freed by clearing the stack. Otherwise
+    undoes all edits and returns (edit seconds, undo-all seconds).
+    """
+    diagram = make_diagram(swimlanes=36, outcomes=200, blobs=100)
+    scene = build_scene(diagram)
+    stack = make_stack()
+    scene.undo_stack = stack
+    if isinstance(stack, UndoHistory):
+        stack.set_scene(scene)
+    swimlanes = list(diagram.swimlanes.values())
+    rng = random.Random(seed)
+    
+    start = time.perf_counter()
+    for _ in range(edits):
+        if diagram.blobs and rng.random() < 0.1:
+            scene.delete_blob(rng.choice(diagram.blobs).polygon_item)
+        else:
+            item = rng.choice(swimlanes).item
+            old_angle = item.geometry()[0]
+            new_angle = old_angle + rng.uniform(-5, 5)
+            stack.push(RotateSwimlaneCommand(item, old_angle, new_angle))
+    elapsed = time.perf_counter() - start
+    
+    if trace:
+        if isinstance(stack, UndoHistory):
+            estimated = stack.memory_usage()
+        else:
+            estimated = sum(estimate_size(stack.command(i)) for i in range(stack.count()))
+        entries = stack.count()
+        before = _detached_items()
+        if isinstance(stack, UndoHistory):
+            # Also drops the snapshots, without taking a new one
+            stack.set_scene(None)
+        else:
+            stack.clear()
+        held = before - _detached_items()
+        return entries, estimated, held
+    
+    start = time.perf_counter()
+    while stack.canUndo():
+        stack.undo()
+    return elapsed, time.perf_counter() - start
+
+
+def main(edits=600):
+    ensure_application()
+    print(f"{edits} edits (90% swimlane rotations, 10% blob deletions)")
+    variants = (
+        ("QUndoStack", QUndoStack),
+        ("UndoHistory 100 cmds", lambda: UndoHistory(limit=100, memory_budget=0)),
+        ("UndoHistory 512 KiB", lambda: UndoHistory(limit=0, memory_budget=512 * 1024)),
+    )
+    for name, make_stack in variants:
+        entries, estimated, held = _session(make_stack, edits, trace=True)
+        elapsed, undo_all = _session(make_stack, edits, trace=False)
+        print(f"  {name:22s} {entries:6d} undo entries  {estimated / 1024:8.1f} KiB estimated  "
+              f"{held:6d} items held  {elapsed:6.2f} s edits  {undo_all:6.2f} s undo all")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
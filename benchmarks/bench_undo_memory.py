@@ -0,0 +1,74 @@
+"""
+Simulate a long editing session of outcome drags and compare the undo stack
+when every drag step is pushed as its own command with drags grouped into
+scene transactions of merged commands.
+
+Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_undo_memory
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QPointF
+
+from commands.move_command import MoveCommand
+from export.renderer import build_scene, ensure_application
+from benchmarks.synthetic import make_diagram
+
+
+def _session(gestures, steps, grouped, seed=1):
+    """
+    Run the drags on a new scene; return (undo entries, commands, bytes, seconds).
+    """
+    diagram = make_diagram(swimlanes=36, outcomes=100, blobs=0)
+    scene = build_scene(diagram)
+    stack = scene.undo_stack
+    items = [outcome.item for outcome in diagram.outcomes.values()]
+    rng = random.Random(seed)
+    
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for _ in range(gestures):
+        item = rng.choice(items)
+        step = QPointF(rng.uniform(-1, 1), rng.uniform(-1, 1))
+        if grouped:
+            scene.begin_transaction("Move Outcome")
+        for _ in range(steps):
+            last_pos = QPointF(item.pos())
+            item.setPos(last_pos + step)
+            command = MoveCommand(item, last_pos, item.pos())
+            if grouped:
+                scene.record(command)
+            else:
+                stack.push(command)
+        if grouped:
+            scene.commit_transaction()
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    
+    commands = sum(max(1, stack.command(i).childCount(), len(getattr(stack.command(i), 'commands', ())))
+                   for i in range(stack.count()))
+    return stack.count(), commands, used, elapsed
+
+
+def main(gestures=200, steps=40):
+    ensure_application()
+    print(f"{gestures} drags of {steps} steps each")
+    for name, grouped in (("command per step", False), ("transactions", True)):
+        entries, commands, used, elapsed = _session(gestures, steps, grouped)
+        print(f"  {name:18s} {entries:6d} undo entries  {commands:6d} commands  "
+              f"{used / 1024:8.1f} KiB traced  {elapsed:6.2f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
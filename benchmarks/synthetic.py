@@ -0,0 +1,47 @@
+"""
+Synthetic diagrams of configurable size for the benchmarks.
+"""
+
+import math
+import random
+
+from models.diagram import Diagram
+from models.scope_blob import ScopeBlob
+
+
+def make_diagram(swimlanes=36, outcomes=1000, blobs=100, points_per_blob=40, seed=1):
+    """
+    Build a random but reproducible diagram.
+    
+    Args:
+        swimlanes (int, optional): Number of swimlanes. Defaults to 36.
+        outcomes (int, optional): Number of outcomes. Defaults to 1000.
+        blobs (int, optional): Number of blobs. Defaults to 100.
+        points_per_blob (int, optional): Points in each blob outline. Defaults to 40.
+        seed (int, optional): Random seed. Defaults to 1.
+        
+    Returns:
+        Diagram: The generated diagram
+    """
+    rng = random.Random(seed)
+    diagram = Diagram()
+    
+    lanes = [diagram.add_swimlane(i * 360.0 / swimlanes, f"Swimlane {i}", length=400)
+             for i in range(swimlanes)]
+    outs = [diagram.add_outcome(rng.choice(lanes).id, rng.uniform(20, 400), f"Outcome {i}")
+            for i in range(outcomes)]
+    
+    for i in range(blobs if outs else 0):
+        start, end = rng.choice(outs), rng.choice(outs)
+        radius = rng.uniform(50, 400)
+        points = [[radius * math.cos(2 * math.pi * k / points_per_blob),
+                   radius * math.sin(2 * math.pi * k / points_per_blob)]
+                  for k in range(points_per_blob)]
+        blob = ScopeBlob(points, label=f"Blob {i}")
+        blob.start_outcome = start
+        blob.end_outcome = end
+        blob.start_swimlane = diagram.get_swimlane_by_id(start.swimlane_id)
+        blob.end_swimlane = diagram.get_swimlane_by_id(end.swimlane_id)
+        diagram.add_blob(blob)
+    
+    return diagram
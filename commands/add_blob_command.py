@@ -5,8 +5,9 @@ Command for adding blobs to the diagram (for undo/redo).
 from PyQt5.QtWidgets import QUndoCommand
 from PyQt5.QtGui import QColor
 
+from models.scope_blob import ScopeBlob
 from styles.colors import COLORS
-from views.scope_blob_item import ScopeBlobItem
+from commands.undo_history import COMMAND_SIZE, POINT_SIZE
 
 
 class AddBlobCommand(QUndoCommand):
@@ -14,13 +15,15 @@ class AddBlobCommand(QUndoCommand):
     Command for adding blobs to the diagram.
     
     This command creates a new blob and adds it to the scene, supporting undo/redo.
+    While the command is undone only the blob's to_dict() is kept, and redo
+    rebuilds the blob and its item from it.
     
     Attributes:
         scene (DiagramScene): The scene to add the blob to
         points (list): List of points defining the blob's shape
         label (str): Text label for the blob
-        blob (ScopeBlob): The created blob
-        blob_item (ScopeBlobItem): The visual representation of the blob
+        blob_id: ID of the created blob, or None before the first redo
+        data (dict): The blob's to_dict() while the command is undone, or None
     """
     
     def __init__(self, scene, points, label):
@@ -36,42 +39,40 @@ class AddBlobCommand(QUndoCommand):
         self.scene = scene
         self.points = points
         self.label = label
-        self.blob = None
-        self.blob_item = None
+        self.blob_id = None
+        self.data = None
     
     def redo(self):
         """
         Execute the add blob command.
         """
         try:
-            # Get next segment color
-            segment_num = len(self.scene.diagram.blobs) % 4 + 1
-            color_key = f'segment{segment_num}'
+            diagram = self.scene.diagram
+            if self.data is not None:
+                # Redo after undo rebuilds the blob from its dictionary
+                blob = ScopeBlob.from_dict(self.data, diagram.swimlanes, diagram.outcomes)
+            elif self.blob_id is None:
+                # Get next segment color
+                segment_num = len(diagram.blobs) % 4 + 1
+                color_key = f'segment{segment_num}'
+                
+                # Create blob with segment color
+                color = QColor(COLORS[color_key])
+                color.setAlpha(80)
+                blob = ScopeBlob(self.points, color, label=self.label)
+                
+                # Store swimlanes and outcomes before adding so the diagram can index them
+                blob.start_swimlane = self.scene.start_swimlane
+                blob.end_swimlane = self.scene.end_swimlane
+                blob.start_outcome = self.scene.start_outcome
+                blob.end_outcome = self.scene.end_outcome
+            else:
+                return
             
-            # Create blob with segment color
-            color = QColor(COLORS[color_key])
-            color.setAlpha(80)
-            self.blob = self.scene.diagram.add_blob(self.points, color=color, label=self.label)
-            
-            # Store swimlanes and outcomes
-            self.blob.start_swimlane = self.scene.start_swimlane
-            self.blob.end_swimlane = self.scene.end_swimlane
-            self.blob.start_outcome = self.scene.start_outcome
-            self.blob.end_outcome = self.scene.end_outcome
-            
-            # Create and add blob item
-            self.blob_item = ScopeBlobItem(self.blob, self.scene)
-            self.scene.addItem(self.blob_item)
-            self.blob.polygon_item = self.blob_item
-            
-            # Associate blob with outcomes safely
-            if self.blob.start_outcome and hasattr(self.blob.start_outcome, 'item'):
-                if hasattr(self.blob.start_outcome.item, 'associated_blobs'):
-                    self.blob.start_outcome.item.associated_blobs.append(self.blob_item)
-            
-            if self.blob.end_outcome and hasattr(self.blob.end_outcome, 'item'):
-                if hasattr(self.blob.end_outcome.item, 'associated_blobs'):
-                    self.blob.end_outcome.item.associated_blobs.append(self.blob_item)
+            blob = diagram.add_blob(blob)
+            self.scene.add_blob_visual(blob)
+            self.blob_id = blob.id
+            self.data = None
         except Exception as e:
             print(f"Error in AddBlobCommand.redo: {e}")
     
@@ -80,23 +81,23 @@ class AddBlobCommand(QUndoCommand):
         Undo the add blob command.
         """
         try:
-            # Remove from associated outcomes safely
-            if hasattr(self.blob, 'start_outcome') and self.blob.start_outcome:
-                if hasattr(self.blob.start_outcome, 'item') and self.blob.start_outcome.item:
-                    if hasattr(self.blob.start_outcome.item, 'associated_blobs'):
-                        if self.blob_item in self.blob.start_outcome.item.associated_blobs:
-                            self.blob.start_outcome.item.associated_blobs.remove(self.blob_item)
-            
-            if hasattr(self.blob, 'end_outcome') and self.blob.end_outcome:
-                if hasattr(self.blob.end_outcome, 'item') and self.blob.end_outcome.item:
-                    if hasattr(self.blob.end_outcome.item, 'associated_blobs'):
-                        if self.blob_item in self.blob.end_outcome.item.associated_blobs:
-                            self.blob.end_outcome.item.associated_blobs.remove(self.blob_item)
+            # Look the blob up, as later commands may have rebuilt it
+            blob = self.scene.diagram.get_blob_by_id(self.blob_id)
+            if blob is None:
+                return
+            self.data = blob.to_dict()
             
-            # Remove blob from scene
-            if self.blob_item:
-                self.scene.removeItem(self.blob_item)
-            if self.blob:
-                self.scene.diagram.remove_blob(self.blob)
+            # Remove the item from the scene, then the blob from the diagram
+            self.scene.remove_model_visual('blob', blob)
+            self.scene.diagram.remove_blob(blob)
         except Exception as e:
             print(f"Error in AddBlobCommand.undo: {e}")
+
+    def memory_size(self):
+        """
+        Get the estimated memory kept by this command.
+        
+        Returns:
+            int: Estimated size in bytes
+        """
+        return COMMAND_SIZE + POINT_SIZE * len(self.points or [])
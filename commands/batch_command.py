@@ -0,0 +1,66 @@
+"""
+Command applying many commands as one bulk edit (for undo/redo).
+"""
+
+from PyQt5.QtWidgets import QUndoCommand
+
+
+class BatchCommand(QUndoCommand):
+    """
+    Command holding commands that are applied together, e.g. recoloring all
+    selected items.
+    
+    Unlike a QUndoStack macro, the commands run inside the scene's
+    bulk_update() block: labels are placed once, the cached background is
+    invalidated at most once and the views repaint once, after all model
+    changes are made, instead of after every command.
+    
+    Attributes:
+        scene (DiagramScene): The scene the commands change
+        commands (list): The commands, in the order they are applied
+    """
+    
+    def __init__(self, scene, text, commands=None, parent=None):
+        """
+        Initialize a new BatchCommand.
+        
+        Args:
+            scene (DiagramScene): The scene the commands change
+            text (str): Text shown in the undo history
+            commands (list, optional): The commands. Defaults to None (empty).
+            parent (QUndoCommand, optional): Parent command. Defaults to None.
+        """
+        super().__init__(text, parent)
+        self.scene = scene
+        self.commands = list(commands or [])
+    
+    def __len__(self):
+        """
+        Return the number of commands.
+        """
+        return len(self.commands)
+    
+    def add(self, command):
+        """
+        Add a command to apply with the others.
+        
+        Args:
+            command (QUndoCommand): The command
+        """
+        self.commands.append(command)
+    
+    def redo(self):
+        """
+        Apply the commands in order.
+        """
+        with self.scene.bulk_update():
+            for command in self.commands:
+                command.redo()
+    
+    def undo(self):
+        """
+        Revert the commands in reverse order.
+        """
+        with self.scene.bulk_update():
+            for command in reversed(self.commands):
+                command.undo()
@@ -9,7 +9,9 @@ class ChangeColorCommand(QUndoCommand):
     """
     Command for changing the color of an item.
     
-    This command changes the color of an item, supporting undo/redo.
+    This command changes the color of an item, supporting undo/redo. Blob
+    items are looked up by blob ID each time, since undoing a blob deletion
+    rebuilds the item.
     
     Attributes:
         item: The item whose color is being changed
@@ -32,20 +34,47 @@ class ChangeColorCommand(QUndoCommand):
         self.old_color = old_color
         self.new_color = new_color
     
+    def _current_item(self):
+        """
+        Get the live item for the command's target.
+        
+        Returns:
+            The blob's current item for blob items, otherwise self.item
+        """
+        blob = getattr(self.item, 'blob', None)
+        scene = getattr(self.item, 'diagram_scene', None)
+        if blob is None or scene is None:
+            return self.item
+        current = scene.diagram.get_blob_by_id(blob.id)
+        if current is not None and current.polygon_item is not None:
+            self.item = current.polygon_item
+        return self.item
+    
+    def _apply(self, color):
+        """
+        Set a color on the item.
+        
+        Args:
+            color: The color to set
+        """
+        item = self._current_item()
+        
+        # Change color in the item; set_color also updates the model
+        if hasattr(item, 'set_color'):
+            item.set_color(color)
+        elif hasattr(item, 'setColor'):
+            item.setColor(color)
+            
+            # Update model if needed
+            if hasattr(item, 'update_model'):
+                item.update_model()
+    
     def redo(self):
         """
         Execute the change color command.
         """
         try:
-            # Change color in the item
-            if hasattr(self.item, 'set_color'):
-                self.item.set_color(self.new_color)
-            elif hasattr(self.item, 'setColor'):
-                self.item.setColor(self.new_color)
-            
-            # Update model if needed
-            if hasattr(self.item, 'update_model'):
-                self.item.update_model()
+            self._apply(self.new_color)
         except Exception as e:
             print(f"Error in ChangeColorCommand.redo: {e}")
     
@@ -55,13 +84,6 @@ class ChangeColorCommand(QUndoCommand):
         """
         try:
             # Restore original color
-            if hasattr(self.item, 'set_color'):
-                self.item.set_color(self.old_color)
-            elif hasattr(self.item, 'setColor'):
-                self.item.setColor(self.old_color)
-            
-            # Update model if needed
-            if hasattr(self.item, 'update_model'):
-                self.item.update_model()
+            self._apply(self.old_color)
         except Exception as e:
             print(f"Error in ChangeColorCommand.undo: {e}")
@@ -4,19 +4,23 @@ Command for deleting blobs from the diagram (for undo/redo).
 
 from PyQt5.QtWidgets import QUndoCommand
 
+from models.scope_blob import ScopeBlob
+from commands.undo_history import COMMAND_SIZE, POINT_SIZE
+
 
 class DeleteBlobCommand(QUndoCommand):
     """
     Command for deleting blobs from the diagram.
     
-    This command removes a blob from the scene, supporting undo/redo.
+    This command removes a blob from the scene, supporting undo/redo. While
+    the blob is deleted only its to_dict() is kept, not the blob or its item;
+    undo rebuilds both from it. The blob is found by ID, so the command keeps
+    working when other commands have rebuilt it in the meantime.
     
     Attributes:
         scene (DiagramScene): The scene to remove the blob from
-        blob (ScopeBlob): The blob to remove
-        blob_item (ScopeBlobItem): The visual representation of the blob
-        start_outcome_item: The item representing the start outcome
-        end_outcome_item: The item representing the end outcome
+        blob_id: ID of the blob
+        data (dict): The blob's to_dict() while it is deleted, or None
     """
     
     def __init__(self, scene, blob_item):
@@ -29,41 +33,22 @@ class DeleteBlobCommand(QUndoCommand):
         """
         super().__init__("Delete Blob")
         self.scene = scene
-        self.blob_item = blob_item
-        self.blob = blob_item.blob
-        
-        # Store references for undo
-        self.start_outcome_item = None
-        self.end_outcome_item = None
-        
-        # Store outcome references if they exist
-        if hasattr(self.blob, 'start_outcome') and self.blob.start_outcome:
-            if hasattr(self.blob.start_outcome, 'item'):
-                self.start_outcome_item = self.blob.start_outcome.item
-        
-        if hasattr(self.blob, 'end_outcome') and self.blob.end_outcome:
-            if hasattr(self.blob.end_outcome, 'item'):
-                self.end_outcome_item = self.blob.end_outcome.item
+        self.blob_id = blob_item.blob.id
+        self.data = None
     
     def redo(self):
         """
         Execute the delete blob command.
         """
         try:
-            # Remove from associated outcomes safely
-            if self.start_outcome_item:
-                if hasattr(self.start_outcome_item, 'associated_blobs'):
-                    if self.blob_item in self.start_outcome_item.associated_blobs:
-                        self.start_outcome_item.associated_blobs.remove(self.blob_item)
-            
-            if self.end_outcome_item:
-                if hasattr(self.end_outcome_item, 'associated_blobs'):
-                    if self.blob_item in self.end_outcome_item.associated_blobs:
-                        self.end_outcome_item.associated_blobs.remove(self.blob_item)
+            blob = self.scene.diagram.get_blob_by_id(self.blob_id)
+            if blob is None:
+                return
+            self.data = blob.to_dict()
             
-            # Remove blob from scene
-            self.scene.removeItem(self.blob_item)
-            self.scene.diagram.remove_blob(self.blob)
+            # Remove the item from the scene, then the blob from the diagram
+            self.scene.remove_model_visual('blob', blob)
+            self.scene.diagram.remove_blob(blob)
         except Exception as e:
             print(f"Error in DeleteBlobCommand.redo: {e}")
     
@@ -72,19 +57,23 @@ class DeleteBlobCommand(QUndoCommand):
         Undo the delete blob command.
         """
         try:
-            # Add blob back to diagram
-            self.scene.diagram.blobs.append(self.blob)
-            
-            # Add blob item back to scene
-            self.scene.addItem(self.blob_item)
+            if self.data is None:
+                return
             
-            # Re-associate with outcomes
-            if self.start_outcome_item:
-                if hasattr(self.start_outcome_item, 'associated_blobs'):
-                    self.start_outcome_item.associated_blobs.append(self.blob_item)
-            
-            if self.end_outcome_item:
-                if hasattr(self.end_outcome_item, 'associated_blobs'):
-                    self.end_outcome_item.associated_blobs.append(self.blob_item)
+            # Rebuild the blob and its item from the stored dictionary
+            diagram = self.scene.diagram
+            blob = ScopeBlob.from_dict(self.data, diagram.swimlanes, diagram.outcomes)
+            self.scene.add_blob_visual(diagram.add_blob(blob))
+            self.data = None
         except Exception as e:
             print(f"Error in DeleteBlobCommand.undo: {e}")
+
+    def memory_size(self):
+        """
+        Get the estimated memory kept by this command.
+        
+        Returns:
+            int: Estimated size in bytes
+        """
+        points = self.data.get('points') if self.data else None
+        return COMMAND_SIZE + POINT_SIZE * len(points or [])
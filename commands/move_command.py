@@ -12,13 +12,21 @@ class MoveCommand(QUndoCommand):
     
     This command stores the old and new positions of an item to support undo/redo.
     
+    Moves of the same item within one gesture (see DiagramScene.begin_transaction)
+    merge into a single command that keeps the first old position and the last
+    new position, so a drag leaves one undo entry however many positions it
+    passes through.
+    
     Attributes:
         item: The item being moved
         old_pos (QPointF): The original position of the item
         new_pos (QPointF): The new position of the item
+        gesture (int): Gesture the move belongs to, or None if it never merges
     """
     
-    def __init__(self, item, old_pos, new_pos, parent=None):
+    ID = 1
+    
+    def __init__(self, item, old_pos, new_pos, parent=None, gesture=None):
         """
         Initialize a new MoveCommand.
         
@@ -27,11 +35,40 @@ class MoveCommand(QUndoCommand):
             old_pos (QPointF): The original position of the item
             new_pos (QPointF): The new position of the item
             parent (QUndoCommand, optional): Parent command. Defaults to None.
+            gesture (int, optional): Gesture the move belongs to. Defaults to None.
         """
         super().__init__("Move Item", parent)
         self.item = item
-        self.old_pos = old_pos
-        self.new_pos = new_pos
+        self.old_pos = QPointF(old_pos)
+        self.new_pos = QPointF(new_pos)
+        self.gesture = gesture
+    
+    def id(self):
+        """
+        Get the merge id shared by all move commands.
+        
+        Returns:
+            int: MoveCommand.ID
+        """
+        return self.ID
+    
+    def mergeWith(self, other):
+        """
+        Absorb a later move of the same item in the same gesture.
+        
+        Args:
+            other (QUndoCommand): The later command
+            
+        Returns:
+            bool: True if other was merged into this command
+        """
+        if (other.id() != self.id() or other.item is not self.item
+                or self.gesture is None or other.gesture != self.gesture):
+            return False
+        self.new_pos = QPointF(other.new_pos)
+        # A drag that ends where it started leaves nothing to undo
+        self.setObsolete(self.new_pos == self.old_pos)
+        return True
     
     def redo(self):
         """
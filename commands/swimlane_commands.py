@@ -0,0 +1,162 @@
+"""
+Commands for rotating and resizing swimlanes (for undo/redo).
+"""
+
+from PyQt5.QtWidgets import QUndoCommand
+
+
+class RotateSwimlaneCommand(QUndoCommand):
+    """
+    Command for rotating a swimlane around the diagram center.
+    
+    Rotations of the same swimlane within one gesture merge into a single
+    command, like MoveCommand.
+    
+    Attributes:
+        item (SwimlaneItem): The swimlane being rotated
+        old_angle (float): The original angle in degrees
+        new_angle (float): The new angle in degrees
+        gesture (int): Gesture the rotation belongs to, or None if it never merges
+    """
+    
+    ID = 2
+    
+    def __init__(self, item, old_angle, new_angle, parent=None, gesture=None):
+        """
+        Initialize a new RotateSwimlaneCommand.
+        
+        Args:
+            item (SwimlaneItem): The swimlane being rotated
+            old_angle (float): The original angle in degrees
+            new_angle (float): The new angle in degrees
+            parent (QUndoCommand, optional): Parent command. Defaults to None.
+            gesture (int, optional): Gesture the rotation belongs to. Defaults to None.
+        """
+        super().__init__("Rotate Swimlane", parent)
+        self.item = item
+        self.old_angle = old_angle
+        self.new_angle = new_angle
+        self.gesture = gesture
+    
+    def id(self):
+        """
+        Get the merge id shared by all rotate commands.
+        
+        Returns:
+            int: RotateSwimlaneCommand.ID
+        """
+        return self.ID
+    
+    def mergeWith(self, other):
+        """
+        Absorb a later rotation of the same swimlane in the same gesture.
+        
+        Args:
+            other (QUndoCommand): The later command
+            
+        Returns:
+            bool: True if other was merged into this command
+        """
+        if (other.id() != self.id() or other.item is not self.item
+                or self.gesture is None or other.gesture != self.gesture):
+            return False
+        self.new_angle = other.new_angle
+        self.setObsolete(self.new_angle == self.old_angle)
+        return True
+    
+    def redo(self):
+        """
+        Execute the rotate command.
+        """
+        try:
+            self.item.set_geometry(self.new_angle)
+        except Exception as e:
+            print(f"Error in RotateSwimlaneCommand.redo: {e}")
+    
+    def undo(self):
+        """
+        Undo the rotate command.
+        """
+        try:
+            self.item.set_geometry(self.old_angle)
+        except Exception as e:
+            print(f"Error in RotateSwimlaneCommand.undo: {e}")
+
+
+class ResizeSwimlaneCommand(QUndoCommand):
+    """
+    Command for changing a swimlane's length, and its angle when dragged by
+    the resize handle.
+    
+    Resizes of the same swimlane within one gesture merge into a single
+    command, like MoveCommand.
+    
+    Attributes:
+        item (SwimlaneItem): The swimlane being resized
+        old_geometry (tuple): The original (angle, length)
+        new_geometry (tuple): The new (angle, length)
+        gesture (int): Gesture the resize belongs to, or None if it never merges
+    """
+    
+    ID = 3
+    
+    def __init__(self, item, old_geometry, new_geometry, parent=None, gesture=None):
+        """
+        Initialize a new ResizeSwimlaneCommand.
+        
+        Args:
+            item (SwimlaneItem): The swimlane being resized
+            old_geometry (tuple): The original (angle, length)
+            new_geometry (tuple): The new (angle, length)
+            parent (QUndoCommand, optional): Parent command. Defaults to None.
+            gesture (int, optional): Gesture the resize belongs to. Defaults to None.
+        """
+        super().__init__("Resize Swimlane", parent)
+        self.item = item
+        self.old_geometry = tuple(old_geometry)
+        self.new_geometry = tuple(new_geometry)
+        self.gesture = gesture
+    
+    def id(self):
+        """
+        Get the merge id shared by all resize commands.
+        
+        Returns:
+            int: ResizeSwimlaneCommand.ID
+        """
+        return self.ID
+    
+    def mergeWith(self, other):
+        """
+        Absorb a later resize of the same swimlane in the same gesture.
+        
+        Args:
+            other (QUndoCommand): The later command
+            
+        Returns:
+            bool: True if other was merged into this command
+        """
+        if (other.id() != self.id() or other.item is not self.item
+                or self.gesture is None or other.gesture != self.gesture):
+            return False
+        self.new_geometry = other.new_geometry
+        self.setObsolete(self.new_geometry == self.old_geometry)
+        return True
+    
+    def redo(self):
+        """
+        Execute the resize command.
+        """
+        try:
+            self.item.set_geometry(*self.new_geometry)
+        except Exception as e:
+            print(f"Error in ResizeSwimlaneCommand.redo: {e}")
+    
+    def undo(self):
+        """
+        Undo the resize command.
+        """
+        try:
+            self.item.set_geometry(*self.old_geometry)
+        except Exception as e:
+            print(f"Error in ResizeSwimlaneCommand.undo: {e}")
@@ -0,0 +1,91 @@
+"""
+Command grouping the commands recorded during one scene transaction (for undo/redo).
+"""
+
+import itertools
+
+from PyQt5.QtWidgets import QUndoCommand
+
+_gestures = itertools.count(1)
+
+
+def next_gesture():
+    """
+    Get a new gesture number for commands that should merge with each other.
+    
+    Returns:
+        int: A number not returned before
+    """
+    return next(_gestures)
+
+
+class TransactionCommand(QUndoCommand):
+    """
+    Command holding the commands recorded during a transaction.
+    
+    Commands are recorded after their change has already been made (e.g. by a
+    drag), so the first redo when the transaction is pushed re-applies state
+    that is already current. A recorded command that can merge with an earlier
+    one of the same type and item (see MoveCommand.mergeWith) is merged into
+    it instead of being kept.
+    
+    Attributes:
+        gesture (int): Gesture number shared by the recorded commands
+        commands (list): Recorded commands, oldest first
+    """
+    
+    def __init__(self, text, gesture=None):
+        """
+        Initialize a new TransactionCommand.
+        
+        Args:
+            text (str): Text shown in the undo history
+            gesture (int, optional): Gesture number. Defaults to a new one.
+        """
+        super().__init__(text)
+        self.gesture = next_gesture() if gesture is None else gesture
+        self.commands = []
+        self._by_target = {}
+    
+    def __len__(self):
+        """
+        Return the number of recorded commands.
+        """
+        return len(self.commands)
+    
+    def record(self, command):
+        """
+        Add a command whose change has already been made.
+        
+        Args:
+            command (QUndoCommand): The command
+        """
+        key = (command.id(), getattr(command, 'item', None))
+        earlier = self._by_target.get(key) if command.id() != -1 else None
+        if earlier is not None and earlier.mergeWith(command):
+            return
+        self.commands.append(command)
+        self._by_target[key] = command
+    
+    def live_commands(self):
+        """
+        Get the recorded commands that still change something.
+        
+        Returns:
+            list: Commands that are not obsolete
+        """
+        return [command for command in self.commands if not command.isObsolete()]
+    
+    def redo(self):
+        """
+        Apply the recorded commands in order.
+        """
+        for command in self.commands:
+            command.redo()
+    
+    def undo(self):
+        """
+        Revert the recorded commands in reverse order.
+        """
+        for command in reversed(self.commands):
+            command.undo()
@@ -0,0 +1,755 @@
+"""
+UndoHistory class: a bounded undo stack that compacts old commands into model snapshots.
+"""
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QAction, QGraphicsItem, QUndoCommand
+
+# Rough per-object costs in bytes, used when a command does not report its size
+COMMAND_SIZE = 512
+DETACHED_ITEM_SIZE = 4096
+POINT_SIZE = 64
+ENTRY_SIZE = 400
+SHARED_ENTRY_SIZE = 16
+
+
+def estimate_size(command):
+    """
+    Estimate the memory a command keeps alive.
+    
+    Commands can report their own size with a memory_size() method. Otherwise
+    the estimate charges a fixed cost per command, plus graphics items the
+    command holds that are not in a scene (e.g. a deleted item kept for
+    undo), plus any child commands.
+    
+    Args:
+        command (QUndoCommand): The command
+        
+    Returns:
+        int: Estimated size in bytes
+    """
+    memory_size = getattr(command, 'memory_size', None)
+    if memory_size is not None:
+        return memory_size()
+    
+    size = COMMAND_SIZE
+    for value in vars(command).values():
+        values = value if isinstance(value, list) else [value]
+        for value in values:
+            if isinstance(value, QGraphicsItem) and value.scene() is None:
+                size += DETACHED_ITEM_SIZE
+            elif isinstance(value, QUndoCommand):
+                size += estimate_size(value)
+    return size
+
+
+def diagram_state(diagram, previous=None, changed=None):
+    """
+    Get a snapshot of a diagram's model.
+    
+    Args:
+        diagram (Diagram): The diagram
+        previous (dict, optional): An earlier snapshot; entries that did not
+            change are shared with it instead of copied. Defaults to None.
+        changed (dict, optional): IDs of the objects added, changed or removed
+            since previous was taken, from Diagram.take_changes(). Only those
+            objects are converted; the rest of previous is reused as it is.
+            Defaults to None (convert every object and compare it with previous).
+            
+    Returns:
+        dict: 'swimlanes', 'outcomes' and 'blobs', each mapping id -> dict
+    """
+    if previous is not None and changed is not None:
+        lookups = {
+            'swimlanes': diagram.swimlanes.get,
+            'outcomes': diagram.outcomes.get,
+            'blobs': diagram.get_blob_by_id,
+        }
+        state = {}
+        for kind, find in lookups.items():
+            entries = state[kind] = dict(previous.get(kind, {}))
+            for obj_id in changed.get(kind, ()):
+                obj = find(obj_id)
+                if obj is None:
+                    entries.pop(obj_id, None)
+                    continue
+                entry = obj.to_dict()
+                if entries.get(obj_id) != entry:
+                    entries[obj_id] = entry
+        return state
+    
+    data = diagram.to_dict()
+    state = {}
+    for kind in ('swimlanes', 'outcomes', 'blobs'):
+        earlier = previous.get(kind, {}) if previous else {}
+        entries = state[kind] = {}
+        for entry in data.get(kind, []):
+            old = earlier.get(entry['id'])
+            entries[entry['id']] = old if old == entry else entry
+    return state
+
+
+def state_changes(before, after):
+    """
+    Get the differences between two diagram snapshots.
+    
+    Args:
+        before (dict): Earlier snapshot from diagram_state()
+        after (dict): Later snapshot from diagram_state()
+        
+    Returns:
+        dict: 'swimlanes', 'outcomes' and 'blobs', each mapping the id of every
+            added, removed or changed object to (old dict or None, new dict or None)
+    """
+    changes = {}
+    for kind in ('swimlanes', 'outcomes', 'blobs'):
+        old, new = before.get(kind, {}), after.get(kind, {})
+        changes[kind] = {
+            obj_id: (old.get(obj_id), new.get(obj_id))
+            for obj_id in list(old) + [obj_id for obj_id in new if obj_id not in old]
+            if old.get(obj_id) is not new.get(obj_id) and old.get(obj_id) != new.get(obj_id)
+        }
+    return changes
+
+
+def _entry_size(entry):
+    """
+    Estimate the memory used by a snapshot entry, or by an (old, new) pair of
+    them in a diff, without serializing it: a fixed cost per entry plus its
+    strings and points.
+    """
+    if entry is None:
+        return 0
+    if isinstance(entry, tuple):
+        return sum(_entry_size(e) for e in entry)
+    size = ENTRY_SIZE
+    for value in entry.values():
+        if isinstance(value, str):
+            size += len(value)
+        elif isinstance(value, (list, tuple)):
+            size += POINT_SIZE * len(value)
+    return size
+    
+
+def _state_size(state, previous=None, changed=None):
+    """
+    Estimate the memory used by a snapshot or diff.
+    
+    Entries shared with a previous snapshot are only charged for the
+    reference. With the changed IDs the snapshot was built from, only those
+    entries are looked at.
+    """
+    if not previous:
+        return sum(_entry_size(entry) for entries in state.values() for entry in entries.values())
+    size = 0
+    for kind, entries in state.items():
+        earlier = previous.get(kind, {})
+        size += SHARED_ENTRY_SIZE * len(entries)
+        obj_ids = entries if changed is None else changed.get(kind, ())
+        for obj_id in obj_ids:
+            entry = entries.get(obj_id)
+            if entry is not None and earlier.get(obj_id) is not entry:
+                size += _entry_size(entry) - SHARED_ENTRY_SIZE
+    return size
+
+
+class CheckpointCommand(QUndoCommand):
+    """
+    Command standing in for a run of compacted commands.
+    
+    It keeps only the model-level differences the commands made, as
+    dictionaries; undo and redo rebuild the affected items through
+    DiagramScene.apply_model_changes.
+    
+    Attributes:
+        scene (DiagramScene): The scene the changes apply to
+        changes (dict): Model diff from state_changes()
+        count (int): Number of commands folded into this one
+        size (int): Estimated size of the diff in bytes
+    """
+    
+    def __init__(self, scene, changes, count, parent=None):
+        """
+        Initialize a new CheckpointCommand.
+        
+        Args:
+            scene (DiagramScene): The scene the changes apply to
+            changes (dict): Model diff from state_changes()
+            count (int): Number of commands folded into this one
+            parent (QUndoCommand, optional): Parent command. Defaults to None.
+        """
+        super().__init__(f"{count} Earlier Changes", parent)
+        self.scene = scene
+        self.changes = changes
+        self.count = count
+        self.size = COMMAND_SIZE + _state_size(changes)
+    
+    def memory_size(self):
+        """
+        Get the estimated size of this command.
+        
+        Returns:
+            int: Estimated size in bytes
+        """
+        return self.size
+    
+    def redo(self):
+        """
+        Apply the folded changes.
+        """
+        try:
+            self.scene.apply_model_changes(self.changes)
+        except Exception as e:
+            print(f"Error in CheckpointCommand.redo: {e}")
+    
+    def undo(self):
+        """
+        Revert the folded changes.
+        """
+        try:
+            self.scene.apply_model_changes(self.changes, undo=True)
+        except Exception as e:
+            print(f"Error in CheckpointCommand.undo: {e}")
+
+
+class UndoHistory(QObject):
+    """
+    Undo stack with a command count limit and a memory budget.
+    
+    It offers the parts of the QUndoStack interface the application uses
+    (push with merging, undo/redo, clean state, undo/redo actions and the
+    same signals), so it can be passed wherever a QUndoStack is expected.
+    Unlike QUndoStack, which can only limit an empty stack, it removes its
+    oldest commands as new ones arrive.
+    
+    Old commands are compacted rather than simply dropped. Every
+    checkpoint_interval commands the history takes a snapshot of the model;
+    when a limit is exceeded, the commands from the start of the history up
+    to a snapshot are replaced by one CheckpointCommand holding only the
+    model differences between the first snapshot and that one. Deleted items
+    held by those commands are released, and undoing the checkpoint
+    rebuilds whatever items it needs. If the budget is exceeded before a
+    snapshot is due, one is taken at the current index so the commands so far
+    can be compacted. Only when that is not enough are the oldest entries
+    dropped for good, and the snapshot after them becomes the start of the
+    history.
+    
+    Snapshots are built from the IDs the diagram reports as changed since the
+    previous one (Diagram.take_changes()), so taking one costs in proportion
+    to the edits made rather than to the size of the diagram. Only the
+    snapshot at the start of the history, taken by clear(), converts the whole
+    model. That snapshot is needed for as long as there are commands and
+    dropping commands cannot shrink it, so it is left out of the memory budget.
+    
+    Changes made to the diagram outside the undo history between two
+    snapshots are part of the differences and so are folded into the
+    checkpoint as well; call clear() after building or loading a diagram so
+    that it is not.
+    
+    Attributes:
+        commands (list): Commands, oldest first
+        sizes (list): Estimated size in bytes of each command
+        snapshots (dict): Position in commands -> (diagram_state(), size) of the
+            model after the commands before that position
+        scene (DiagramScene): Scene whose diagram is snapshotted, or None
+        limit (int): Maximum number of commands
+        memory_budget (int): Maximum estimated size in bytes of commands and
+            snapshots, not counting the snapshot at the start of the history
+        checkpoint_interval (int): Commands between snapshots (at most half the
+            count limit, so there is always a snapshot to compact to)
+        compactions (int): Number of times commands were folded into a checkpoint
+        dropped (int): Number of entries dropped from the start of the history
+    """
+    
+    indexChanged = pyqtSignal(int)
+    cleanChanged = pyqtSignal(bool)
+    canUndoChanged = pyqtSignal(bool)
+    canRedoChanged = pyqtSignal(bool)
+    undoTextChanged = pyqtSignal(str)
+    redoTextChanged = pyqtSignal(str)
+    
+    DEFAULT_LIMIT = 500
+    DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+    DEFAULT_CHECKPOINT_INTERVAL = 50
+    
+    def __init__(self, parent=None, limit=DEFAULT_LIMIT, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Initialize an empty UndoHistory.
+        
+        Args:
+            parent (QObject, optional): Parent object. Defaults to None.
+            limit (int, optional): Maximum number of commands. Defaults to DEFAULT_LIMIT.
+            memory_budget (int, optional): Maximum estimated size in bytes.
+                Defaults to DEFAULT_MEMORY_BUDGET.
+            checkpoint_interval (int, optional): Commands between snapshots.
+                Defaults to DEFAULT_CHECKPOINT_INTERVAL.
+        """
+        super().__init__(parent)
+        self.commands = []
+        self.sizes = []
+        self.snapshots = {}
+        self.scene = None
+        self.limit = limit
+        self.memory_budget = memory_budget
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.compactions = 0
+        self.dropped = 0
+        self._index = 0
+        self._clean_index = 0
+        # (diagram, state) of the last snapshot taken; the diagram's changes
+        # since then turn it into the next one
+        self._tracked = None
+    
+    def set_scene(self, scene):
+        """
+        Set the scene whose diagram is snapshotted for compaction.
+        
+        Without a scene, old commands are dropped instead of compacted. The
+        current model becomes the start of the history, so set the scene (or
+        call clear()) once the diagram is built or loaded.
+        
+        Args:
+            scene (DiagramScene): The scene
+        """
+        self.scene = scene
+        self.clear()
+    
+    # QUndoStack interface
+    
+    def push(self, command):
+        """
+        Execute a command and add it to the history.
+        
+        As with QUndoStack, the command's redo() is called, commands that were
+        undone are discarded, and the command is merged into the previous one
+        if their id() matches and mergeWith() accepts it.
+        
+        Args:
+            command (QUndoCommand): The command
+        """
+        state = self._state()
+        command.redo()
+        
+        # Pushing discards the commands that were undone
+        if self._index < len(self.commands):
+            del self.commands[self._index:]
+            del self.sizes[self._index:]
+            self._discard_snapshots_after(self._index)
+            if self._clean_index > self._index:
+                self._clean_index = -1
+        
+        top = self.commands[-1] if self.commands else None
+        if top is not None and command.id() != -1 and command.id() == top.id() \
+                and self._clean_index != self._index and top.mergeWith(command):
+            # A snapshot taken after the top command is out of date now
+            self.snapshots.pop(self._index, None)
+            if top.isObsolete():
+                self.commands.pop()
+                self.sizes.pop()
+                self._index -= 1
+                if self._clean_index > self._index:
+                    self._clean_index = -1
+            else:
+                self.sizes[-1] = estimate_size(top)
+        elif not command.isObsolete():
+            self.commands.append(command)
+            self.sizes.append(estimate_size(command))
+            self._index += 1
+            self._take_snapshot()
+        
+        self._enforce_limits()
+        self._emit_changes(state)
+    
+    def undo(self):
+        """
+        Undo the current command.
+        """
+        if self._index == 0:
+            return
+        state = self._state()
+        self._index -= 1
+        self.commands[self._index].undo()
+        self._emit_changes(state)
+    
+    def redo(self):
+        """
+        Redo the next command.
+        """
+        if self._index >= len(self.commands):
+            return
+        state = self._state()
+        self.commands[self._index].redo()
+        self._index += 1
+        self._emit_changes(state)
+    
+    def setIndex(self, index):
+        """
+        Undo or redo commands until the given number of commands is applied.
+        
+        Args:
+            index (int): Target index
+        """
+        index = max(0, min(index, len(self.commands)))
+        while self._index > index:
+            self.undo()
+        while self._index < index:
+            self.redo()
+    
+    def clear(self):
+        """
+        Remove all commands, making the current model the start of the history.
+        """
+        state = self._state()
+        self.commands = []
+        self.sizes = []
+        self.snapshots.clear()
+        self._index = 0
+        self._clean_index = 0
+        self._take_snapshot()
+        self._emit_changes(state)
+    
+    def count(self):
+        """
+        Return the number of commands.
+        """
+        return len(self.commands)
+    
+    def index(self):
+        """
+        Return the number of commands currently applied.
+        """
+        return self._index
+    
+    def command(self, index):
+        """
+        Return the command at an index, or None.
+        """
+        if 0 <= index < len(self.commands):
+            return self.commands[index]
+        return None
+    
+    def text(self, index):
+        """
+        Return the text of the command at an index.
+        """
+        command = self.command(index)
+        return command.text() if command is not None else ""
+    
+    def canUndo(self):
+        """
+        Return whether there is a command to undo.
+        """
+        return self._index > 0
+    
+    def canRedo(self):
+        """
+        Return whether there is a command to redo.
+        """
+        return self._index < len(self.commands)
+    
+    def undoText(self):
+        """
+        Return the text of the command undo() would undo.
+        """
+        return self.text(self._index - 1)
+    
+    def redoText(self):
+        """
+        Return the text of the command redo() would redo.
+        """
+        return self.text(self._index)
+    
+    def setClean(self):
+        """
+        Mark the current state as clean, e.g. after saving.
+        """
+        state = self._state()
+        self._clean_index = self._index
+        self._emit_changes(state)
+    
+    def isClean(self):
+        """
+        Return whether the current state is the one last marked clean.
+        """
+        return self._clean_index == self._index
+    
+    def cleanIndex(self):
+        """
+        Return the index marked clean, or -1 if it was discarded.
+        """
+        return self._clean_index
+    
+    def setUndoLimit(self, limit):
+        """
+        Set the maximum number of commands; 0 means no limit.
+        
+        Unlike QUndoStack, the limit can be changed at any time.
+        
+        Args:
+            limit (int): Maximum number of commands
+        """
+        state = self._state()
+        self.limit = limit
+        self._enforce_limits()
+        self._emit_changes(state)
+    
+    def undoLimit(self):
+        """
+        Return the maximum number of commands.
+        """
+        return self.limit
+    
+    def createUndoAction(self, parent, prefix="Undo"):
+        """
+        Create an action that undoes the current command and follows its text.
+        
+        Args:
+            parent (QObject): Parent of the action
+            prefix (str, optional): Text before the command text. Defaults to "Undo".
+            
+        Returns:
+            QAction: The action
+        """
+        return self._create_action(parent, prefix, self.undo, self.canUndo, self.undoText,
+                                   self.canUndoChanged, self.undoTextChanged)
+    
+    def createRedoAction(self, parent, prefix="Redo"):
+        """
+        Create an action that redoes the next command and follows its text.
+        
+        Args:
+            parent (QObject): Parent of the action
+            prefix (str, optional): Text before the command text. Defaults to "Redo".
+            
+        Returns:
+            QAction: The action
+        """
+        return self._create_action(parent, prefix, self.redo, self.canRedo, self.redoText,
+                                   self.canRedoChanged, self.redoTextChanged)
+    
+    def _create_action(self, parent, prefix, trigger, enabled, text, enabled_changed, text_changed):
+        """
+        Create an undo or redo action.
+        """
+        action = QAction(parent)
+        
+        def set_text(command_text):
+            action.setText(f"{prefix} {command_text}".strip())
+        
+        set_text(text())
+        action.setEnabled(enabled())
+        action.triggered.connect(trigger)
+        enabled_changed.connect(action.setEnabled)
+        text_changed.connect(set_text)
+        return action
+    
+    # Limits and compaction
+    
+    def memory_usage(self):
+        """
+        Get the estimated memory kept by the history.
+        
+        Returns:
+            int: Estimated size in bytes of the commands and snapshots
+        """
+        return sum(self.sizes) + sum(size for state, size in self.snapshots.values())
+    
+    def stats(self):
+        """
+        Get the size of the history.
+        
+        Returns:
+            dict: commands, snapshots, memory (bytes), compactions and dropped
+        """
+        return {
+            'commands': len(self.commands),
+            'snapshots': len(self.snapshots),
+            'memory': self.memory_usage(),
+            'compactions': self.compactions,
+            'dropped': self.dropped,
+        }
+    
+    def _over_limits(self):
+        """
+        Check whether the history is over its count limit or memory budget.
+        """
+        if self.limit and len(self.commands) > self.limit:
+            return True
+        if not self.memory_budget:
+            return False
+        base_size = self.snapshots[0][1] if 0 in self.snapshots else 0
+        return self.memory_usage() - base_size > self.memory_budget
+    
+    def _enforce_limits(self):
+        """
+        Compact, and if necessary drop, the oldest commands until within the limits.
+        """
+        while self._over_limits():
+            if not self._compact() and not self._drop_oldest():
+                break
+    
+    def _interval(self):
+        """
+        Get the number of commands between snapshots.
+        """
+        if self.limit:
+            return max(1, min(self.checkpoint_interval, self.limit // 2))
+        return self.checkpoint_interval
+    
+    def _take_snapshot(self, force=False):
+        """
+        Snapshot the model if one is due at the current index.
+        
+        Commands are often recorded after their change was made (see
+        DiagramScene.record), so the model is only known to match a position
+        right after a push, or at the start of the history after clear().
+        
+        Args:
+            force (bool, optional): Take the snapshot even if the interval has
+                not passed. Defaults to False.
+        """
+        if self.scene is None or self._index in self.snapshots:
+            return
+        if self._index != 0:
+            if 0 not in self.snapshots:
+                # Without the state at the start of the history, a snapshot cannot be used
+                return
+            last = max(p for p in self.snapshots if p <= self._index)
+            if not force and self._index - last < self._interval():
+                return
+        try:
+            last = max((p for p in self.snapshots if p < self._index), default=None)
+            previous = self.snapshots[last][0] if last is not None else None
+            diagram = self.scene.diagram
+            changed = diagram.take_changes()
+            if changed is not None and self._tracked is not None and self._tracked[0] is diagram:
+                # Convert only what changed since the last snapshot taken
+                tracked = self._tracked[1]
+                state = diagram_state(diagram, tracked, changed)
+                if previous is tracked:
+                    size = _state_size(state, previous, changed)
+                else:
+                    size = _state_size(state, previous)
+            else:
+                # Share unchanged entries with the latest earlier snapshot
+                state = diagram_state(diagram, previous)
+                size = _state_size(state, previous)
+            self.snapshots[self._index] = (state, size)
+            self._tracked = (diagram, state)
+        except Exception as e:
+            print(f"Error taking undo snapshot: {e}")
+    
+    def _discard_snapshots_after(self, position):
+        """
+        Forget the snapshots of commands beyond a position.
+        """
+        for p in [p for p in self.snapshots if p > position]:
+            del self.snapshots[p]
+    
+    def _compact(self):
+        """
+        Fold the commands up to the first usable snapshot into a CheckpointCommand.
+        
+        Returns:
+            bool: True if anything was compacted
+        """
+        if self.scene is None or 0 not in self.snapshots:
+            return False
+        starts_with_checkpoint = isinstance(self.commands[0], CheckpointCommand)
+        positions = [
+            p for p in sorted(self.snapshots)
+            if (p >= 2 or (p == 1 and not starts_with_checkpoint)) and p <= self._index
+        ]
+        if not positions and self._index >= (2 if starts_with_checkpoint else 1):
+            # No snapshot is due yet; the model matches the current index, so take one there
+            self._take_snapshot(force=True)
+            if self._index in self.snapshots:
+                positions = [self._index]
+        if not positions:
+            return False
+        end = positions[0]
+        
+        base, base_size = self.snapshots[0]
+        state, size = self.snapshots[end]
+        changes = state_changes(base, state)
+        if any(changes.values()):
+            checkpoint = [CheckpointCommand(self.scene, changes, self._folded(end))]
+        else:
+            checkpoint = []
+        self.commands[:end] = checkpoint
+        self.sizes[:end] = [estimate_size(command) for command in checkpoint]
+        
+        # Positions after the folded commands move down
+        shift = end - len(checkpoint)
+        snapshots = {0: (base, base_size)}
+        if checkpoint:
+            snapshots[1] = (state, size)
+        for p, snapshot in self.snapshots.items():
+            if p > end:
+                snapshots[p - shift] = snapshot
+        self.snapshots = snapshots
+        self._index -= shift
+        if self._clean_index >= end:
+            self._clean_index -= shift
+        elif self._clean_index > 0:
+            # The clean state was between folded commands
+            self._clean_index = -1
+        self.compactions += 1
+        return True
+    
+    def _folded(self, end):
+        """
+        Count the original commands among the first end entries.
+        """
+        return sum(getattr(command, 'count', 1) if isinstance(command, CheckpointCommand) else 1
+                   for command in self.commands[:end])
+    
+    def _drop_oldest(self):
+        """
+        Remove the oldest entry from the history for good.
+        
+        The snapshot after the entry becomes the start of the history; without
+        one the entry is kept, since compaction needs the start of the history.
+        
+        Returns:
+            bool: True if an entry was removed
+        """
+        if not self.commands or self._index == 0:
+            return False
+        if 0 in self.snapshots and 1 not in self.snapshots:
+            return False
+        del self.commands[0]
+        del self.sizes[0]
+        self.snapshots = {p - 1: snapshot for p, snapshot in self.snapshots.items() if p >= 1}
+        self._index -= 1
+        self._clean_index = self._clean_index - 1 if self._clean_index > 0 else -1
+        self.dropped += 1
+        return True
+    
+    # Signals
+    
+    def _state(self):
+        """
+        Get the values the change signals report.
+        """
+        return (self._index, self.isClean(), self.canUndo(), self.canRedo(),
+                self.undoText(), self.redoText())
+    
+    def _emit_changes(self, before):
+        """
+        Emit the signals for the values that changed since before.
+        """
+        index, clean, can_undo, can_redo, undo_text, redo_text = self._state()
+        if index != before[0]:
+            self.indexChanged.emit(index)
+        if clean != before[1]:
+            self.cleanChanged.emit(clean)
+        if can_undo != before[2]:
+            self.canUndoChanged.emit(can_undo)
+        if can_redo != before[3]:
+            self.canRedoChanged.emit(can_redo)
+        if undo_text != before[4]:
+            self.undoTextChanged.emit(undo_text)
+        if redo_text != before[5]:
+            self.redoTextChanged.emit(redo_text)
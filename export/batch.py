@@ -0,0 +1,138 @@
+"""
+Parallel batch export of many diagram files over a process pool.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .renderer import DEFAULT_DPI, DEFAULT_MARGIN, find_diagram_files, output_path
+
+# Result of exporting one diagram file. `timings` maps 'load', 'scene' and
+# 'render' to seconds; `error` is None on success, otherwise a message.
+ExportResult = namedtuple('ExportResult', 'source outputs seconds timings error worker')
+
+
+def _init_worker():
+    """
+    Process pool initializer: give each worker its own offscreen QApplication.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from .renderer import ensure_application
+    ensure_application()
+
+
+def export_file(source, outputs, dpi=DEFAULT_DPI, margin=DEFAULT_MARGIN):
+    """
+    Load one diagram file and render it to every requested output.
+    
+    Runs in a worker process. Never raises; failures are returned in the result.
+    
+    Args:
+        source (str): Path of the diagram file
+        outputs (list): (filename, format) pairs to write
+        dpi (int, optional): Output resolution. Defaults to 96.
+        margin (float, optional): Margin around the items, in scene units. Defaults to 20.
+        
+    Returns:
+        ExportResult: What was written and how long each step took
+    """
+    from models.diagram import Diagram
+    from .renderer import build_scene, render_scene
+    
+    start = time.perf_counter()
+    timings = {}
+    written = []
+    try:
+        diagram = Diagram.load_from_file(source)
+        timings['load'] = time.perf_counter() - start
+        
+        step = time.perf_counter()
+        scene = build_scene(diagram)
+        timings['scene'] = time.perf_counter() - step
+        
+        step = time.perf_counter()
+        for filename, format in outputs:
+            directory = os.path.dirname(filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            written.append(render_scene(scene, filename, format, dpi, margin))
+        timings['render'] = time.perf_counter() - step
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return ExportResult(source, written, time.perf_counter() - start, timings, error, os.getpid())
+
+
+def export_batch(sources, output_dir=None, formats=('png',), dpi=DEFAULT_DPI, margin=DEFAULT_MARGIN,
+                 workers=None, input_dir=None, callback=None):
+    """
+    Export many diagram files in parallel.
+    
+    Files are spread over a pool of worker processes started with the 'spawn'
+    method (Qt is not safe to fork), each with its own offscreen QApplication.
+    Every output is written atomically, so an interrupted or failed export
+    never leaves a partial file behind.
+    
+    Args:
+        sources (list): Paths of diagram files
+        output_dir (str, optional): Output directory. Defaults to None (next to each file).
+        formats (tuple, optional): Formats to write for each file. Defaults to ('png',).
+        dpi (int, optional): Output resolution. Defaults to 96.
+        margin (float, optional): Margin around the items, in scene units. Defaults to 20.
+        workers (int, optional): Number of worker processes. Defaults to None (one per CPU).
+        input_dir (str, optional): Common input directory; its subdirectory
+            structure is kept under output_dir. Defaults to None.
+        callback (callable, optional): Called with each ExportResult as it completes
+        
+    Returns:
+        list: ExportResult for every source, in the order of sources
+    """
+    sources = list(sources)
+    if not sources:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+    
+    jobs = {source: [(output_path(source, output_dir, format, input_dir), format) for format in formats]
+            for source in sources}
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+        futures = {executor.submit(export_file, source, outputs, dpi, margin): source
+                   for source, outputs in jobs.items()}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. a crash in Qt)
+                result = ExportResult(source, [], 0.0, {}, f"{type(e).__name__}: {e}", None)
+            results[source] = result
+            if callback:
+                callback(result)
+    
+    return [results[source] for source in sources]
+
+
+def export_directory_parallel(input_dir, output_dir=None, formats=('png',), dpi=DEFAULT_DPI,
+                              margin=DEFAULT_MARGIN, recursive=False, workers=None, callback=None):
+    """
+    Export every diagram file in a directory in parallel.
+    
+    Args:
+        input_dir (str): Directory of diagram files
+        output_dir (str, optional): Output directory. Defaults to None (next to each file).
+        formats (tuple, optional): Formats to write for each file. Defaults to ('png',).
+        dpi (int, optional): Output resolution. Defaults to 96.
+        margin (float, optional): Margin around the items, in scene units. Defaults to 20.
+        recursive (bool, optional): Also export subdirectories. Defaults to False.
+        workers (int, optional): Number of worker processes. Defaults to None (one per CPU).
+        callback (callable, optional): Called with each ExportResult as it completes
+        
+    Returns:
+        list: ExportResult for every file found
+    """
+    return export_batch(find_diagram_files(input_dir, recursive), output_dir, formats, dpi, margin,
+                        workers, input_dir, callback)
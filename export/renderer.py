@@ -0,0 +1,267 @@
+"""
+Headless rendering of diagrams to PNG, SVG and PDF.
+"""
+
+import os
+import sys
+
+from PyQt5.QtCore import Qt, QRectF, QSize, QSizeF, QMarginsF
+from PyQt5.QtGui import QColor, QImage, QPainter, QPdfWriter, QPageSize, QPageLayout
+from PyQt5.QtSvg import QSvgGenerator
+from PyQt5.QtWidgets import QApplication, QUndoStack
+
+from models.binary_format import BINARY_EXTENSION
+from models.diagram import Diagram
+from styles.colors import COLORS
+from utils.atomic_file import atomic_output
+
+FORMATS = ('png', 'svg', 'pdf')
+DIAGRAM_EXTENSIONS = ('.json', BINARY_EXTENSION)
+
+# Scene units are pixels at 96 DPI
+SCENE_DPI = 96
+DEFAULT_DPI = 96
+DEFAULT_MARGIN = 20
+
+# Application created by ensure_application, kept alive for the process
+_application = None
+
+
+def ensure_application():
+    """
+    Get the QApplication, creating one on the offscreen platform if needed.
+    
+    Must be called before any scene is built. Without a display the offscreen
+    platform is used unless QT_QPA_PLATFORM is already set.
+    
+    Returns:
+        QApplication: The application instance
+    """
+    global _application
+    
+    app = QApplication.instance()
+    if app is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        app = _application = QApplication(sys.argv[:1])
+    return app
+
+
+def build_scene(diagram):
+    """
+    Build a DiagramScene for a diagram, for rendering only.
+    
+    Args:
+        diagram (Diagram): The diagram to show
+        
+    Returns:
+        DiagramScene: The populated scene
+    """
+    from views.diagram_scene import DiagramScene
+    
+    ensure_application()
+    # Keep the undo stack alive with the scene
+    undo_stack = QUndoStack()
+    scene = DiagramScene(diagram, undo_stack)
+    undo_stack.setParent(scene)
+    return scene
+
+
+def format_for(filename):
+    """
+    Get the export format of a filename from its extension.
+    
+    Args:
+        filename (str): Output path
+        
+    Returns:
+        str: One of FORMATS
+        
+    Raises:
+        ValueError: If the extension is not a supported format
+    """
+    format = os.path.splitext(filename)[1][1:].lower()
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {filename}")
+    return format
+
+
+def _paint(scene, painter, target, source):
+    """
+    Render a scene region into a painter.
+    """
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.TextAntialiasing)
+    scene.render(painter, target, source, Qt.KeepAspectRatio)
+
+
+def render_scene(scene, filename, format=None, dpi=DEFAULT_DPI, margin=DEFAULT_MARGIN,
+                 background=COLORS['background']):
+    """
+    Render everything in a scene to an image or document file.
+    
+    Args:
+        scene (QGraphicsScene): The scene to render
+        filename (str): Output path
+        format (str, optional): 'png', 'svg' or 'pdf'. Defaults to None (from the extension).
+        dpi (int, optional): Output resolution; the scene is drawn at its natural size
+            at 96 DPI. Defaults to 96.
+        margin (float, optional): Margin around the items, in scene units. Defaults to 20.
+        background (optional): Background color, or None for transparent (PNG/SVG).
+            Defaults to the application background color.
+            
+    Returns:
+        str: The output path
+    """
+    format = format or format_for(filename)
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    
+    source = scene.itemsBoundingRect().adjusted(-margin, -margin, margin, margin)
+    scale = dpi / SCENE_DPI
+    size = QSize(max(1, round(source.width() * scale)), max(1, round(source.height() * scale)))
+    target = QRectF(0, 0, size.width(), size.height())
+    
+    # Write to a temporary file so a failed or interrupted render never leaves a partial file
+    with atomic_output(filename) as temp_path:
+        if format == 'png':
+            image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+            dots_per_meter = round(dpi / 0.0254)
+            image.setDotsPerMeterX(dots_per_meter)
+            image.setDotsPerMeterY(dots_per_meter)
+            image.fill(QColor(background) if background is not None else QColor(Qt.transparent))
+            painter = QPainter(image)
+            try:
+                _paint(scene, painter, target, source)
+            finally:
+                painter.end()
+            if not image.save(temp_path, 'PNG'):
+                raise IOError(f"Could not write {filename}")
+    
+        elif format == 'svg':
+            generator = QSvgGenerator()
+            generator.setFileName(temp_path)
+            generator.setSize(size)
+            generator.setViewBox(target)
+            generator.setResolution(dpi)
+            generator.setTitle(os.path.splitext(os.path.basename(filename))[0])
+            painter = QPainter(generator)
+            try:
+                if background is not None:
+                    painter.fillRect(target, QColor(background))
+                _paint(scene, painter, target, source)
+            finally:
+                painter.end()
+    
+        else:
+            writer = QPdfWriter(temp_path)
+            writer.setResolution(dpi)
+            page_size = QSizeF(size.width() / dpi * 25.4, size.height() / dpi * 25.4)
+            writer.setPageLayout(QPageLayout(QPageSize(page_size, QPageSize.Millimeter), QPageLayout.Portrait,
+                                             QMarginsF(0, 0, 0, 0)))
+            painter = QPainter(writer)
+            try:
+                page = QRectF(painter.viewport())
+                if background is not None:
+                    painter.fillRect(page, QColor(background))
+                _paint(scene, painter, page, source)
+            finally:
+                painter.end()
+    
+    return filename
+
+
+def export_diagram(source, filename, format=None, dpi=DEFAULT_DPI, margin=DEFAULT_MARGIN):
+    """
+    Render a diagram file (or Diagram) to an image or document file.
+    
+    Args:
+        source: Path of a diagram file (JSON or binary), or a Diagram
+        filename (str): Output path
+        format (str, optional): 'png', 'svg' or 'pdf'. Defaults to None (from the extension).
+        dpi (int, optional): Output resolution. Defaults to 96.
+        margin (float, optional): Margin around the items, in scene units. Defaults to 20.
+        
+    Returns:
+        str: The output path
+    """
+    ensure_application()
+    diagram = Diagram.load_from_file(source) if isinstance(source, str) else source
+    return render_scene(build_scene(diagram), filename, format, dpi, margin)
+
+
+def find_diagram_files(directory, recursive=False):
+    """
+    List the diagram files in a directory.
+    
+    Args:
+        directory (str): Directory to search
+        recursive (bool, optional): Also search subdirectories. Defaults to False.
+        
+    Returns:
+        list: Sorted paths of .json and binary diagram files
+    """
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(DIAGRAM_EXTENSIONS):
+                found.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return found
+
+
+def output_path(source, output_dir, format, input_dir=None):
+    """
+    Get the output path for a diagram file.
+    
+    Args:
+        source (str): Path of the diagram file
+        output_dir (str): Output directory, or None for next to the source
+        format (str): Export format
+        input_dir (str, optional): Directory the source was found in; its
+            subdirectory structure is kept under output_dir. Defaults to None.
+            
+    Returns:
+        str: The output path
+    """
+    stem = os.path.splitext(source)[0]
+    if output_dir is None:
+        return f"{stem}.{format}"
+    relative = os.path.relpath(stem, input_dir) if input_dir else os.path.basename(stem)
+    return os.path.join(output_dir, f"{relative}.{format}")
+
+
+def export_directory(input_dir, output_dir=None, formats=('png',), dpi=DEFAULT_DPI,
+                     margin=DEFAULT_MARGIN, recursive=False):
+    """
+    Export every diagram file in a directory.
+    
+    A file that fails to load or render is reported and skipped.
+    
+    Args:
+        input_dir (str): Directory of diagram files
+        output_dir (str, optional): Output directory. Defaults to None (next to each file).
+        formats (tuple, optional): Formats to write for each file. Defaults to ('png',).
+        dpi (int, optional): Output resolution. Defaults to 96.
+        margin (float, optional): Margin around the items, in scene units. Defaults to 20.
+        recursive (bool, optional): Also export subdirectories. Defaults to False.
+        
+    Returns:
+        list: (source, outputs, error) tuples; error is None on success
+    """
+    ensure_application()
+    results = []
+    for source in find_diagram_files(input_dir, recursive):
+        outputs = []
+        try:
+            scene = build_scene(Diagram.load_from_file(source))
+            for format in formats:
+                filename = output_path(source, output_dir, format, input_dir)
+                os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+                outputs.append(render_scene(scene, filename, format, dpi, margin))
+            results.append((source, outputs, None))
+        except Exception as e:
+            print(f"Error exporting {source}: {e}")
+            results.append((source, outputs, e))
+    return results
@@ -0,0 +1,133 @@
+"""
+Render diagram files to PNG, SVG or PDF without opening a window.
+
+Examples:
+
+    python export_diagram.py plan.json                      # writes plan.png
+    python export_diagram.py plan.json -o plan.pdf --dpi 300
+    python export_diagram.py diagrams/ -o images/ -f png,svg
+    python export_diagram.py diagrams/ -o images/ -j 8      # 8 worker processes
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Must be set before Qt is loaded
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from models.diagram import Diagram
+from export.renderer import (FORMATS, DEFAULT_DPI, DEFAULT_MARGIN, build_scene, ensure_application,
+                             export_directory, output_path, render_scene)
+
+
+def parse_formats(text):
+    """
+    Parse a comma-separated list of export formats.
+    """
+    formats = [f.strip().lower() for f in text.split(',') if f.strip()]
+    for format in formats:
+        if format not in FORMATS:
+            raise argparse.ArgumentTypeError(f"unsupported format '{format}' (choose from {', '.join(FORMATS)})")
+    return formats
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Render diagram files to PNG, SVG or PDF.")
+    parser.add_argument('inputs', nargs='+', help="Diagram files (.json or binary) or directories of them")
+    parser.add_argument('-o', '--output',
+                        help="Output file (single input) or directory. Defaults to next to each input.")
+    parser.add_argument('-f', '--formats', type=parse_formats, default=None,
+                        help="Comma-separated formats: png, svg, pdf. Defaults to the output "
+                             "file's extension, or png.")
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI,
+                        help=f"Output resolution (default {DEFAULT_DPI})")
+    parser.add_argument('--margin', type=float, default=DEFAULT_MARGIN,
+                        help=f"Margin around the diagram in scene units (default {DEFAULT_MARGIN})")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Search input directories recursively")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Export in parallel with this many worker processes (0 = one per CPU)")
+    return parser
+
+
+def print_result(result):
+    """
+    Print one line for a finished parallel export.
+    """
+    if result.error:
+        print(f"FAILED {result.source}: {result.error}")
+        return
+    steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in result.timings.items())
+    print(f"ok     {result.source} {result.seconds:.2f}s ({steps}) [pid {result.worker}]")
+
+
+def main_parallel(args, formats):
+    """
+    Export all inputs over a process pool.
+    
+    Returns:
+        int: Number of failed files
+    """
+    from export.batch import export_batch, export_directory_parallel
+    
+    start = time.perf_counter()
+    workers = args.jobs or None
+    results = []
+    files = [source for source in args.inputs if not os.path.isdir(source)]
+    for source in args.inputs:
+        if os.path.isdir(source):
+            results += export_directory_parallel(source, args.output, formats, args.dpi, args.margin,
+                                                 args.recursive, workers, print_result)
+    results += export_batch(files, args.output, formats, args.dpi, args.margin, workers, callback=print_result)
+    
+    failed = sum(1 for result in results if result.error)
+    busy = sum(result.seconds for result in results)
+    print(f"{len(results) - failed} of {len(results)} files exported in {time.perf_counter() - start:.2f}s "
+          f"({busy:.2f}s of work)")
+    return failed
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    ensure_application()
+    
+    # A single input with an output file name
+    single_file = (len(args.inputs) == 1 and os.path.isfile(args.inputs[0]) and args.output
+                   and os.path.splitext(args.output)[1][1:].lower() in FORMATS)
+    formats = args.formats or ([os.path.splitext(args.output)[1][1:].lower()] if single_file else ['png'])
+    
+    if args.jobs is not None and not single_file:
+        return 1 if main_parallel(args, formats) else 0
+    
+    failures = 0
+    for source in args.inputs:
+        start = time.perf_counter()
+        if os.path.isdir(source):
+            results = export_directory(source, args.output, formats, args.dpi, args.margin, args.recursive)
+            failed = sum(1 for _, _, error in results if error is not None)
+            failures += failed
+            print(f"{source}: {len(results) - failed} of {len(results)} files exported "
+                  f"in {time.perf_counter() - start:.2f}s")
+            continue
+        
+        try:
+            scene = build_scene(Diagram.load_from_file(source))
+            for format in formats:
+                if single_file and len(formats) == 1:
+                    filename = args.output
+                else:
+                    filename = output_path(source, args.output, format)
+                if os.path.dirname(filename):
+                    os.makedirs(os.path.dirname(filename), exist_ok=True)
+                render_scene(scene, filename, format, args.dpi, args.margin)
+                print(f"{source} -> {filename} ({time.perf_counter() - start:.2f}s)")
+        except Exception as e:
+            print(f"Error exporting {source}: {e}")
+            failures += 1
+    
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
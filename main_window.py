@@ -1,25 +1,28 @@
 import sys
 import os
-import json
 import math
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QGraphicsEllipseItem,
     QGraphicsLineItem, QGraphicsPathItem, QGraphicsTextItem, QGraphicsItem,
     QVBoxLayout, QHBoxLayout, QWidget, QToolBar, QAction, QColorDialog,
     QUndoStack, QUndoCommand, QToolButton, QFrame, QInputDialog, QFileDialog,
-    QMessageBox, QMenu
+    QMessageBox, QMenu, QProgressDialog
 )
-from PyQt5.QtCore import Qt, QPointF, QRectF, QSize
+from PyQt5.QtCore import Qt, QPointF, QRectF, QSize, QTimer
 from PyQt5.QtGui import QPen, QBrush, QColor, QPainterPath, QIcon
 
 # Import from models
 from models.diagram import Diagram
+from models.persistence import FILE_FILTER, read_diagram, write_diagram
+from models.journal import DiagramJournal, journal_exists, recover
 from models.swimlane import Swimlane
 from models.outcome import Outcome
 from models.scope_blob import ScopeBlob
 
 # Import from views
 from views.diagram_scene import DiagramScene
+from views.diagram_view import DiagramView
+from views.scene_loader import SceneLoader
 from views.swimlane_item import SwimlaneItem
 from views.outcome_item import OutcomeItem
 from views.scope_blob_item import ScopeBlobItem
@@ -29,6 +32,7 @@ from commands.add_blob_command import AddBlobCommand
 from commands.delete_blob_command import DeleteBlobCommand
 from commands.change_color_command import ChangeColorCommand
 from commands.move_command import MoveCommand
+from commands.undo_history import UndoHistory
 
 # Import from styles
 from styles.colors import get_color_palette, DEFAULT_COLORS
@@ -38,6 +42,10 @@ from styles.stylesheet import get_stylesheet
 from utils.geometry import calculate_point_on_line
 from utils.id_generator import generate_id
 
+# Autosave journal, replayed on the next start if the application exits with unsaved changes
+AUTOSAVE_PATH = os.path.join(os.path.expanduser('~'), '.radial_diagram', 'autosave')
+JOURNAL_FLUSH_INTERVAL = 1000  # ms
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -54,15 +62,31 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(central_widget)
         layout = QVBoxLayout(central_widget)
 
-        # Create undo stack
-        self.undo_stack = QUndoStack(self)
+        # Create undo stack, bounded in length and memory
+        self.undo_stack = UndoHistory(self)
 
         # Create diagram and scene
         self.diagram = Diagram()
         self.scene = DiagramScene(self.diagram, self.undo_stack)
+        self.undo_stack.set_scene(self.scene)
+        
+        # Record changes to the autosave journal once the diagram is set up
+        self.journal = DiagramJournal(AUTOSAVE_PATH)
+        self.journal_timer = QTimer(self)
+        self.journal_timer.setInterval(JOURNAL_FLUSH_INTERVAL)
+        self.journal_timer.timeout.connect(self.journal.flush)
+        
+        # Loads files on a worker thread and fills the scene progressively
+        self.loader = SceneLoader(self.scene, read=read_diagram, parent=self)
+        self.loader.progress.connect(self.load_progress)
+        self.loader.finished.connect(self.load_finished)
+        self.loader.failed.connect(self.load_failed)
+        self.loader.canceled.connect(self.load_canceled)
+        self.progress_dialog = None
+        self.previous_diagram = None
         
         # Create view with zoom support
-        self.view = QGraphicsView(self.scene)
+        self.view = DiagramView(self.scene)
         self.view.setDragMode(QGraphicsView.RubberBandDrag)
         layout.addWidget(self.view)
         
@@ -139,6 +163,14 @@ class MainWindow(QMainWindow):
         select_btn.setDefaultAction(select_action)
         toolbar.addWidget(select_btn)
         
+        # Repaint overlay, for checking how much of the view each change repaints
+        repaints_action = QAction('Show Repaints', self)
+        repaints_action.setCheckable(True)
+        repaints_action.triggered.connect(self.view.set_show_repaints)
+        repaints_btn = QToolButton()
+        repaints_btn.setDefaultAction(repaints_action)
+        toolbar.addWidget(repaints_btn)
+        
         # Add separator
         separator3 = QFrame()
         separator3.setFrameShape(QFrame.VLine)
@@ -153,6 +185,22 @@ class MainWindow(QMainWindow):
         color_btn.setDefaultAction(change_color)
         toolbar.addWidget(color_btn)
         
+        # Bulk edits
+        delete_action = QAction('Delete', self)
+        delete_action.setIcon(QIcon.fromTheme('edit-delete'))
+        delete_action.setShortcut('Delete')
+        delete_action.triggered.connect(self.delete_selected)
+        delete_btn = QToolButton()
+        delete_btn.setDefaultAction(delete_action)
+        toolbar.addWidget(delete_btn)
+        
+        distribute_action = QAction('Distribute Swimlanes', self)
+        distribute_action.setIcon(QIcon.fromTheme('view-refresh'))
+        distribute_action.triggered.connect(self.distribute_swimlanes)
+        distribute_btn = QToolButton()
+        distribute_btn.setDefaultAction(distribute_action)
+        toolbar.addWidget(distribute_btn)
+        
         # Add separator
         separator4 = QFrame()
         separator4.setFrameShape(QFrame.VLine)
@@ -174,6 +222,37 @@ class MainWindow(QMainWindow):
         load_btn.setDefaultAction(load_action)
         toolbar.addWidget(load_btn)
 
+    def start_journal(self):
+        """
+        Start recording the current diagram to the autosave journal.
+        """
+        try:
+            os.makedirs(os.path.dirname(AUTOSAVE_PATH), exist_ok=True)
+            self.journal.start(self.diagram)
+            self.journal_timer.start()
+        except Exception as e:
+            print(f"Error starting autosave journal: {e}")
+    
+    def set_diagram(self, diagram):
+        """
+        Show a diagram, replacing the current one, and start its undo history and journal.
+        
+        Args:
+            diagram (Diagram): The diagram
+        """
+        self.diagram = diagram
+        self.scene.diagram = diagram
+        self.scene.center = diagram.center
+        self.scene.init_scene()
+        self.undo_stack.clear()
+        self.start_journal()
+    
+    def closeEvent(self, event):
+        # Keep the journal for recovery only if there are unsaved changes
+        self.journal_timer.stop()
+        self.journal.stop(remove=self.undo_stack.isClean())
+        super().closeEvent(event)
+    
     def add_swimlane(self):
         name, ok = QInputDialog.getText(self, 'Add Swimlane', 'Enter swimlane name:')
         if ok and name:
@@ -199,88 +278,63 @@ class MainWindow(QMainWindow):
                     self.scene.add_outcome(swimlane, distance, label)
 
     def save_diagram(self):
-        filename, _ = QFileDialog.getSaveFileName(self, 'Save Diagram',
-                                                '', 'JSON Files (*.json)')
+        filename, _ = QFileDialog.getSaveFileName(self, 'Save Diagram', '', FILE_FILTER)
         if filename:
-            data = {
-                'swimlanes': [
-                    {
-                        'id': sl.id,
-                        'name': sl.name,
-                        'angle': sl.angle,
-                        'outcomes': [
-                            {
-                                'id': o.id,
-                                'label': o.label,
-                                'distance': o.distance
-                            } for o in sl.outcomes
-                        ]
-                    } for sl in self.diagram.swimlanes.values()
-                ],
-                'blobs': [
-                    {
-                        'id': b.id,
-                        'points': b.points,
-                        'color': {
-                            'r': b.color.red(),
-                            'g': b.color.green(),
-                            'b': b.color.blue(),
-                            'a': b.color.alpha()
-                        },
-                        'label': b.label,
-                        'outcome_ids': [o.id for o in b.outcomes]
-                    } for b in self.diagram.blobs
-                ]
-            }
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
+            try:
+                # Same schema the loader, the journal and the export tool read
+                write_diagram(self.diagram, filename)
+            except Exception as e:
+                print(f"Error saving diagram: {e}")
+                QMessageBox.warning(self, 'Save Diagram', f'Could not save the diagram:\n{e}')
+                return
+            self.undo_stack.setClean()
 
     def load_diagram(self):
-        filename, _ = QFileDialog.getOpenFileName(self, 'Load Diagram',
-                                                '', 'JSON Files (*.json)')
+        filename, _ = QFileDialog.getOpenFileName(self, 'Load Diagram', '', FILE_FILTER)
         if filename:
-            with open(filename, 'r') as f:
-                data = json.load(f)
+            # Parse on a worker thread, then add the items a slice at a time
+            self.previous_diagram = self.diagram
+            self.progress_dialog = QProgressDialog('Loading diagram...', 'Cancel', 0, 0, self)
+            self.progress_dialog.setWindowModality(Qt.WindowModal)
+            self.progress_dialog.setMinimumDuration(200)
+            self.progress_dialog.canceled.connect(self.loader.cancel)
+            self.loader.load(filename)
 
-            # Clear existing diagram
-            self.scene.clear()
-            self.diagram = Diagram()
-            self.scene.diagram = self.diagram
+    def load_progress(self, added, total):
+        if self.progress_dialog is not None:
+            self.progress_dialog.setMaximum(total)
+            self.progress_dialog.setValue(added)
 
-            # Create outcome lookup for blob association
-            outcome_lookup = {}
+    def load_finished(self, diagram):
+        self.close_progress_dialog()
+        self.diagram = diagram
+        self.previous_diagram = None
 
-            # Load swimlanes and outcomes
-            for sl_data in data['swimlanes']:
-                swimlane = self.scene.add_swimlane(sl_data['name'], sl_data['angle'])
-                swimlane.id = sl_data['id']
+        # The loaded diagram is the start of the undo history and the journal
+        self.undo_stack.clear()
+        self.start_journal()
                 
-                for o_data in sl_data['outcomes']:
-                    outcome = self.scene.add_outcome(sl_data['name'],
-                                                   o_data['distance'],
-                                                   o_data['label'])
-                    outcome.id = o_data['id']
-                    outcome_lookup[o_data['id']] = outcome
+    def load_failed(self, message):
+        self.close_progress_dialog()
+        self.restore_previous_diagram()
+        QMessageBox.warning(self, 'Load Diagram', f'Could not load the diagram:\n{message}')
 
-            # Load blobs
-            for b_data in data['blobs']:
-                color = QColor(b_data['color']['r'],
-                             b_data['color']['g'],
-                             b_data['color']['b'],
-                             b_data['color']['a'])
+    def load_canceled(self):
+        self.close_progress_dialog()
+        self.restore_previous_diagram()
                 
-                blob = ScopeBlob(b_data['points'], color, b_data['id'],
-                                label=b_data.get('label', ''))
+    def close_progress_dialog(self):
+        if self.progress_dialog is not None:
+            self.progress_dialog.canceled.disconnect(self.loader.cancel)
+            self.progress_dialog.reset()
+            self.progress_dialog.deleteLater()
+            self.progress_dialog = None
                 
-                # Associate outcomes
-                for outcome_id in b_data['outcome_ids']:
-                    if outcome_id in outcome_lookup:
-                        blob.add_outcome(outcome_lookup[outcome_id])
-                
-                self.diagram.blobs.append(blob)
-                blob_item = ScopeBlobItem(blob, self.scene)
-                self.scene.addItem(blob_item)
-
+    def restore_previous_diagram(self):
+        # Only needed once the loader has started replacing the scene's items
+        if self.previous_diagram is not None and self.scene.diagram is not self.previous_diagram:
+            self.set_diagram(self.previous_diagram)
+        self.previous_diagram = None
 
     def toggle_selection_mode(self, checked):
         self.selection_mode = checked
@@ -296,27 +350,55 @@ class MainWindow(QMainWindow):
             
         color = QColorDialog.getColor(initial=Qt.red, parent=self)
         if color.isValid():
-            command = ChangeColorCommand(items, color)
-            self.undo_stack.push(command)
+            # One undo entry and one repaint for all selected items
+            self.scene.change_items_color(items, color)
+    
+    def delete_selected(self):
+        blob_items = [item for item in self.scene.selectedItems() if isinstance(item, ScopeBlobItem)]
+        if blob_items:
+            self.scene.delete_blobs(blob_items)
+    
+    def distribute_swimlanes(self):
+        selected = [item.swimlane for item in self.scene.selectedItems() if isinstance(item, SwimlaneItem)]
+        # With fewer than two selected, spread all swimlanes
+        self.scene.distribute_swimlanes(selected if len(selected) > 1 else None)
 
 
 def main():
     app = QApplication(sys.argv)
     window = MainWindow()
     
-    # Create some example data
-    # Add swimlanes first
-    window.scene.add_swimlane('DevOps', 0)
-    window.scene.add_swimlane('Channel', 45)
-    window.scene.add_swimlane('Infrastructure', 90)
-    window.scene.add_swimlane('Features', 135)
+    # Offer to recover the changes journaled by a session that did not exit cleanly
+    recovered = None
+    if journal_exists(AUTOSAVE_PATH):
+        answer = QMessageBox.question(window, 'Recover Diagram',
+                                      'Recover unsaved changes from the last session?')
+        if answer == QMessageBox.Yes:
+            try:
+                recovered = recover(AUTOSAVE_PATH)
+            except Exception as e:
+                print(f"Error recovering diagram: {e}")
     
-    # Then add outcomes
-    window.scene.add_outcome('DevOps', 100, 'CI/CD')
-    window.scene.add_outcome('DevOps', 200, 'Monitoring')
-    window.scene.add_outcome('Channel', 100, 'Web')
-    window.scene.add_outcome('Channel', 200, 'Mobile')
-    window.scene.add_outcome('Channel', 300, 'In-Person')
+    if recovered is not None:
+        window.set_diagram(recovered)
+    else:
+        # Create some example data
+        # Add swimlanes first
+        window.scene.add_swimlane('DevOps', 0)
+        window.scene.add_swimlane('Channel', 45)
+        window.scene.add_swimlane('Infrastructure', 90)
+        window.scene.add_swimlane('Features', 135)
+    
+        # Then add outcomes
+        window.scene.add_outcome('DevOps', 100, 'CI/CD')
+        window.scene.add_outcome('DevOps', 200, 'Monitoring')
+        window.scene.add_outcome('Channel', 100, 'Web')
+        window.scene.add_outcome('Channel', 200, 'Mobile')
+        window.scene.add_outcome('Channel', 300, 'In-Person')
+        
+        # The example data is the start of the undo history and the journal
+        window.undo_stack.clear()
+        window.start_journal()
     
     window.show()
     sys.exit(app.exec_())
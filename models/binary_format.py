@@ -0,0 +1,360 @@
+"""
+Compact, versioned binary container format for diagrams.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header      magic, version, flags, center, element counts, section offsets
+    strings     uint32 offsets (count + 1) into the string data section
+    swimlanes   fixed-size records: id, angle, length, label index, color index
+    outcomes    fixed-size records: id, swimlane id, distance, label index
+    blobs       fixed-size records: id, swimlane/outcome ids, label and color
+                indexes, first point index, point count
+    points      contiguous float64 (or float32) x, y pairs for all blobs
+    string data UTF-8 bytes of the deduplicated string table
+    
+All variable-size data lives in the string table and the point array, so
+every section can be read in place from a memory-mapped file.
+"""
+
+import mmap
+import struct
+from array import array
+
+from utils.geometry import point_xy
+
+MAGIC = b'RDGB'
+VERSION = 1
+BINARY_EXTENSION = '.rdgb'
+
+# Header flags
+FLAG_FLOAT32_POINTS = 0x1
+
+_HEADER = struct.Struct('<4sHHddIIIIQQQQQQQ')
+_SWIMLANE = struct.Struct('<qddII')
+_OUTCOME = struct.Struct('<qqdI4x')
+_BLOB = struct.Struct('<qqqqqIIQI4x')
+
+# Stored in id fields for "no reference"; generated IDs start at 1
+_NO_ID = 0
+
+
+def is_binary_file(filename):
+    """
+    Check whether a file starts with the binary diagram magic number.
+    
+    Args:
+        filename (str): Path to the file
+        
+    Returns:
+        bool: True if the file is in the binary format
+    """
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _pack_id(value):
+    """
+    Convert a model ID to its stored integer form.
+    
+    Args:
+        value: The ID, or None
+        
+    Returns:
+        int: The stored ID
+    """
+    if value is None:
+        return _NO_ID
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Binary diagram format requires integer IDs, got {value!r}")
+    return value
+
+
+def _unpack_id(value):
+    """
+    Convert a stored integer back to a model ID.
+    
+    Args:
+        value (int): The stored ID
+        
+    Returns:
+        The ID, or None
+    """
+    return None if value == _NO_ID else value
+
+
+def _align(offset):
+    """
+    Round an offset up to the next multiple of 8.
+    """
+    return (offset + 7) & ~7
+
+
+class _StringTable:
+    """
+    Deduplicating string table used while writing.
+    """
+    
+    def __init__(self):
+        self.strings = []
+        self.indexes = {}
+    
+    def add(self, text):
+        """
+        Add a string and return its index.
+        """
+        text = text or ""
+        index = self.indexes.get(text)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(text)
+            self.indexes[text] = index
+        return index
+
+
+def write_binary(data, fp, precision='float64'):
+    """
+    Write a diagram dictionary (as produced by Diagram.to_dict) in the binary format.
+    
+    Args:
+        data (dict): Dictionary representation of the diagram
+        fp: Binary file object to write to
+        precision (str, optional): 'float64' or 'float32' for blob points. Defaults to 'float64'.
+    """
+    if precision not in ('float64', 'float32'):
+        raise ValueError(f"Unsupported point precision: {precision}")
+    
+    strings = _StringTable()
+    swimlanes = data.get('swimlanes', [])
+    outcomes = data.get('outcomes', [])
+    blobs = data.get('blobs', [])
+    
+    swimlane_bytes = bytearray()
+    for s in swimlanes:
+        swimlane_bytes += _SWIMLANE.pack(
+            _pack_id(s['id']), s['angle'], s.get('length', 250),
+            strings.add(s.get('label')), strings.add(s.get('color')))
+    
+    outcome_bytes = bytearray()
+    for o in outcomes:
+        outcome_bytes += _OUTCOME.pack(
+            _pack_id(o['id']), _pack_id(o['swimlane_id']), o['distance'], strings.add(o.get('label')))
+    
+    points = array('f' if precision == 'float32' else 'd')
+    blob_bytes = bytearray()
+    for b in blobs:
+        first = len(points) // 2
+        for point in b.get('points') or []:
+            points.extend(point_xy(point))
+        blob_bytes += _BLOB.pack(
+            _pack_id(b['id']),
+            _pack_id(b.get('start_swimlane_id')), _pack_id(b.get('end_swimlane_id')),
+            _pack_id(b.get('start_outcome_id')), _pack_id(b.get('end_outcome_id')),
+            strings.add(b.get('label')), strings.add(b.get('color')),
+            first, len(points) // 2 - first)
+    
+    encoded = [s.encode('utf-8') for s in strings.strings]
+    string_offsets = array('I', [0])
+    for text in encoded:
+        string_offsets.append(string_offsets[-1] + len(text))
+    string_offsets = string_offsets.tobytes()
+    string_data = b''.join(encoded)
+    
+    # Lay out the sections after the header
+    sections = [string_offsets, bytes(swimlane_bytes), bytes(outcome_bytes), bytes(blob_bytes),
+                points.tobytes(), string_data]
+    offsets = []
+    offset = _align(_HEADER.size)
+    for section in sections:
+        offsets.append(offset)
+        offset = _align(offset + len(section))
+    
+    center = data.get('center', {'x': 0, 'y': 0})
+    flags = FLAG_FLOAT32_POINTS if precision == 'float32' else 0
+    header = _HEADER.pack(
+        MAGIC, VERSION, flags, center['x'], center['y'],
+        len(encoded), len(swimlanes), len(outcomes), len(blobs), len(points) // 2,
+        *offsets)
+    
+    fp.write(header)
+    position = len(header)
+    for section_offset, section in zip(offsets, sections):
+        fp.write(b'\0' * (section_offset - position))
+        fp.write(section)
+        position = section_offset + len(section)
+
+
+class BinaryDiagramReader:
+    """
+    Reads the binary format in place from a memory-mapped file.
+    
+    Attributes:
+        filename (str): Path to the mapped file
+        version (int): Format version of the file
+        point_typecode (str): array typecode of the point section ('d' or 'f')
+        point_count (int): Total number of blob points in the file
+    """
+    
+    def __init__(self, filename):
+        """
+        Open and memory-map a binary diagram file.
+        
+        Args:
+            filename (str): Path to the file
+            
+        Raises:
+            ValueError: If the file is not a supported binary diagram
+        """
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        
+        if len(self._view) < _HEADER.size:
+            self.close()
+            raise ValueError("File is too short to be a binary diagram")
+        (magic, self.version, flags, self.center_x, self.center_y,
+         self.string_count, self.swimlane_count, self.outcome_count, self.blob_count, self.point_count,
+         self._strings_offset, self._swimlanes_offset, self._outcomes_offset, self._blobs_offset,
+         self._points_offset, self._string_data_offset) = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a binary diagram file")
+        if self.version > VERSION:
+            self.close()
+            raise ValueError(f"Unsupported binary diagram version {self.version}")
+        
+        self.point_typecode = 'f' if flags & FLAG_FLOAT32_POINTS else 'd'
+        string_offsets = self._view[self._strings_offset:self._strings_offset + 4 * (self.string_count + 1)]
+        self._string_offsets = string_offsets.cast('I')
+        self._strings = [None] * self.string_count
+    
+    def close(self):
+        """
+        Release the memory map. Views obtained from points_view become invalid.
+        """
+        if getattr(self, '_string_offsets', None) is not None:
+            self._string_offsets.release()
+            self._string_offsets = None
+        self._view.release()
+        self._mmap.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def string(self, index):
+        """
+        Get a string from the string table, decoding it on first use.
+        
+        Args:
+            index (int): Index in the string table
+            
+        Returns:
+            str: The string
+        """
+        text = self._strings[index]
+        if text is None:
+            start = self._string_data_offset + self._string_offsets[index]
+            end = self._string_data_offset + self._string_offsets[index + 1]
+            text = str(self._view[start:end], 'utf-8')
+            self._strings[index] = text
+        return text
+    
+    def points_view(self):
+        """
+        Get the whole point section as a flat memoryview of x, y values.
+        
+        Returns:
+            memoryview: View of 2 * point_count floats, backed by the mapped file
+        """
+        size = 8 if self.point_typecode == 'd' else 4
+        end = self._points_offset + 2 * size * self.point_count
+        return self._view[self._points_offset:end].cast(self.point_typecode)
+    
+    def iter_swimlanes(self):
+        """
+        Yield swimlane dictionaries in Diagram.to_dict format.
+        """
+        for id, angle, length, label, color in _SWIMLANE.iter_unpack(
+                self._view[self._swimlanes_offset:self._swimlanes_offset + _SWIMLANE.size * self.swimlane_count]):
+            yield {'id': id, 'angle': angle, 'label': self.string(label),
+                   'color': self.string(color), 'length': length}
+    
+    def iter_outcomes(self):
+        """
+        Yield outcome dictionaries in Diagram.to_dict format.
+        """
+        for id, swimlane_id, distance, label in _OUTCOME.iter_unpack(
+                self._view[self._outcomes_offset:self._outcomes_offset + _OUTCOME.size * self.outcome_count]):
+            yield {'id': id, 'swimlane_id': swimlane_id, 'distance': distance, 'label': self.string(label)}
+    
+    def iter_blob_records(self):
+        """
+        Yield raw blob records.
+        
+        Yields:
+            tuple: (blob dict without points, first point index, point count)
+        """
+        for (id, start_swimlane, end_swimlane, start_outcome, end_outcome,
+             label, color, first, count) in _BLOB.iter_unpack(
+                self._view[self._blobs_offset:self._blobs_offset + _BLOB.size * self.blob_count]):
+            blob = {
+                'id': id,
+                'color': self.string(color),
+                'label': self.string(label),
+                'start_swimlane_id': _unpack_id(start_swimlane),
+                'end_swimlane_id': _unpack_id(end_swimlane),
+                'start_outcome_id': _unpack_id(start_outcome),
+                'end_outcome_id': _unpack_id(end_outcome),
+            }
+            yield blob, first, count
+    
+    def to_dict(self, points=True):
+        """
+        Read the whole file into a dictionary in Diagram.to_dict format.
+        
+        Args:
+            points (bool, optional): Copy blob points into 'points' lists. If False,
+                blobs get a 'point_span' [first, count] into points_view() instead.
+                Defaults to True.
+        
+        Returns:
+            dict: Dictionary representation of the diagram
+        """
+        blobs = []
+        if points:
+            view = self.points_view()
+            try:
+                for blob, first, count in self.iter_blob_records():
+                    coords = view[2 * first:2 * (first + count)].tolist()
+                    blob['points'] = [coords[i:i + 2] for i in range(0, len(coords), 2)]
+                    blobs.append(blob)
+            finally:
+                view.release()
+        else:
+            for blob, first, count in self.iter_blob_records():
+                blob['point_span'] = [first, count]
+                blobs.append(blob)
+        
+        return {
+            'center': {'x': self.center_x, 'y': self.center_y},
+            'swimlanes': list(self.iter_swimlanes()),
+            'outcomes': list(self.iter_outcomes()),
+            'blobs': blobs
+        }
+
+
+def read_binary(filename):
+    """
+    Read a binary diagram file into a dictionary in Diagram.to_dict format.
+    
+    Args:
+        filename (str): Path to the file
+        
+    Returns:
+        dict: Dictionary representation of the diagram
+    """
+    with BinaryDiagramReader(filename) as reader:
+        return reader.to_dict()
@@ -0,0 +1,418 @@
+"""
+Columnar (struct-of-arrays) storage backend for Diagram.
+
+Requires numpy; the default object backend does not.
+"""
+
+from utils.geometry import calculate_points_on_lines
+from .diagram import Diagram
+from .swimlane import Swimlane
+from .outcome import Outcome
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+SWIMLANE_FIELDS = (('id', 'int64'), ('angle', 'float64'), ('length', 'float64'))
+OUTCOME_FIELDS = (('id', 'int64'), ('swimlane_id', 'int64'), ('distance', 'float64'))
+
+
+class Columns:
+    """
+    Growable parallel arrays, one row per model object.
+    
+    Each row has a view object (a ColumnarSwimlane or ColumnarOutcome) whose
+    numeric attributes read and write the arrays. Removing a row moves the
+    last row into its place, so rows stay contiguous.
+    
+    Attributes:
+        fields (tuple): (name, dtype) pairs of the columns
+        size (int): Number of rows in use
+        version (int): Incremented on every change, for cache invalidation
+    """
+    
+    def __init__(self, fields, capacity=16):
+        """
+        Initialize empty Columns.
+        
+        Args:
+            fields (tuple): (name, dtype) pairs of the columns
+            capacity (int, optional): Initial number of allocated rows. Defaults to 16.
+        """
+        self.fields = fields
+        self._arrays = {name: np.zeros(capacity, dtype) for name, dtype in fields}
+        self._views = []  # row -> view object
+        self._rows = {}  # id -> row
+        self.size = 0
+        self.version = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def column(self, name):
+        """
+        Get a column as an array view of the rows in use, without copying.
+        
+        Args:
+            name (str): Name of the column
+            
+        Returns:
+            numpy.ndarray: The column
+        """
+        return self._arrays[name][:self.size]
+    
+    def get(self, name, row):
+        """
+        Get one value as a Python scalar.
+        """
+        return self._arrays[name].item(row)
+    
+    def set(self, name, row, value):
+        """
+        Set one value.
+        """
+        self._arrays[name][row] = value
+        self.version += 1
+    
+    def row_of(self, id):
+        """
+        Get the row of an object by ID, or None if it is not stored here.
+        """
+        return self._rows.get(id)
+    
+    def append(self, view, id):
+        """
+        Reserve a row for a view object.
+        
+        Args:
+            view: The view object; its ``_columns`` and ``_row`` are updated
+            id (int): ID of the object
+            
+        Raises:
+            ValueError: If the ID is not an integer
+        """
+        if isinstance(id, bool) or not isinstance(id, int):
+            raise ValueError(f"Columnar storage requires integer IDs, got {id!r}")
+        
+        capacity = len(self._arrays['id'])
+        if self.size == capacity:
+            for name, array in self._arrays.items():
+                grown = np.zeros(capacity * 2, array.dtype)
+                grown[:capacity] = array
+                self._arrays[name] = grown
+        
+        row = self.size
+        self._arrays['id'][row] = id
+        self._views.append(view)
+        self._rows[id] = row
+        self.size += 1
+        self.version += 1
+        view._columns = self
+        view._row = row
+    
+    def detach(self, view):
+        """
+        Remove a view's row, moving the view to private single-row Columns.
+        
+        The view keeps its values and can be added to a diagram again later
+        (e.g. by undo).
+        
+        Args:
+            view: The view object to detach
+        """
+        row = self._rows.pop(view.id)
+        values = [(name, self._arrays[name][row]) for name, _ in self.fields]
+        
+        last = self.size - 1
+        if row != last:
+            for array in self._arrays.values():
+                array[row] = array[last]
+            moved = self._views[last]
+            self._views[row] = moved
+            self._rows[moved.id] = row
+            moved._row = row
+        self._views.pop()
+        self.size -= 1
+        self.version += 1
+        
+        private = Columns(self.fields, capacity=1)
+        private.append(view, view.id)
+        for name, value in values:
+            private._arrays[name][0] = value
+    
+    def adopt(self, obj, view_class):
+        """
+        Store an object in these columns.
+        
+        Args:
+            obj: A plain model object, or a view object stored elsewhere
+            view_class: View class to wrap plain objects in
+            
+        Returns:
+            The view object now stored in these columns
+        """
+        if isinstance(obj, view_class):
+            if obj._columns is self:
+                return obj
+            # Move a detached view back in, keeping its identity
+            source, source_row = obj._columns, obj._row
+            self.append(obj, obj.id)
+            for name, _ in self.fields:
+                self._arrays[name][obj._row] = source._arrays[name][source_row]
+            return obj
+        
+        view = view_class.__new__(view_class)
+        self.append(view, obj.id)
+        view.copy_from(obj)
+        return view
+    
+    def check(self):
+        """
+        Check that rows, IDs and views agree.
+        
+        Returns:
+            list: Descriptions of any inconsistencies found
+        """
+        problems = []
+        if len(self._views) != self.size or len(self._rows) != self.size:
+            problems.append(f"Column size {self.size} != {len(self._views)} views, {len(self._rows)} IDs")
+        for row, view in enumerate(self._views):
+            if view._row != row or self._rows.get(view.id) != row or self.get('id', row) != view.id:
+                problems.append(f"Row {row} does not match object {view.id}")
+        return problems
+
+
+class ColumnarSwimlane(Swimlane):
+    """
+    Swimlane whose angle and length live in a diagram's swimlane Columns.
+    """
+    
+    __slots__ = ('_columns', '_row')
+    
+    def copy_from(self, swimlane):
+        """
+        Initialize from a plain swimlane after a row has been reserved.
+        """
+        Swimlane.__init__(self, swimlane.label, swimlane.angle, swimlane._rgba, swimlane.id, swimlane.length)
+        self.outcomes = swimlane.outcomes
+        self.item = swimlane.item
+    
+    @property
+    def angle(self):
+        return self._columns.get('angle', self._row)
+    
+    @angle.setter
+    def angle(self, value):
+        self._columns.set('angle', self._row, value)
+    
+    @property
+    def length(self):
+        return self._columns.get('length', self._row)
+    
+    @length.setter
+    def length(self, value):
+        self._columns.set('length', self._row, value)
+
+
+class ColumnarOutcome(Outcome):
+    """
+    Outcome whose swimlane ID and distance live in a diagram's outcome Columns.
+    """
+    
+    __slots__ = ('_columns', '_row')
+    
+    def copy_from(self, outcome):
+        """
+        Initialize from a plain outcome after a row has been reserved.
+        """
+        Outcome.__init__(self, outcome.swimlane_id, outcome.distance, outcome.label, outcome.id)
+        self.item = outcome.item
+        self.associated_blobs = outcome.associated_blobs
+    
+    @property
+    def swimlane_id(self):
+        return self._columns.get('swimlane_id', self._row)
+    
+    @swimlane_id.setter
+    def swimlane_id(self, value):
+        self._columns.set('swimlane_id', self._row, value)
+    
+    @property
+    def distance(self):
+        return self._columns.get('distance', self._row)
+    
+    @distance.setter
+    def distance(self, value):
+        self._columns.set('distance', self._row, value)
+
+
+class ColumnarDiagram(Diagram):
+    """
+    Diagram storing swimlane and outcome geometry in parallel numpy arrays.
+    
+    The API is the same as Diagram's. The objects in ``swimlanes`` and
+    ``outcomes`` are ColumnarSwimlane/ColumnarOutcome views onto the arrays,
+    so add_swimlane and add_outcome return a view instead of the object passed
+    in when that object is a plain Swimlane or Outcome. Callers must keep the
+    returned object.
+    
+    Whole-diagram computations such as outcome_positions run as single
+    vectorized passes over the arrays.
+    """
+    
+    storage = 'columnar'
+    
+    def __init__(self, center=None):
+        """
+        Initialize a new ColumnarDiagram.
+        
+        Args:
+            center (QPointF, optional): Center point of the diagram. Defaults to (0, 0).
+            
+        Raises:
+            ImportError: If numpy is not installed
+        """
+        if np is None:
+            raise ImportError("The columnar diagram backend requires numpy")
+        super().__init__(center)
+        self.swimlane_columns = Columns(SWIMLANE_FIELDS)
+        self.outcome_columns = Columns(OUTCOME_FIELDS)
+        self._positions = None  # (cache key, ids, xs, ys)
+    
+    def add_swimlane(self, swimlane_or_angle, label="", color=None, length=250):
+        """
+        Add a new swimlane to the diagram.
+        
+        Args:
+            swimlane_or_angle: Either a Swimlane object or an angle in degrees from the center
+            label (str, optional): Text label for the swimlane. Defaults to "".
+            color (QColor, optional): Color of the swimlane. Defaults to None.
+            length (float, optional): Length of the swimlane from center. Defaults to 250.
+            
+        Returns:
+            ColumnarSwimlane: The swimlane as stored in the diagram
+        """
+        if isinstance(swimlane_or_angle, Swimlane):
+            swimlane = swimlane_or_angle
+        else:
+            swimlane = Swimlane(label, swimlane_or_angle, color, length=length)
+        swimlane = self.swimlane_columns.adopt(swimlane, ColumnarSwimlane)
+        return super().add_swimlane(swimlane)
+    
+    def add_outcome(self, outcome_or_swimlane_id, distance=None, label=""):
+        """
+        Add a new outcome to the diagram.
+        
+        Args:
+            outcome_or_swimlane_id: Either an Outcome object or the ID of the swimlane this outcome belongs to
+            distance (float, optional): Distance from center along the swimlane. Required if outcome_or_swimlane_id is not an Outcome.
+            label (str, optional): Text label for the outcome. Defaults to "".
+            
+        Returns:
+            ColumnarOutcome: The outcome as stored in the diagram
+        """
+        if isinstance(outcome_or_swimlane_id, Outcome):
+            outcome = outcome_or_swimlane_id
+        else:
+            if distance is None:
+                raise ValueError("Distance must be provided when adding an outcome by swimlane_id")
+            outcome = Outcome(outcome_or_swimlane_id, distance, label)
+        outcome = self.outcome_columns.adopt(outcome, ColumnarOutcome)
+        return super().add_outcome(outcome)
+    
+    def remove_outcome(self, outcome_id):
+        """
+        Remove an outcome from the diagram.
+        
+        Args:
+            outcome_id (int): ID of the outcome to remove
+        """
+        outcome = self.outcomes.get(outcome_id)
+        super().remove_outcome(outcome_id)
+        if outcome is not None:
+            self.outcome_columns.detach(outcome)
+    
+    def remove_swimlane(self, swimlane_id):
+        """
+        Remove a swimlane from the diagram.
+        
+        Args:
+            swimlane_id (int): ID of the swimlane to remove
+        """
+        swimlane = self.swimlanes.get(swimlane_id)
+        outcomes = self.get_outcomes_for_swimlane(swimlane_id)
+        super().remove_swimlane(swimlane_id)
+        if swimlane is not None:
+            for outcome in outcomes:
+                self.outcome_columns.detach(outcome)
+            self.swimlane_columns.detach(swimlane)
+    
+    def outcome_position_arrays(self):
+        """
+        Compute the scene position of every outcome in one vectorized pass.
+        
+        The result is cached until a swimlane, an outcome or the center changes.
+        Outcomes whose swimlane is not in the diagram get NaN coordinates.
+        
+        Returns:
+            tuple: (ids, xs, ys) numpy arrays, in storage order
+        """
+        key = (self.swimlane_columns.version, self.outcome_columns.version,
+               self.center.x(), self.center.y())
+        if self._positions is not None and self._positions[0] == key:
+            return self._positions[1:]
+        
+        lanes = self.swimlane_columns
+        outcomes = self.outcome_columns
+        lane_ids = lanes.column('id')
+        order = np.argsort(lane_ids)
+        sorted_ids = lane_ids[order]
+        
+        # Find each outcome's swimlane row
+        swimlane_ids = outcomes.column('swimlane_id')
+        pos = np.searchsorted(sorted_ids, swimlane_ids)
+        pos[pos == len(sorted_ids)] = 0
+        found = sorted_ids[pos] == swimlane_ids if len(sorted_ids) else np.zeros(len(swimlane_ids), bool)
+        angles = np.full(len(swimlane_ids), np.nan)
+        if len(sorted_ids):
+            angles[found] = lanes.column('angle')[order[pos[found]]]
+        
+        positions = calculate_points_on_lines(self.center, np.radians(angles), outcomes.column('distance'),
+                                              use_numpy=True)
+        xs = positions[:, 0]
+        ys = positions[:, 1]
+        ids = outcomes.column('id').copy()
+        
+        self._positions = (key, ids, xs, ys)
+        return ids, xs, ys
+    
+    def outcome_positions(self):
+        """
+        Compute the scene position of every outcome.
+        
+        Outcomes whose swimlane is not in the diagram are skipped.
+        
+        Returns:
+            dict: outcome_id -> (x, y)
+        """
+        ids, xs, ys = self.outcome_position_arrays()
+        placed = ~np.isnan(xs)
+        ids, xs, ys = ids[placed], xs[placed], ys[placed]
+        return dict(zip(ids.tolist(), zip(xs.tolist(), ys.tolist())))
+    
+    def check_consistency(self):
+        """
+        Check the reverse indexes and the column storage against the primary collections.
+        
+        Returns:
+            list: Descriptions of any inconsistencies found (empty if consistent)
+        """
+        problems = super().check_consistency()
+        problems.extend(self.swimlane_columns.check())
+        problems.extend(self.outcome_columns.check())
+        if set(self.swimlane_columns._rows) != set(self.swimlanes):
+            problems.append("Swimlane columns do not match swimlanes")
+        if set(self.outcome_columns._rows) != set(self.outcomes):
+            problems.append("Outcome columns do not match outcomes")
+        return problems
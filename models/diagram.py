@@ -3,12 +3,47 @@ Diagram model class representing the entire project diagram.
 """
 
 import json
+import math
+import os
 from PyQt5.QtCore import QPointF
 from PyQt5.QtGui import QColor
 
 from .swimlane import Swimlane
 from .outcome import Outcome
 from .scope_blob import ScopeBlob
+from .binary_format import BINARY_EXTENSION, BinaryDiagramReader, is_binary_file, write_binary
+from .point_store import PointStore
+from utils import fast_json
+from utils.atomic_file import atomic_output
+from utils.geometry import calculate_points_on_lines
+from utils.id_generator import reserve_id
+
+# Version of the to_dict() schema written to diagram files (see models.persistence)
+SCHEMA_VERSION = 1
+
+STORAGES = ('objects', 'columnar')
+
+
+def diagram_class(storage='objects'):
+    """
+    Get the Diagram class implementing a storage backend.
+    
+    Args:
+        storage (str, optional): 'objects' (one Python object per swimlane and outcome)
+            or 'columnar' (numpy arrays, see models.columnar). Defaults to 'objects'.
+            
+    Returns:
+        type: Diagram or a subclass; use its constructor, from_dict or load_from_file
+        
+    Raises:
+        ValueError: If the storage backend is unknown
+    """
+    if storage == 'objects':
+        return Diagram
+    if storage == 'columnar':
+        from .columnar import ColumnarDiagram
+        return ColumnarDiagram
+    raise ValueError(f"Unknown diagram storage: {storage}")
 
 
 class Diagram:
@@ -20,8 +55,21 @@ class Diagram:
         swimlanes (dict): Dictionary of swimlanes by ID
         outcomes (dict): Dictionary of outcomes by ID
         blobs (list): List of scope blobs
+        storage (str): Name of the storage backend ('objects' for this class)
+        journal (DiagramJournal): Journal recording changes, if any (see models.journal)
+        changed (dict): IDs of the swimlanes, outcomes and blobs added, changed or
+            removed since take_changes() was last called, or None before it is
+        
+    Reverse indexes (swimlane -> outcomes, outcome -> blobs) are maintained by the
+    add_*/remove_* methods so cascading deletes only touch the affected objects.
+    The add_* methods also reserve the IDs of the objects they add (e.g. loaded
+    ones), so objects created later never get an ID already in use. Removed
+    blobs keep a copy of their points, and the point store is compacted once
+    more than half of it belongs to removed or replaced blobs.
     """
     
+    storage = 'objects'
+    
     def __init__(self, center=None):
         """
         Initialize a new Diagram.
@@ -33,6 +81,17 @@ class Diagram:
         self.swimlanes = {}
         self.outcomes = {}
         self.blobs = []
+        
+        # Flat buffer holding the points of every blob
+        self.point_store = PointStore()
+        
+        # Reverse indexes, kept in sync by add_*/remove_*/move_outcome
+        self._blobs_by_id = {}
+        self._outcomes_by_swimlane = {}  # swimlane_id -> {outcome_id: outcome}
+        self._blobs_by_outcome = {}  # outcome_id -> {blob_id: blob}
+    
+        self.journal = None
+        self.changed = None
     
     def add_swimlane(self, swimlane_or_angle, label="", color=None, length=250):
         """
@@ -52,7 +111,10 @@ class Diagram:
         else:
             swimlane = Swimlane(label, swimlane_or_angle, color, length=length)
         
+        reserve_id(swimlane.id)
         self.swimlanes[swimlane.id] = swimlane
+        self._outcomes_by_swimlane.setdefault(swimlane.id, {})
+        self._record('add', 'swimlanes', swimlane)
         return swimlane
     
     def add_outcome(self, outcome_or_swimlane_id, distance=None, label=""):
@@ -76,23 +138,101 @@ class Diagram:
                 raise ValueError("Distance must be provided when adding an outcome by swimlane_id")
             outcome = Outcome(outcome_or_swimlane_id, distance, label)
         
+        reserve_id(outcome.id)
         self.outcomes[outcome.id] = outcome
+        self._outcomes_by_swimlane.setdefault(outcome.swimlane_id, {})[outcome.id] = outcome
+        self._record('add', 'outcomes', outcome)
         return outcome
     
-    def add_blob(self, points, color=None, label=""):
+    def move_outcome(self, outcome, swimlane_id, distance=None):
+        """
+        Move an outcome to a (possibly different) swimlane, keeping indexes in sync.
+        
+        Args:
+            outcome (Outcome): The outcome to move
+            swimlane_id: ID of the swimlane the outcome now belongs to
+            distance (float, optional): New distance from center. Defaults to None (unchanged).
+        """
+        if outcome.swimlane_id != swimlane_id:
+            self._outcomes_by_swimlane.get(outcome.swimlane_id, {}).pop(outcome.id, None)
+            outcome.swimlane_id = swimlane_id
+            if outcome.id in self.outcomes:
+                self._outcomes_by_swimlane.setdefault(swimlane_id, {})[outcome.id] = outcome
+        if distance is not None:
+            outcome.distance = distance
+        self._record('update', 'outcomes', outcome)
+    
+    def record_change(self, kind, obj):
+        """
+        Note that an object's color, label or geometry was changed in place,
+        so the journal (if any) records it.
+        
+        Args:
+            kind (str): 'swimlanes', 'outcomes' or 'blobs'
+            obj: The swimlane, outcome or blob
+        """
+        self._record('update', kind, obj)
+    
+    def take_changes(self):
+        """
+        Get the IDs of the objects added, changed or removed since the last
+        call, and start collecting them again.
+        
+        Collecting starts with the first call, which returns None.
+        
+        Returns:
+            dict: 'swimlanes', 'outcomes' and 'blobs', each a set of IDs, or None
+        """
+        changed = self.changed
+        self.changed = {'swimlanes': set(), 'outcomes': set(), 'blobs': set()}
+        return changed
+    
+    def _record(self, op, kind, obj):
+        """
+        Pass a change to the journal, if any, and note the changed object's ID.
+        
+        Args:
+            op (str): 'add', 'update' or 'remove'
+            kind (str): 'swimlanes', 'outcomes' or 'blobs'
+            obj: The object, or its ID for 'remove'
+        """
+        if self.changed is not None:
+            self.changed[kind].add(obj if op == 'remove' else obj.id)
+        if self.journal is not None:
+            self.journal.record(op, kind, obj)
+    
+    def add_blob(self, blob_or_points, color=None, label=""):
         """
         Add a new scope blob to the diagram.
         
         Args:
-            points (list): List of points defining the blob's shape
+            blob_or_points: Either a ScopeBlob object or a list of points defining the blob's shape
             color (QColor, optional): Color of the blob. Defaults to None.
             label (str, optional): Text label for the blob. Defaults to "".
             
         Returns:
             ScopeBlob: The newly created blob
         """
-        blob = ScopeBlob(points, color, label=label)
+        if isinstance(blob_or_points, ScopeBlob):
+            blob = blob_or_points
+        else:
+            blob = ScopeBlob(blob_or_points, color, label=label)
+        
+        # Move the points into the shared store
+        if blob.store is not self.point_store:
+            blob.use_store(self.point_store)
+        
+        reserve_id(blob.id)
         self.blobs.append(blob)
+        self._blobs_by_id[blob.id] = blob
+        
+        # Index the blob under the outcomes it connects
+        for outcome in (blob.start_outcome, blob.end_outcome):
+            if outcome:
+                self._blobs_by_outcome.setdefault(outcome.id, {})[blob.id] = blob
+                if blob not in outcome.associated_blobs:
+                    outcome.associated_blobs.append(blob)
+        self._record('add', 'blobs', blob)
         return blob
     
     def remove_blob(self, blob):
@@ -102,25 +242,93 @@ class Diagram:
         Args:
             blob (ScopeBlob): The blob to remove
         """
-        if blob in self.blobs:
-            # Safe removal from outcomes
-            try:
-                if hasattr(blob, 'start_outcome') and blob.start_outcome:
-                    if hasattr(blob.start_outcome, 'associated_blobs'):
-                        if blob in blob.start_outcome.associated_blobs:
-                            blob.start_outcome.associated_blobs.remove(blob)
-            except Exception as e:
-                print(f"Error removing from start outcome: {e}")
+        if blob.id in self._blobs_by_id:
+            self._unindex_blob(blob)
+            self.blobs.remove(blob)
+            self._record('remove', 'blobs', blob.id)
+            self._compact_points()
                 
-            try:
-                if hasattr(blob, 'end_outcome') and blob.end_outcome:
-                    if hasattr(blob.end_outcome, 'associated_blobs'):
-                        if blob in blob.end_outcome.associated_blobs:
-                            blob.end_outcome.associated_blobs.remove(blob)
-            except Exception as e:
-                print(f"Error removing from end outcome: {e}")
+    def _remove_blobs(self, blobs):
+        """
+        Remove several blobs from the diagram in a single pass over the blob list.
                 
-            self.blobs.remove(blob)
+        Args:
+            blobs (list): The blobs to remove
+        """
+        removed = set()
+        for blob in blobs:
+            if blob.id in self._blobs_by_id and blob.id not in removed:
+                self._unindex_blob(blob)
+                removed.add(blob.id)
+        
+        if removed:
+            self.blobs[:] = [b for b in self.blobs if b.id not in removed]
+            if self.changed is not None:
+                self.changed['blobs'].update(removed)
+            self._compact_points()
+    
+    def _release_points(self, blob):
+        """
+        Give a blob its own copy of its points and mark its span in the
+        point store as dead.
+        
+        Args:
+            blob (ScopeBlob): The blob
+        """
+        if blob.store is self.point_store:
+            self.point_store.release(blob.point_count)
+            blob.detach_store()
+    
+    def _compact_points(self):
+        """
+        Compact the point store once more than half of it is dead, so removed
+        and replaced blobs do not grow it without bound.
+        """
+        if self.point_store.is_sparse:
+            self.point_store.compact(self.blobs)
+    
+    def set_blob_points(self, blob, points):
+        """
+        Replace the points of a blob in the diagram.
+        
+        Args:
+            blob (ScopeBlob): The blob
+            points (list): The new points
+        """
+        self._release_points(blob)
+        blob.points = points
+        blob.use_store(self.point_store)
+        self._compact_points()
+    
+    def _unindex_blob(self, blob):
+        """
+        Drop a blob from the reverse indexes and its outcomes' associated blobs.
+        
+        Args:
+            blob (ScopeBlob): The blob being removed
+        """
+        del self._blobs_by_id[blob.id]
+        self._release_points(blob)
+        for outcome in (blob.start_outcome, blob.end_outcome):
+            if outcome:
+                self._blobs_by_outcome.get(outcome.id, {}).pop(blob.id, None)
+        
+        # Safe removal from outcomes
+        try:
+            if hasattr(blob, 'start_outcome') and blob.start_outcome:
+                if hasattr(blob.start_outcome, 'associated_blobs'):
+                    if blob in blob.start_outcome.associated_blobs:
+                        blob.start_outcome.associated_blobs.remove(blob)
+        except Exception as e:
+            print(f"Error removing from start outcome: {e}")
+        
+        try:
+            if hasattr(blob, 'end_outcome') and blob.end_outcome:
+                if hasattr(blob.end_outcome, 'associated_blobs'):
+                    if blob in blob.end_outcome.associated_blobs:
+                        blob.end_outcome.associated_blobs.remove(blob)
+        except Exception as e:
+            print(f"Error removing from end outcome: {e}")
     
     def remove_outcome(self, outcome_id):
         """
@@ -130,18 +338,14 @@ class Diagram:
             outcome_id (int): ID of the outcome to remove
         """
         if outcome_id in self.outcomes:
-            outcome = self.outcomes[outcome_id]
             # Remove any blobs connected to this outcome
-            blobs_to_remove = []
-            for blob in self.blobs:
-                if blob.start_outcome == outcome or blob.end_outcome == outcome:
-                    blobs_to_remove.append(blob)
-            
-            for blob in blobs_to_remove:
-                self.remove_blob(blob)
+            self._remove_blobs(self.get_blobs_for_outcome(outcome_id))
             
             # Remove the outcome
-            del self.outcomes[outcome_id]
+            outcome = self.outcomes.pop(outcome_id)
+            self._outcomes_by_swimlane.get(outcome.swimlane_id, {}).pop(outcome_id, None)
+            self._blobs_by_outcome.pop(outcome_id, None)
+            self._record('remove', 'outcomes', outcome_id)
     
     def remove_swimlane(self, swimlane_id):
         """
@@ -151,17 +355,119 @@ class Diagram:
             swimlane_id (int): ID of the swimlane to remove
         """
         if swimlane_id in self.swimlanes:
-            # Remove all outcomes on this swimlane
-            outcomes_to_remove = []
-            for outcome_id, outcome in self.outcomes.items():
-                if outcome.swimlane_id == swimlane_id:
-                    outcomes_to_remove.append(outcome_id)
+            # Remove all outcomes on this swimlane, and their blobs in one pass
+            outcomes = self._outcomes_by_swimlane.pop(swimlane_id, {})
+            blobs = []
+            for outcome_id in outcomes:
+                blobs.extend(self.get_blobs_for_outcome(outcome_id))
+            self._remove_blobs(blobs)
             
-            for outcome_id in outcomes_to_remove:
-                self.remove_outcome(outcome_id)
+            for outcome_id in outcomes:
+                del self.outcomes[outcome_id]
+                self._blobs_by_outcome.pop(outcome_id, None)
+            if self.changed is not None:
+                self.changed['outcomes'].update(outcomes)
             
             # Remove the swimlane
             del self.swimlanes[swimlane_id]
+            self._record('remove', 'swimlanes', swimlane_id)
+    
+    def get_outcomes_for_swimlane(self, swimlane_id):
+        """
+        Get the outcomes on a swimlane.
+        
+        Args:
+            swimlane_id: ID of the swimlane
+            
+        Returns:
+            list: Outcomes on the swimlane
+        """
+        return list(self._outcomes_by_swimlane.get(swimlane_id, {}).values())
+    
+    def get_blobs_for_outcome(self, outcome_id):
+        """
+        Get the blobs that start or end at an outcome.
+        
+        Args:
+            outcome_id: ID of the outcome
+            
+        Returns:
+            list: Blobs touching the outcome
+        """
+        return list(self._blobs_by_outcome.get(outcome_id, {}).values())
+    
+    def get_blob_by_id(self, blob_id):
+        """
+        Get a blob by its ID.
+        
+        Args:
+            blob_id: ID of the blob to get
+            
+        Returns:
+            ScopeBlob: The blob with the given ID, or None if not found
+        """
+        return self._blobs_by_id.get(blob_id)
+    
+    def outcome_positions(self):
+        """
+        Compute the scene position of every outcome.
+        
+        Outcomes whose swimlane is not in the diagram are skipped.
+        
+        Returns:
+            dict: outcome_id -> (x, y)
+        """
+        ids = []
+        angles = []
+        distances = []
+        for outcome in self.outcomes.values():
+            swimlane = self.swimlanes.get(outcome.swimlane_id)
+            if swimlane:
+                ids.append(outcome.id)
+                angles.append(math.radians(swimlane.angle))
+                distances.append(outcome.distance)
+        
+        points = calculate_points_on_lines(self.center, angles, distances, use_numpy=False)
+        return dict(zip(ids, points))
+    
+    def check_consistency(self):
+        """
+        Check the reverse indexes against the primary collections.
+        
+        Rebuilds the indexes from scratch and compares them with the incrementally
+        maintained ones. Intended for tests and debugging.
+        
+        Returns:
+            list: Descriptions of any inconsistencies found (empty if consistent)
+        """
+        problems = []
+        
+        expected_outcomes = {}
+        for outcome in self.outcomes.values():
+            expected_outcomes.setdefault(outcome.swimlane_id, set()).add(outcome.id)
+        actual_outcomes = {sid: set(ids) for sid, ids in self._outcomes_by_swimlane.items() if ids}
+        for swimlane_id in set(expected_outcomes) | set(actual_outcomes):
+            expected = expected_outcomes.get(swimlane_id, set())
+            actual = actual_outcomes.get(swimlane_id, set())
+            if expected != actual:
+                problems.append(f"Swimlane {swimlane_id}: indexed outcomes {sorted(actual)} != {sorted(expected)}")
+        
+        expected_blobs = {}
+        for blob in self.blobs:
+            for outcome in (blob.start_outcome, blob.end_outcome):
+                if outcome:
+                    expected_blobs.setdefault(outcome.id, set()).add(blob.id)
+        actual_blobs = {oid: set(ids) for oid, ids in self._blobs_by_outcome.items() if ids}
+        for outcome_id in set(expected_blobs) | set(actual_blobs):
+            expected = expected_blobs.get(outcome_id, set())
+            actual = actual_blobs.get(outcome_id, set())
+            if expected != actual:
+                problems.append(f"Outcome {outcome_id}: indexed blobs {sorted(actual)} != {sorted(expected)}")
+        
+        if set(self._blobs_by_id) != {blob.id for blob in self.blobs}:
+            problems.append("Blob ID index does not match blob list")
+        
+        return problems
     
     def get_swimlane_by_id(self, swimlane_id):
         """
@@ -195,58 +501,105 @@ class Diagram:
             dict: Dictionary representation of the diagram
         """
         return {
+            'version': SCHEMA_VERSION,
             'center': {'x': self.center.x(), 'y': self.center.y()},
             'swimlanes': [s.to_dict() for s in self.swimlanes.values()],
             'outcomes': [o.to_dict() for o in self.outcomes.values()],
             'blobs': [b.to_dict() for b in self.blobs]
         }
     
-    def save_to_file(self, filename):
+    def save_to_file(self, filename, format=None, precision='float64', fast=False, fsync=True):
         """
-        Save the diagram to a JSON file.
+        Save the diagram to a JSON or binary file.
+        
+        The file is replaced atomically: the diagram is written to a temporary
+        file in the same directory, flushed to disk and renamed over filename,
+        so a crash or error while saving leaves the previous file intact.
         
         Args:
             filename (str): Path to the file to save to
+            format (str, optional): 'json' or 'binary'. Defaults to None (binary for
+                files ending in BINARY_EXTENSION, JSON otherwise).
+            precision (str, optional): Point precision for the binary format,
+                'float64' or 'float32'. Defaults to 'float64'.
+            fast (bool, optional): For JSON, serialize the whole document to compact
+                bytes in memory (with orjson if installed) and write it in one call,
+                instead of streaming indented JSON. Defaults to False.
+            fsync (bool, optional): Flush the file to disk before replacing the old
+                one. Defaults to True.
         """
-        with open(filename, 'w') as f:
-            json.dump(self.to_dict(), f, indent=2)
+        if format is None:
+            format = 'binary' if filename.endswith(BINARY_EXTENSION) else 'json'
+        if format not in ('binary', 'json'):
+            raise ValueError(f"Unknown diagram file format: {format}")
+        
+        # Rewriting the file the points are mapped from would corrupt them, and
+        # a mapped file cannot be replaced on every platform
+        if self.point_store.is_mapped and os.path.exists(filename) and \
+                os.path.samefile(filename, self.point_store.filename):
+            self.point_store.close()
+        
+        with atomic_output(filename, fsync=fsync) as temp_path:
+            if format == 'binary':
+                with open(temp_path, 'wb') as f:
+                    write_binary(self.to_dict(), f, precision)
+            elif fast:
+                data = fast_json.dumps(self.to_dict())
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+            else:
+                with open(temp_path, 'w') as f:
+                    json.dump(self.to_dict(), f, indent=2)
     
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, point_store=None):
         """
         Create a Diagram from a dictionary.
         
+        Data of older schema versions is migrated first (see models.persistence).
+        
         Args:
             data (dict): Dictionary containing diagram data
+            point_store (PointStore, optional): Store that blob 'point_span' entries
+                refer to. Defaults to None.
             
         Returns:
             Diagram: New diagram instance
+            
+        Raises:
+            ValueError: If the data is from a newer version of the application
         """
+        from .persistence import migrate
+        
+        data = migrate(data)
         center = QPointF(data['center']['x'], data['center']['y'])
         diagram = cls(center)
+        if point_store is not None:
+            diagram.point_store = point_store
         
         # Create swimlanes
         for swimlane_data in data.get('swimlanes', []):
-            swimlane = Swimlane.from_dict(swimlane_data)
-            diagram.swimlanes[swimlane.id] = swimlane
+            diagram.add_swimlane(Swimlane.from_dict(swimlane_data))
         
         # Create outcomes
         for outcome_data in data.get('outcomes', []):
-            outcome = Outcome.from_dict(outcome_data)
-            diagram.outcomes[outcome.id] = outcome
+            diagram.add_outcome(Outcome.from_dict(outcome_data))
         
         # Create blobs
         for blob_data in data.get('blobs', []):
-            color = QColor(blob_data.get('color', QColor(255, 0, 0, 50).name()))
-            blob = ScopeBlob.from_dict(blob_data, diagram.swimlanes, diagram.outcomes)
-            diagram.blobs.append(blob)
+            blob = ScopeBlob.from_dict(blob_data, diagram.swimlanes, diagram.outcomes, point_store)
+            diagram.add_blob(blob)
         
         return diagram
     
     @classmethod
     def load_from_file(cls, filename):
         """
-        Load a diagram from a JSON file.
+        Load a diagram from a JSON or binary file.
+        
+        The format is detected from the file contents. Blob points of binary files
+        are not copied: they are read in place from the memory-mapped file until
+        the diagram's point store is modified or closed.
         
         Args:
             filename (str): Path to the file to load from
@@ -254,6 +607,41 @@ class Diagram:
         Returns:
             Diagram: Loaded diagram instance
         """
-        with open(filename, 'r') as f:
-            data = json.load(f)
+        if is_binary_file(filename):
+            reader = BinaryDiagramReader(filename)
+            try:
+                data = reader.to_dict(points=False)
+            except Exception:
+                reader.close()
+                raise
+            return cls.from_dict(data, PointStore.from_reader(reader))
+        
+        with open(filename, 'rb') as f:
+            data = fast_json.loads(f.read())
         return cls.from_dict(data)
+
+    @classmethod
+    def stream_from_file(cls, filename, callback=None):
+        """
+        Load a diagram from a JSON file incrementally.
+        
+        Unlike load_from_file, the file is tokenized in chunks and each object is
+        added as soon as it is parsed, so a callback can start using the diagram
+        before the whole file has been read. Files in an older schema are
+        read whole and migrated first (see models.persistence). This is a
+        library entry point; the application's SceneLoader reads files with
+        load_from_file.
+        
+        Args:
+            filename (str): Path to the file to load from
+            callback (callable, optional): Called with (kind, object) for every loaded object
+            
+        Returns:
+            Diagram: Loaded diagram instance
+            
+        Raises:
+            ValueError: If the file is from a newer version of the application
+        """
+        from .diagram_stream import DiagramStreamLoader
+        
+        return DiagramStreamLoader(filename, diagram_class=cls).load(callback)
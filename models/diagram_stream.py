@@ -0,0 +1,217 @@
+"""
+Streaming loader that builds a Diagram incrementally while a file is parsed.
+"""
+
+import itertools
+
+from PyQt5.QtCore import QPointF
+
+from utils.json_events import iter_json_events, iter_items, DEFAULT_CHUNK_SIZE
+from .diagram import SCHEMA_VERSION, Diagram
+from .persistence import migrate
+from .swimlane import Swimlane
+from .outcome import Outcome
+from .scope_blob import ScopeBlob
+
+_PREFIXES = {
+    'center': 'center',
+    'swimlanes.item': 'swimlane',
+    'outcomes.item': 'outcome',
+    'blobs.item': 'blob',
+}
+
+
+class DiagramStreamLoader:
+    """
+    Incrementally loads a diagram file, yielding model objects as they are parsed.
+    
+    Only one swimlane, outcome or blob record is held as a raw dict at a time,
+    so peak memory stays close to the size of the resulting model instead of
+    several times the file size. Each object is added to ``diagram`` before it
+    is yielded, which lets a scene create graphics items while the rest of the
+    file is still loading.
+    
+    Objects are always yielded in dependency order: the center first, outcomes
+    after their swimlane, and blobs after the outcomes they connect. Records
+    that arrive before what they reference are held back only until it is
+    loaded: an outcome until its swimlane, a blob until the last of its
+    outcomes. Records whose references never appear are added at the end of
+    the file.
+    
+    Files in the current schema start with their 'version' key, and only
+    those are streamed. Any other file (a legacy one, or one written before
+    the version key was added) is parsed whole and migrated first (see
+    models.persistence), and a file from a newer version is rejected.
+    
+    This is a library entry point (see Diagram.stream_from_file) for callers
+    that consume objects while the file is parsed. SceneLoader does not use
+    it: it builds the whole model on a worker thread with
+    Diagram.load_from_file and only then touches the scene, so the GUI thread
+    never reads a diagram that is still being filled.
+    
+    Attributes:
+        source: Filename or text file object to read from
+        chunk_size (int): Number of characters read at a time
+        diagram (Diagram): The diagram being populated
+    """
+    
+    def __init__(self, source, chunk_size=DEFAULT_CHUNK_SIZE, diagram_class=Diagram):
+        """
+        Initialize a new DiagramStreamLoader.
+        
+        Args:
+            source: Filename or text file object to read from
+            chunk_size (int, optional): Number of characters read at a time. Defaults to 64 KiB.
+            diagram_class (type, optional): Diagram class to populate. Defaults to Diagram.
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.diagram = diagram_class()
+    
+    def __iter__(self):
+        """
+        Parse the file, yielding (kind, object) pairs.
+        
+        ``kind`` is one of 'center', 'swimlane', 'outcome' or 'blob'; for
+        'center' the object is a QPointF.
+        """
+        if isinstance(self.source, str):
+            with open(self.source, 'r') as f:
+                yield from self._iter_records(f)
+        else:
+            yield from self._iter_records(self.source)
+    
+    def load(self, callback=None):
+        """
+        Load the whole file.
+        
+        Args:
+            callback (callable, optional): Called with (kind, object) for every loaded object
+            
+        Returns:
+            Diagram: The loaded diagram
+        """
+        for kind, obj in self:
+            if callback:
+                callback(kind, obj)
+        return self.diagram
+    
+    def _iter_records(self, fp):
+        """
+        Turn raw records from the event stream into model objects.
+        
+        Args:
+            fp: Text file object to read from
+            
+        Raises:
+            ValueError: If the file is from a newer version of the application
+        """
+        diagram = self.diagram
+        center_loaded = False
+        before_center = []  # Records seen before the center
+        waiting_outcomes = {}  # swimlane_id -> outcome records waiting for it
+        waiting_blobs = {}  # outcome_id -> blob records waiting for that outcome
+        
+        events = iter_json_events(fp, self.chunk_size)
+        head = list(itertools.islice(events, 3))
+        events = itertools.chain(head, events)
+        if head == [('start_map', None), ('map_key', 'version'), ('number', SCHEMA_VERSION)]:
+            records = iter_items(events, _PREFIXES)
+        else:
+            # Not known to be current: parse it whole so it can be migrated
+            records = _migrated_records(events)
+        
+        for prefix, data in records:
+            kind = _PREFIXES[prefix]
+            
+            if kind == 'center':
+                diagram.center = QPointF(data['x'], data['y'])
+                center_loaded = True
+                yield 'center', diagram.center
+                for kind, data in before_center:
+                    yield from self._add_record(kind, data, waiting_outcomes, waiting_blobs)
+                before_center = []
+            elif not center_loaded:
+                before_center.append((kind, data))
+            else:
+                yield from self._add_record(kind, data, waiting_outcomes, waiting_blobs)
+        
+        if not center_loaded:
+            yield 'center', diagram.center
+            for kind, data in before_center:
+                yield from self._add_record(kind, data, waiting_outcomes, waiting_blobs)
+        
+        # Whatever is still waiting references objects that never appeared
+        for records in list(waiting_outcomes.values()):
+            for data in records:
+                yield from self._add_outcome(data, waiting_blobs)
+        for records in list(waiting_blobs.values()):
+            for data in records:
+                yield 'blob', diagram.add_blob(ScopeBlob.from_dict(data, diagram.swimlanes, diagram.outcomes))
+    
+    def _add_record(self, kind, data, waiting_outcomes, waiting_blobs):
+        """
+        Add one raw record to the diagram, or hold it back until its references load.
+        
+        Args:
+            kind (str): 'swimlane', 'outcome' or 'blob'
+            data (dict): The raw record
+            waiting_outcomes (dict): Outcome records waiting for their swimlane
+            waiting_blobs (dict): Blob records waiting for an outcome, by outcome ID
+        """
+        diagram = self.diagram
+        
+        if kind == 'swimlane':
+            swimlane = diagram.add_swimlane(Swimlane.from_dict(data))
+            yield 'swimlane', swimlane
+            for outcome_data in waiting_outcomes.pop(swimlane.id, []):
+                yield from self._add_outcome(outcome_data, waiting_blobs)
+        elif kind == 'outcome':
+            if data['swimlane_id'] in diagram.swimlanes:
+                yield from self._add_outcome(data, waiting_blobs)
+            else:
+                waiting_outcomes.setdefault(data['swimlane_id'], []).append(data)
+        elif kind == 'blob':
+            outcome_ids = (data.get('start_outcome_id'), data.get('end_outcome_id'))
+            missing = [oid for oid in outcome_ids if oid is not None and oid not in diagram.outcomes]
+            if missing:
+                # Checked again when this outcome loads
+                waiting_blobs.setdefault(missing[0], []).append(data)
+            else:
+                yield 'blob', diagram.add_blob(ScopeBlob.from_dict(data, diagram.swimlanes, diagram.outcomes))
+    
+    def _add_outcome(self, data, waiting_blobs):
+        """
+        Add an outcome record, then the blobs that were waiting for it.
+        
+        Args:
+            data (dict): The raw outcome record
+            waiting_blobs (dict): Blob records waiting for an outcome, by outcome ID
+        """
+        outcome = self.diagram.add_outcome(Outcome.from_dict(data))
+        yield 'outcome', outcome
+        for blob_data in waiting_blobs.pop(outcome.id, []):
+            yield from self._add_record('blob', blob_data, None, waiting_blobs)
+
+
+def _migrated_records(events):
+    """
+    Assemble a whole document from an event stream, migrate it to the current
+    schema and yield its records as iter_items() would.
+    
+    Args:
+        events: Iterable of (event, value) pairs from iter_json_events
+        
+    Yields:
+        tuple: (prefix, record) pairs, prefixes as in _PREFIXES
+        
+    Raises:
+        ValueError: If the document is from a newer version of the application
+    """
+    for _, document in iter_items(events, {''}):
+        data = migrate(document)
+        if 'center' in data:
+            yield 'center', data['center']
+        for key in ('swimlanes', 'outcomes', 'blobs'):
+            for record in data.get(key) or []:
+                yield f'{key}.item', record
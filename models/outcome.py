@@ -18,6 +18,8 @@ class Outcome:
         associated_blobs (list): Blobs connected to this outcome
     """
     
+    __slots__ = ('id', 'swimlane_id', 'distance', 'label', 'item', 'associated_blobs', '__weakref__')
+    
     def __init__(self, swimlane_id, distance, label="", id=None):
         """
         Initialize a new Outcome.
@@ -0,0 +1,165 @@
+"""
+Reading and writing diagram files: the one place the application loads and
+saves diagrams through.
+
+Diagram files hold Diagram.to_dict() (as JSON, or in the binary format), with
+a 'version' key naming the schema. Older files are migrated when they are
+read:
+
+    version 0   the legacy format of radial_diagram.py and of early versions
+                of the main window: no center, outcomes nested in their
+                swimlanes, swimlanes named rather than labeled, RGBA color
+                lists or dictionaries, and blobs listing the IDs of the
+                outcomes they group
+    version 1   Diagram.to_dict(): flat swimlane, outcome and blob lists
+                linked by ID (files written before the version key was added
+                are version 1 too)
+"""
+
+from styles.colors import rgba_to_name
+from .diagram import SCHEMA_VERSION, Diagram
+
+LEGACY_VERSION = 0
+
+# For file dialogs
+FILE_FILTER = 'Diagram Files (*.json *.rdgb)'
+
+
+def schema_version(data):
+    """
+    Get the schema version of parsed diagram data.
+    
+    Args:
+        data (dict): Parsed diagram file
+        
+    Returns:
+        int: The version
+    """
+    if 'version' in data:
+        return data['version']
+    swimlanes = data.get('swimlanes') or []
+    if 'center' not in data or isinstance(swimlanes, dict) or \
+            any('outcomes' in s or 'name' in s for s in swimlanes[:1]):
+        return LEGACY_VERSION
+    return 1
+
+
+def migrate(data):
+    """
+    Convert parsed diagram data to the current schema.
+    
+    Args:
+        data (dict): Parsed diagram file, of any supported version
+        
+    Returns:
+        dict: Data Diagram.from_dict() accepts; data itself if it is current
+        
+    Raises:
+        ValueError: If the data is from a newer version of the application
+    """
+    version = schema_version(data)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Diagram schema version {version} is newer than the "
+                         f"supported version {SCHEMA_VERSION}")
+    if version == LEGACY_VERSION:
+        data = _migrate_legacy(data)
+    return data
+
+
+def _legacy_color(value, alpha=False):
+    """
+    Convert a legacy [r, g, b, a] or {'r', 'g', 'b', 'a'} color to a color name.
+    """
+    if isinstance(value, dict):
+        value = [value.get('r', 0), value.get('g', 0), value.get('b', 0), value.get('a', 255)]
+    if not isinstance(value, (list, tuple)):
+        return value
+    r, g, b = value[:3]
+    a = value[3] if len(value) > 3 else 255
+    return rgba_to_name((a << 24) | (r << 16) | (g << 8) | b, alpha)
+
+
+def _migrate_legacy(data):
+    """
+    Convert version 0 data to the current schema.
+    
+    The nested outcomes are flattened into one list keyed by ID, and each
+    blob is anchored to the first and last outcome it grouped.
+    """
+    swimlanes = data.get('swimlanes') or []
+    if isinstance(swimlanes, dict):
+        # radial_diagram.py keyed swimlanes by name
+        swimlanes = list(swimlanes.values())
+    
+    result = {
+        'version': SCHEMA_VERSION,
+        'center': data.get('center', {'x': 0, 'y': 0}),
+        'swimlanes': [],
+        'outcomes': [],
+        'blobs': []
+    }
+    outcome_swimlanes = {}  # outcome id -> swimlane id
+    for swimlane in swimlanes:
+        result['swimlanes'].append({
+            'id': swimlane['id'],
+            'angle': swimlane['angle'],
+            'label': swimlane.get('label', swimlane.get('name', "")),
+            'color': _legacy_color(swimlane.get('color')),
+            'length': swimlane.get('length', 250)
+        })
+        for outcome in swimlane.get('outcomes', []):
+            outcome_swimlanes[outcome['id']] = swimlane['id']
+            result['outcomes'].append({
+                'id': outcome['id'],
+                'swimlane_id': swimlane['id'],
+                'distance': outcome['distance'],
+                'label': outcome.get('label', "")
+            })
+    
+    for blob in data.get('blobs') or []:
+        outcome_ids = [i for i in blob.get('outcome_ids', []) if i in outcome_swimlanes]
+        start = outcome_ids[0] if outcome_ids else None
+        end = outcome_ids[-1] if outcome_ids else None
+        result['blobs'].append({
+            'id': blob['id'],
+            'points': blob['points'],
+            'color': _legacy_color(blob.get('color'), alpha=True),
+            'label': blob.get('label', ""),
+            'start_swimlane_id': outcome_swimlanes.get(start),
+            'end_swimlane_id': outcome_swimlanes.get(end),
+            'start_outcome_id': start,
+            'end_outcome_id': end
+        })
+    return result
+
+
+def read_diagram(filename, diagram_class=Diagram):
+    """
+    Read a diagram file of any supported format and version.
+    
+    Args:
+        filename (str): Path to the file
+        diagram_class (type, optional): Diagram class to build. Defaults to Diagram.
+        
+    Returns:
+        Diagram: The diagram
+        
+    Raises:
+        ValueError: If the file is from a newer version of the application
+    """
+    return diagram_class.load_from_file(filename)
+
+
+def write_diagram(diagram, filename, fast=False, fsync=True):
+    """
+    Write a diagram file in the current schema, replacing the file atomically.
+    
+    Args:
+        diagram (Diagram): The diagram
+        filename (str): Path to the file; binary if it ends in BINARY_EXTENSION
+        fast (bool, optional): Write compact JSON in one call (see
+            Diagram.save_to_file). Defaults to False.
+        fsync (bool, optional): Flush the file to disk before replacing the old
+            one. Defaults to True.
+    """
+    diagram.save_to_file(filename, fast=fast, fsync=fsync)
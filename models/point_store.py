@@ -0,0 +1,238 @@
+"""
+Shared, flat coordinate buffer for blob geometry.
+"""
+
+from array import array
+
+from PyQt5.QtGui import QPolygonF
+
+from utils.geometry import point_xy
+
+# QPointF is two qreals; qreal is a double on every desktop platform
+_QPOINTF_SIZE = 16
+
+
+def polygon_from_coords(coords):
+    """
+    Build a QPolygonF from a flat buffer of float64 x, y values.
+    
+    The coordinates are copied straight into the polygon's storage, without
+    creating a Python object per point.
+    
+    Args:
+        coords: C-contiguous buffer (array('d'), memoryview, (n, 2) numpy array, ...)
+            of 2 * n doubles
+        
+    Returns:
+        QPolygonF: Polygon with n points
+    """
+    view = memoryview(coords).cast('B')
+    count = len(view) // _QPOINTF_SIZE
+    polygon = QPolygonF(count)
+    if count:
+        data = polygon.data()
+        data.setsize(count * _QPOINTF_SIZE)
+        memoryview(data)[:] = view
+    return polygon
+
+
+def polygon_from_points(points):
+    """
+    Build a QPolygonF from a list of points without creating a QPointF per point.
+    
+    Args:
+        points: Points as QPointF, dicts or (x, y) sequences, or an (n, 2) numpy
+            array such as the batch functions in utils.geometry return
+        
+    Returns:
+        QPolygonF: The polygon
+    """
+    if hasattr(points, 'shape'):
+        return polygon_from_coords(points.astype('d', order='C', copy=False))
+    
+    coords = array('d')
+    for point in points:
+        coords.extend(point_xy(point))
+    return polygon_from_coords(coords)
+
+
+class PointStore:
+    """
+    Flat buffer holding the x, y coordinates of many blobs.
+    
+    A blob references its points by an (offset, count) span instead of owning
+    a list of point objects, which costs 16 bytes per point instead of several
+    Python objects. The buffer is either a growable ``array('d')`` or a
+    read-only view into a memory-mapped binary diagram file; appending to a
+    mapped store copies it into an array first.
+    
+    Spans are never reused in place. Spans of removed blobs are counted by
+    release() as dead points, and compact() rewrites the buffer with only the
+    live spans.
+    
+    Attributes:
+        typecode (str): array typecode of the coordinates ('d' or 'f')
+        filename (str): Path of the memory-mapped file, or None
+        dead (int): Number of points in the buffer no blob uses any more
+    """
+    
+    def __init__(self, buffer=None, typecode='d', owner=None):
+        """
+        Initialize a new PointStore.
+        
+        Args:
+            buffer (optional): Existing flat buffer of coordinates. Defaults to None (empty array).
+            typecode (str, optional): Typecode of the buffer. Defaults to 'd'.
+            owner (optional): Object keeping ``buffer`` alive (e.g. a BinaryDiagramReader),
+                closed when the store stops using the buffer. Defaults to None.
+        """
+        self.typecode = typecode
+        self._coords = array(typecode) if buffer is None else buffer
+        self._owner = owner
+        self.filename = getattr(owner, 'filename', None)
+        self.dead = 0
+    
+    @classmethod
+    def from_reader(cls, reader):
+        """
+        Create a store viewing the point section of a binary diagram file in place.
+        
+        Args:
+            reader (BinaryDiagramReader): Open reader; the store takes ownership of it
+            
+        Returns:
+            PointStore: Store backed by the memory-mapped file
+        """
+        return cls(reader.points_view(), reader.point_typecode, owner=reader)
+    
+    def __len__(self):
+        """
+        Return the number of points in the store.
+        """
+        return len(self._coords) // 2
+    
+    @property
+    def is_mapped(self):
+        """
+        Whether the store still reads from a memory-mapped file.
+        """
+        return self._owner is not None
+    
+    def append(self, points):
+        """
+        Append points to the store.
+        
+        Args:
+            points (list): Points as QPointF, dicts or (x, y) sequences
+            
+        Returns:
+            tuple: (offset, count) span of the appended points
+        """
+        if self._owner is not None:
+            self._detach()
+        
+        offset = len(self._coords) // 2
+        for point in points:
+            self._coords.extend(point_xy(point))
+        return offset, len(self._coords) // 2 - offset
+    
+    def release(self, count):
+        """
+        Mark a span as no longer used.
+        
+        Args:
+            count (int): Number of points in the span
+        """
+        self.dead += count
+    
+    @property
+    def is_sparse(self):
+        """
+        Whether more than half of the points in the buffer are dead.
+        """
+        return self.dead * 2 > len(self)
+    
+    def compact(self, blobs):
+        """
+        Rewrite the buffer with only the spans of the given blobs and update
+        their offsets. A mapped buffer is replaced by an owned array.
+        
+        Args:
+            blobs (list): Every blob whose points live in this store
+        """
+        coords = array(self.typecode)
+        for blob in blobs:
+            if blob.store is self:
+                offset = len(coords) // 2
+                coords.frombytes(self.coords(blob.point_offset, blob.point_count).cast('B'))
+                blob.point_offset = offset
+        
+        if self._owner is not None:
+            self._coords.release()
+            self._owner.close()
+            self._owner = None
+            self.filename = None
+        self._coords = coords
+        self.dead = 0
+    
+    def _detach(self):
+        """
+        Copy a memory-mapped buffer into an owned array and release the mapping.
+        """
+        coords = array(self.typecode)
+        coords.frombytes(self._coords.cast('B'))
+        self._coords.release()
+        self._coords = coords
+        self._owner.close()
+        self._owner = None
+        self.filename = None
+    
+    def close(self):
+        """
+        Release the memory mapping, if any, keeping a private copy of the points.
+        """
+        if self._owner is not None:
+            self._detach()
+    
+    def coords(self, offset, count):
+        """
+        Get a span of the store as a flat view of x, y values, without copying.
+        
+        Args:
+            offset (int): Index of the first point
+            count (int): Number of points
+            
+        Returns:
+            memoryview: View of 2 * count coordinates
+        """
+        return memoryview(self._coords)[2 * offset:2 * (offset + count)]
+    
+    def points(self, offset, count):
+        """
+        Materialize a span as a list of [x, y] lists.
+        
+        Args:
+            offset (int): Index of the first point
+            count (int): Number of points
+            
+        Returns:
+            list: The points
+        """
+        coords = self.coords(offset, count).tolist()
+        return [coords[i:i + 2] for i in range(0, len(coords), 2)]
+    
+    def to_polygon(self, offset, count):
+        """
+        Build a QPolygonF for a span.
+        
+        Args:
+            offset (int): Index of the first point
+            count (int): Number of points
+            
+        Returns:
+            QPolygonF: The polygon
+        """
+        coords = self.coords(offset, count)
+        if self.typecode != 'd':
+            coords = array('d', coords)
+        return polygon_from_coords(coords)
@@ -4,6 +4,11 @@ ScopeBlob model class representing a connection between outcomes.
 
 from PyQt5.QtGui import QColor
 from utils.id_generator import generate_unique_id
+from styles.colors import color_to_rgba, rgba_to_name
+from .point_store import polygon_from_points
+
+# Semi-transparent red
+_DEFAULT_COLOR = 0x32FF0000
 
 
 class ScopeBlob:
@@ -13,6 +18,9 @@ class ScopeBlob:
     Attributes:
         id (int): Unique identifier for the blob
         points (list): List of points defining the blob's shape
+        store (PointStore): Shared point buffer holding the points, or None if they are held in a list
+        point_offset (int): Index of the first point in ``store``
+        point_count (int): Number of points in ``store``
         color (QColor): Color of the blob
         label (str): Text label for the blob
         polygon_item (ScopeBlobItem): Reference to the visual representation (set by view)
@@ -20,21 +28,29 @@ class ScopeBlob:
         end_swimlane (Swimlane): Ending swimlane
         start_outcome (Outcome): Starting outcome
         end_outcome (Outcome): Ending outcome
+        
+    The color is kept as a packed ARGB integer and a QColor is only created
+    when ``color`` is read.
     """
     
+    __slots__ = ('id', '_points', 'store', 'point_offset', 'point_count', '_rgba', 'polygon_item',
+                 'label', 'label_item', 'start_swimlane', 'end_swimlane', 'start_outcome',
+                 'end_outcome', 'associated_blobs', '__weakref__')
+    
     def __init__(self, points, color=None, id=None, label=""):
         """
         Initialize a new ScopeBlob.
         
         Args:
             points (list): List of points defining the blob's shape
-            color (QColor, optional): Color of the blob. Defaults to semi-transparent red.
+            color (QColor, optional): Color of the blob, as a QColor or anything
+                color_to_rgba accepts. Defaults to semi-transparent red.
             id (int, optional): Unique identifier. Defaults to None (auto-generated).
             label (str, optional): Text label for the blob. Defaults to "".
         """
         self.id = id or generate_unique_id()
         self.points = points
-        self.color = color or QColor(255, 0, 0, 50)
+        self._rgba = _DEFAULT_COLOR if color is None else color_to_rgba(color)
         self.polygon_item = None  # Reference to the visual representation
         self.label = label
         self.label_item = None
@@ -44,6 +60,93 @@ class ScopeBlob:
         self.end_outcome = None
         self.associated_blobs = []  # For compatibility with outcome references
     
+    @classmethod
+    def from_store(cls, store, offset, count, color=None, id=None, label=""):
+        """
+        Create a ScopeBlob whose points live in a shared PointStore.
+        
+        Args:
+            store (PointStore): The store holding the points
+            offset (int): Index of the first point in the store
+            count (int): Number of points
+            color (QColor, optional): Color of the blob. Defaults to semi-transparent red.
+            id (int, optional): Unique identifier. Defaults to None (auto-generated).
+            label (str, optional): Text label for the blob. Defaults to "".
+            
+        Returns:
+            ScopeBlob: New blob instance
+        """
+        blob = cls(None, color, id, label)
+        blob.use_store(store, offset, count)
+        return blob
+    
+    @property
+    def points(self):
+        """
+        List of points defining the blob's shape.
+        
+        For store-backed blobs this materializes a new list of [x, y] lists.
+        """
+        if self.store is not None:
+            return self.store.points(self.point_offset, self.point_count)
+        return self._points
+    
+    @points.setter
+    def points(self, points):
+        self._points = points
+        self.store = None
+        self.point_offset = 0
+        self.point_count = 0
+    
+    @property
+    def color(self):
+        """
+        Color of the blob, as a new QColor.
+        """
+        return QColor.fromRgba(self._rgba)
+    
+    @color.setter
+    def color(self, color):
+        self._rgba = color_to_rgba(color)
+    
+    def use_store(self, store, offset=None, count=None):
+        """
+        Reference points in a shared PointStore instead of holding them in a list.
+        
+        Args:
+            store (PointStore): The store
+            offset (int, optional): Index of the first point. If omitted, the blob's
+                current points are appended to the store.
+            count (int, optional): Number of points. Required with offset.
+        """
+        if offset is None:
+            offset, count = store.append(self.points or [])
+        self._points = None
+        self.store = store
+        self.point_offset = offset
+        self.point_count = count
+    
+    def detach_store(self):
+        """
+        Copy the points out of the shared store into a list of the blob's own,
+        so the store can drop the blob's span.
+        """
+        if self.store is not None:
+            self.points = self.points
+    
+    def to_polygon(self):
+        """
+        Build a QPolygonF of the blob's points.
+        
+        Store-backed blobs copy their coordinates straight from the shared buffer.
+        
+        Returns:
+            QPolygonF: The blob outline
+        """
+        if self.store is not None:
+            return self.store.to_polygon(self.point_offset, self.point_count)
+        return polygon_from_points(self._points or [])
+    
     def to_dict(self):
         """
         Convert the blob to a dictionary for serialization.
@@ -54,7 +157,7 @@ class ScopeBlob:
         return {
             'id': self.id,
             'points': self.points,
-            'color': self.color.name(QColor.HexArgb),
+            'color': rgba_to_name(self._rgba, alpha=True),
             'label': self.label,
             'start_swimlane_id': self.start_swimlane.id if self.start_swimlane else None,
             'end_swimlane_id': self.end_swimlane.id if self.end_swimlane else None,
@@ -63,7 +166,7 @@ class ScopeBlob:
         }
     
     @classmethod
-    def from_dict(cls, data, swimlanes=None, outcomes=None):
+    def from_dict(cls, data, swimlanes=None, outcomes=None, store=None):
         """
         Create a ScopeBlob from a dictionary.
         
@@ -71,16 +174,19 @@ class ScopeBlob:
             data (dict): Dictionary containing blob data
             swimlanes (dict, optional): Dictionary of swimlanes by ID. Defaults to None.
             outcomes (dict, optional): Dictionary of outcomes by ID. Defaults to None.
+            store (PointStore, optional): Store that a 'point_span' entry refers to. Defaults to None.
             
         Returns:
             ScopeBlob: New blob instance
         """
         blob = cls(
-            points=data['points'],
-            color=QColor(data.get('color', QColor(255, 0, 0, 50).name(QColor.HexArgb))),
+            points=data.get('points'),
+            color=data.get('color'),
             id=data.get('id'),
             label=data.get('label', "")
         )
+        if store is not None and 'point_span' in data:
+            blob.use_store(store, *data['point_span'])
         
         # Link to swimlanes and outcomes if provided
         if swimlanes:
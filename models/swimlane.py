@@ -4,7 +4,9 @@ Swimlane model class representing a project swimlane.
 
 from PyQt5.QtGui import QColor
 from utils.id_generator import generate_unique_id
-from styles.colors import COLORS
+from styles.colors import COLORS, color_to_rgba, rgba_to_name
+
+_DEFAULT_COLOR = color_to_rgba(COLORS['segment1'])
 
 
 class Swimlane:
@@ -19,8 +21,13 @@ class Swimlane:
         length (float): Length of the swimlane from center
         outcomes (list): List of outcomes on this swimlane
         item (SwimlaneItem): Reference to the visual representation (set by view)
+        
+    The color is kept as a packed ARGB integer and a QColor is only created
+    when ``color`` is read.
     """
     
+    __slots__ = ('id', 'angle', 'label', '_rgba', 'length', 'outcomes', 'item', '__weakref__')
+    
     def __init__(self, label="", angle=0, color=None, id=None, length=250):
         """
         Initialize a new Swimlane.
@@ -28,18 +35,30 @@ class Swimlane:
         Args:
             label (str, optional): Text label for the swimlane. Defaults to "".
             angle (float, optional): Angle in degrees from the center. Defaults to 0.
-            color (QColor, optional): Color of the swimlane. Defaults to segment1 color.
+            color (QColor, optional): Color of the swimlane, as a QColor or anything
+                color_to_rgba accepts. Defaults to segment1 color.
             id (int, optional): Unique identifier. Defaults to None (auto-generated).
             length (float, optional): Length of the swimlane from center. Defaults to 250.
         """
         self.id = id or generate_unique_id()
         self.angle = angle
         self.label = label
-        self.color = color or QColor(COLORS['segment1'])
+        self._rgba = _DEFAULT_COLOR if color is None else color_to_rgba(color)
         self.length = length
         self.outcomes = []  # List of outcomes on this swimlane
         self.item = None  # Reference to the visual representation
     
+    @property
+    def color(self):
+        """
+        Color of the swimlane, as a new QColor.
+        """
+        return QColor.fromRgba(self._rgba)
+    
+    @color.setter
+    def color(self, color):
+        self._rgba = color_to_rgba(color)
+    
     def to_dict(self):
         """
         Convert the swimlane to a dictionary for serialization.
@@ -51,7 +70,7 @@ class Swimlane:
             'id': self.id,
             'angle': self.angle,
             'label': self.label,
-            'color': self.color.name(),
+            'color': rgba_to_name(self._rgba),
             'length': self.length
         }
     
@@ -69,7 +88,7 @@ class Swimlane:
         return cls(
             angle=data['angle'],
             label=data.get('label', ""),
-            color=QColor(data.get('color', COLORS['segment1'])),
+            color=data.get('color'),
             id=data.get('id'),
             length=data.get('length', 250)
         )
@@ -12,6 +12,9 @@ from PyQt5.QtGui import (QPainter, QPen, QBrush, QColor, QPolygonF, QPainterPath
                         QLinearGradient, QIcon)
 from PyQt5.QtCore import Qt, QPointF, QLineF, QRectF, QPoint, QSizeF
 from styles.colors import COLORS
+from utils.spatial_index import RadialIndex
+from models.point_store import polygon_from_points
+from utils.geometry import calculate_points_on_lines
 
 # --- Utility Functions ---
 
@@ -93,7 +96,7 @@ class ScopeBlob:
                 outcome.associated_blobs.remove(self)
 
     def contains_point(self, point):
-        polygon = QPolygonF([QPointF(p[0], p[1]) for p in self.points])
+        polygon = polygon_from_points(self.points)
         return polygon.containsPoint(point, Qt.OddEvenFill)
 
     def __repr__(self):
@@ -295,10 +298,11 @@ class OutcomeItem(QGraphicsEllipseItem):
                     self.text_item.setPlainText(self.outcome.label)
                     self.outcome.calculate_position()
                     self.setPos(self.outcome.position - QPointF(5, 5))
+                    self.diagram_scene.radial_index.update_outcome(
+                        self.outcome, swimlane_id=self.outcome.swimlane.id)
                     
-                    # Update scene
-                    if self.scene():
-                        self.scene().update()
+                    # Repaint this item only
+                    self.update()
                 except Exception as e:
                     QMessageBox.warning(None, 'Error', f'Failed to update outcome: {str(e)}')
             
@@ -381,13 +385,11 @@ class OutcomeItem(QGraphicsEllipseItem):
             # Update outcome distance and position
             self.outcome.distance = distance
             self.outcome.position = QPointF(new_x, new_y)
+            self.diagram_scene.radial_index.update_outcome(
+                self.outcome, swimlane_id=self.outcome.swimlane.id)
             
-            # Move the outcome item
+            # Move the outcome item; setPos repaints its old and new area
             super().setPos(new_x - 5, new_y - 5)
-            
-            # Update scene
-            if self.scene():
-                self.scene().update()
         
         event.accept()
 
@@ -450,6 +452,7 @@ class ResizeHandle(QGraphicsRectItem):
         if new_angle != self.parent_item.swimlane.angle or new_length != self.parent_item.swimlane.length:
             self.parent_item.swimlane.angle = new_angle
             self.parent_item.swimlane.length = new_length
+            self.parent_item.diagram_scene.radial_index.update_swimlane(self.parent_item.swimlane)
             
             # Update the line and handle
             self.parent_item.update_line_and_label()
@@ -460,9 +463,6 @@ class ResizeHandle(QGraphicsRectItem):
                 if outcome.item:
                     outcome.item.setPos(outcome.position - QPointF(5, 5))
                     outcome.item.text_item.setPos(15, -5)
-            
-            # Update the scene
-            self.parent_item.scene().update()
         
         event.accept()
 
@@ -730,7 +730,7 @@ class ScopeBlobItem(QGraphicsPolygonItem):
         self.diagram_scene.removeItem(self)
         self.diagram_scene.diagram.remove_blob(self.blob)
     def update_polygon(self):
-        polygon = QPolygonF([QPointF(p[0], p[1]) for p in self.blob.points])
+        polygon = polygon_from_points(self.blob.points)
         self.setPolygon(polygon)
         super().mousePressEvent(event)
 
@@ -738,7 +738,8 @@ class DiagramView(QGraphicsView):
     def __init__(self, scene, parent=None):
         super().__init__(scene, parent)
         self.setRenderHint(QPainter.Antialiasing)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # Repaint only what changed; items request their own updates
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
@@ -831,34 +832,12 @@ class DiagramScene(QGraphicsScene):
         self.end_swimlane = None
         self.end_outcome = None
         self.preview_rect = None
+        self.radial_index = RadialIndex()  # Angle/distance index for hit-testing
         self.setSceneRect(-400, -300, 1600, 1200)  # Larger scene rect for zooming
         
     def find_closest_swimlane(self, pos):
         """Find the closest swimlane to a given position"""
-        min_dist = float('inf')
-        closest_swimlane = None
-        point = QPointF(pos.x(), pos.y())
-        
-        for swimlane in self.diagram.swimlanes.values():
-            # Get the line of the swimlane
-            start = self.diagram.center
-            end = QPointF(
-                self.diagram.center.x() + swimlane.length * math.cos(math.radians(swimlane.angle)),
-                self.diagram.center.y() + swimlane.length * math.sin(math.radians(swimlane.angle))
-            )
-            line = QLineF(start, end)
-            
-            # Calculate distance from point to line
-            dist = abs((end.y() - start.y()) * point.x() - 
-                      (end.x() - start.x()) * point.y() + 
-                      end.x() * start.y() - 
-                      end.y() * start.x()) / line.length()
-            
-            if dist < min_dist:
-                min_dist = dist
-                closest_swimlane = swimlane
-        
-        return closest_swimlane
+        return self.radial_index.closest_swimlane_to_point(self.diagram.center, pos)
     
     def calculate_curved_rect_points(self, start_swimlane, end_swimlane):
         """Calculate points for a curved rectangle between swimlanes"""
@@ -900,21 +879,10 @@ class DiagramScene(QGraphicsScene):
 
     def find_closest_outcome(self, pos, swimlane):
         """Find the closest outcome on a swimlane to a given position"""
-        min_dist = float('inf')
-        closest_outcome = None
-        point = QPointF(pos.x(), pos.y())
-        
-        for outcome in swimlane.outcomes:
-            outcome_pos = outcome.item.pos() + QPointF(5, 5)  # Center of outcome
-            dist = math.sqrt((point.x() - outcome_pos.x())**2 + (point.y() - outcome_pos.y())**2)
-            if dist < min_dist:
-                min_dist = dist
-                closest_outcome = outcome
-        
-        return closest_outcome
+        return self.radial_index.closest_outcome_to_point(self.diagram.center, pos, swimlane)
 
     def calculate_blob_points(self, start_swimlane, end_swimlane, start_outcome, end_outcome):
-        """Calculate points for a pie-chart like segment"""
+        """Calculate the outline (a QPolygonF) of a pie-chart like segment"""
         if not (start_swimlane and end_swimlane):
             return None
             
@@ -931,32 +899,16 @@ class DiagramScene(QGraphicsScene):
         outer_radius = max(start_outcome.distance if start_outcome else 200,
                           end_outcome.distance if end_outcome else 200)
         
-        points = []
         num_points = 30  # More points for smoother curves
         
-        # Start from center
-        points.append(self.diagram.center)
-        
-        # Draw line from center to inner arc at start angle
-        x = self.diagram.center.x() + inner_radius * math.cos(start_angle)
-        y = self.diagram.center.y() + inner_radius * math.sin(start_angle)
-        points.append(QPointF(x, y))
-        
-        # Draw outer arc from start to end angle
-        for i in range(num_points + 1):
-            t = i / num_points
-            angle = start_angle * (1 - t) + end_angle * t
-            x = self.diagram.center.x() + outer_radius * math.cos(angle)
-            y = self.diagram.center.y() + outer_radius * math.sin(angle)
-            points.append(QPointF(x, y))
-        
-        # Draw line back to center
-        x = self.diagram.center.x() + inner_radius * math.cos(end_angle)
-        y = self.diagram.center.y() + inner_radius * math.sin(end_angle)
-        points.append(QPointF(x, y))
-        points.append(self.diagram.center)
+        # Center, inner point at start angle, outer arc, inner point at end angle, center;
+        # the center is the point at distance 0
+        arc_angles = [start_angle * (1 - i / num_points) + end_angle * (i / num_points)
+                      for i in range(num_points + 1)]
+        angles = [start_angle, start_angle] + arc_angles + [end_angle, end_angle]
+        distances = [0, inner_radius] + [outer_radius] * (num_points + 1) + [inner_radius, 0]
         
-        return points
+        return polygon_from_points(calculate_points_on_lines(self.diagram.center, angles, distances))
 
     def mousePressEvent(self, event):
         try:
@@ -1060,6 +1012,7 @@ class DiagramScene(QGraphicsScene):
             swimlane_item = SwimlaneItem(swimlane, self)
             self.addItem(swimlane_item)
             swimlane.line_item = swimlane_item
+            self.radial_index.add_swimlane(swimlane)
             return swimlane
         except ValueError as e:
             QMessageBox.warning(None, "Error", str(e))
@@ -1071,6 +1024,7 @@ class DiagramScene(QGraphicsScene):
             outcome_item = OutcomeItem(outcome, self)
             outcome.item = outcome_item  # Store reference to the item
             self.addItem(outcome_item)
+            self.radial_index.add_outcome(outcome, swimlane_id=outcome.swimlane.id)
             return outcome_item
         except ValueError as e:
             QMessageBox.warning(None, "Error", str(e))
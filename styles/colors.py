@@ -55,3 +55,49 @@ def get_color_palette():
     palette.setColor(QPalette.HighlightedText, Qt.white)
     
     return palette
+
+
+def color_to_rgba(color):
+    """
+    Pack a color into a 32-bit #AARRGGBB integer.
+    
+    Model objects store colors in this form and only create a QColor when the
+    color is actually requested.
+    
+    Args:
+        color: A QColor, a packed integer, or anything QColor accepts
+            ('#rrggbb', '#aarrggbb', SVG color names, Qt.GlobalColor)
+            
+    Returns:
+        int: The packed color
+    """
+    if isinstance(color, int) and not isinstance(color, Qt.GlobalColor):
+        return color & 0xFFFFFFFF
+    if isinstance(color, str) and color.startswith('#'):
+        # Fast path for the hex strings found in diagram files
+        try:
+            if len(color) == 7:
+                return 0xFF000000 | int(color[1:], 16)
+            if len(color) == 9:
+                return int(color[1:], 16)
+        except ValueError:
+            pass
+    if not isinstance(color, QColor):
+        color = QColor(color)
+    return color.rgba()
+
+
+def rgba_to_name(rgba, alpha=False):
+    """
+    Format a packed color as a hex string, like QColor.name().
+    
+    Args:
+        rgba (int): The packed #AARRGGBB color
+        alpha (bool, optional): Include the alpha channel ('#aarrggbb'). Defaults to False ('#rrggbb').
+        
+    Returns:
+        str: The color name
+    """
+    if alpha:
+        return '#%08x' % rgba
+    return '#%06x' % (rgba & 0xFFFFFF)
@@ -0,0 +1,84 @@
+"""
+Tests for atomic file replacement.
+"""
+
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.atomic_file import atomic_output, fsync_path
+
+
+class AtomicOutputTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'diagram.json')
+    
+    def _write(self, text):
+        with atomic_output(self.path) as temp_path:
+            with open(temp_path, 'w') as f:
+                f.write(text)
+    
+    def _mode(self, path):
+        return stat.S_IMODE(os.stat(path).st_mode)
+    
+    def test_new_file_gets_open_mode(self):
+        reference = os.path.join(self.directory.name, 'reference')
+        open(reference, 'w').close()
+        
+        self._write("new")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(self._mode(self.path), self._mode(reference))
+    
+    def test_replaced_file_keeps_mode(self):
+        self._write("old")
+        os.chmod(self.path, 0o640)
+        
+        self._write("new")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(self._mode(self.path), 0o640)
+    
+    def test_replaces_read_only_file(self):
+        self._write("old")
+        os.chmod(self.path, 0o444)
+        
+        self._write("new")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(self._mode(self.path), 0o444)
+    
+    def test_fsync_opens_file_for_writing(self):
+        self._write("data")
+        opened = []
+        real_open = os.open
+        
+        def record_open(path, flags, *args):
+            opened.append((path, flags))
+            return real_open(path, flags, *args)
+        
+        with mock.patch('os.open', record_open):
+            fsync_path(self.path)
+        self.assertEqual(len(opened), 1)
+        self.assertTrue(opened[0][1] & os.O_RDWR)
+    
+    def test_error_leaves_file_untouched(self):
+        self._write("old")
+        with self.assertRaises(RuntimeError):
+            with atomic_output(self.path) as temp_path:
+                with open(temp_path, 'w') as f:
+                    f.write("partial")
+                raise RuntimeError("failed while writing")
+        
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.directory.name), ['diagram.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
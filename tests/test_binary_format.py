@@ -0,0 +1,111 @@
+"""
+Tests for the binary diagram format, checked against the JSON path.
+"""
+
+import math
+import os
+import tempfile
+import unittest
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QColor
+
+from models.binary_format import is_binary_file
+from models.diagram import Diagram
+from models.scope_blob import ScopeBlob
+from models.swimlane import Swimlane
+
+
+def _sample_diagram():
+    """
+    A small diagram with every kind of object, shared and empty labels,
+    unicode text, translucent colors and blobs with and without outcomes.
+    """
+    diagram = Diagram(QPointF(12.5, -3.25))
+    swimlanes = [diagram.add_swimlane(i * 45.0 + 0.1, f"Lane {i}", QColor(10 * i, 100, 200), 250 + i)
+                 for i in range(8)]
+    swimlanes[3].label = "Überblick ✓"
+    outcomes = [diagram.add_outcome(swimlanes[i % 8].id, 50 + i * 7.3, f"Outcome {i % 5}")
+                for i in range(20)]
+    outcomes[0].label = ""
+    
+    blob = ScopeBlob([[0.1, 0.2], [10.5, 3.25], [7.0, 9.125]], QColor(255, 0, 0, 50), label="Scope")
+    blob.start_swimlane, blob.end_swimlane = swimlanes[0], swimlanes[1]
+    blob.start_outcome, blob.end_outcome = outcomes[0], outcomes[1]
+    diagram.add_blob(blob)
+    diagram.add_blob([[-1.0, -2.0], [3.0, 4.0], [5.0, -6.0], [1e-3, 1e6]], label="Loose")
+    return diagram
+
+
+class BinaryFormatTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+    
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+    
+    def _load(self, path):
+        """
+        Load a file, closing its point store (which may map the file) after the test.
+        """
+        diagram = Diagram.load_from_file(path)
+        self.addCleanup(diagram.point_store.close)
+        return diagram
+    
+    def test_round_trip_matches_json(self):
+        diagram = _sample_diagram()
+        diagram.save_to_file(self._path('diagram.json'))
+        diagram.save_to_file(self._path('diagram.rdgb'))
+        
+        from_json = self._load(self._path('diagram.json')).to_dict()
+        from_binary = self._load(self._path('diagram.rdgb')).to_dict()
+        self.assertEqual(from_binary, from_json)
+        self.assertEqual(from_json, diagram.to_dict())
+    
+    def test_float32_points_round_trip_closely(self):
+        diagram = _sample_diagram()
+        diagram.save_to_file(self._path('diagram.rdgb'), precision='float32')
+        
+        expected = diagram.to_dict()
+        actual = self._load(self._path('diagram.rdgb')).to_dict()
+        for blob, other in zip(expected['blobs'], actual['blobs']):
+            self.assertEqual(len(blob['points']), len(other['points']))
+            for point, loaded in zip(blob['points'], other['points']):
+                for value, stored in zip(point, loaded):
+                    self.assertTrue(math.isclose(value, stored, rel_tol=1e-6, abs_tol=1e-6))
+            blob.pop('points')
+            other.pop('points')
+        self.assertEqual(actual, expected)
+    
+    def test_load_detects_format_from_contents(self):
+        diagram = _sample_diagram()
+        binary_named_json = self._path('binary.json')
+        json_named_binary = self._path('json.rdgb')
+        diagram.save_to_file(binary_named_json, format='binary')
+        diagram.save_to_file(json_named_binary, format='json')
+        
+        self.assertTrue(is_binary_file(binary_named_json))
+        self.assertFalse(is_binary_file(json_named_binary))
+        self.assertEqual(self._load(binary_named_json).to_dict(), diagram.to_dict())
+        self.assertEqual(self._load(json_named_binary).to_dict(), diagram.to_dict())
+    
+    def test_rejects_non_integer_ids(self):
+        path = self._path('diagram.rdgb')
+        _sample_diagram().save_to_file(path)
+        with open(path, 'rb') as f:
+            before = f.read()
+        
+        diagram = Diagram()
+        diagram.add_swimlane(Swimlane("Named", 30.0, id='named'))
+        with self.assertRaises(ValueError):
+            diagram.save_to_file(path)
+        
+        # The failed save left the previous file in place
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
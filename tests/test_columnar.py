@@ -0,0 +1,124 @@
+"""
+Parity tests for the columnar Diagram backend against the object backend.
+"""
+
+import math
+import random
+import unittest
+
+from PyQt5.QtCore import QPointF
+
+from models.columnar import ColumnarDiagram, ColumnarOutcome, np
+from models.diagram import Diagram
+from models.outcome import Outcome
+from models.scope_blob import ScopeBlob
+from models.swimlane import Swimlane
+
+# Explicit IDs, so both backends hold identical objects
+BASE_ID = 10 ** 8
+
+
+def _populate(diagram, seed=3):
+    """
+    Build the same diagram in either backend: swimlanes, outcomes added both
+    as objects and by swimlane ID, and blobs connecting outcomes.
+    """
+    rng = random.Random(seed)
+    for i in range(8):
+        diagram.add_swimlane(Swimlane(f"Lane {i}", i * 45.0 + rng.uniform(0, 5), id=BASE_ID + i,
+                                      length=200 + i * 10))
+    for i in range(40):
+        outcome = Outcome(BASE_ID + i % 8, rng.uniform(30, 200), f"Outcome {i}", id=BASE_ID + 100 + i)
+        diagram.add_outcome(outcome)
+    for i in range(10):
+        start = diagram.get_outcome_by_id(BASE_ID + 100 + i)
+        end = diagram.get_outcome_by_id(BASE_ID + 120 + i)
+        blob = ScopeBlob([[i, 0.0], [i + 5.0, 3.0], [i + 2.0, 8.0]], id=BASE_ID + 200 + i, label=f"Blob {i}")
+        blob.start_outcome, blob.end_outcome = start, end
+        blob.start_swimlane = diagram.get_swimlane_by_id(start.swimlane_id)
+        blob.end_swimlane = diagram.get_swimlane_by_id(end.swimlane_id)
+        diagram.add_blob(blob)
+    return diagram
+
+
+def _edit(diagram):
+    """
+    Apply the same edits to either backend.
+    """
+    diagram.get_swimlane_by_id(BASE_ID + 1).angle = 123.5
+    diagram.get_swimlane_by_id(BASE_ID + 2).length = 321.0
+    outcome = diagram.get_outcome_by_id(BASE_ID + 105)
+    diagram.move_outcome(outcome, BASE_ID + 6, 99.25)
+    diagram.get_outcome_by_id(BASE_ID + 106).distance = 42.0
+    diagram.remove_outcome(BASE_ID + 100)
+    diagram.remove_outcome(BASE_ID + 133)
+    diagram.remove_swimlane(BASE_ID + 3)
+    diagram.add_outcome(BASE_ID + 4, 77.5, "Added")
+    diagram.center = QPointF(10, -20)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class ColumnarParityTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.objects = _populate(Diagram())
+        self.columnar = _populate(ColumnarDiagram())
+    
+    def _normalized(self, diagram):
+        """
+        to_dict() with the ID of the outcome added by _edit left out, since
+        generated IDs differ between the two diagrams.
+        """
+        data = diagram.to_dict()
+        for outcome in data['outcomes']:
+            if outcome['label'] == "Added":
+                outcome['id'] = None
+        return data
+    
+    def _positions(self, diagram):
+        """
+        outcome_positions() with the outcome added by _edit under the key None.
+        """
+        positions = diagram.outcome_positions()
+        for outcome in diagram.outcomes.values():
+            if outcome.label == "Added":
+                positions[None] = positions.pop(outcome.id)
+        return positions
+    
+    def test_same_dict_after_adding(self):
+        self.assertEqual(self.columnar.to_dict(), self.objects.to_dict())
+        self.assertIsInstance(self.columnar.get_outcome_by_id(BASE_ID + 100), ColumnarOutcome)
+    
+    def test_lookups_match(self):
+        for outcome_id in (BASE_ID + 100, BASE_ID + 139, BASE_ID + 999):
+            expected = self.objects.get_outcome_by_id(outcome_id)
+            actual = self.columnar.get_outcome_by_id(outcome_id)
+            if expected is None:
+                self.assertIsNone(actual)
+            else:
+                self.assertEqual(actual.to_dict(), expected.to_dict())
+        for swimlane_id in self.objects.swimlanes:
+            self.assertEqual(
+                sorted(o.id for o in self.columnar.get_outcomes_for_swimlane(swimlane_id)),
+                sorted(o.id for o in self.objects.get_outcomes_for_swimlane(swimlane_id)))
+    
+    def test_same_results_after_edits_and_removals(self):
+        for diagram in (self.objects, self.columnar):
+            _edit(diagram)
+            self.assertEqual(diagram.check_consistency(), [])
+        
+        self.assertEqual(self._normalized(self.columnar), self._normalized(self.objects))
+        self.assertEqual(len(self.columnar.blobs), len(self.objects.blobs))
+        self.assertIsNone(self.columnar.get_outcome_by_id(BASE_ID + 100))
+        self.assertIsNone(self.columnar.get_swimlane_by_id(BASE_ID + 3))
+        
+        expected = self._positions(self.objects)
+        actual = self._positions(self.columnar)
+        self.assertEqual(actual.keys(), expected.keys())
+        for outcome_id, (x, y) in expected.items():
+            self.assertTrue(math.isclose(actual[outcome_id][0], x, abs_tol=1e-9))
+            self.assertTrue(math.isclose(actual[outcome_id][1], y, abs_tol=1e-9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the streaming diagram loader.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from models.diagram import SCHEMA_VERSION, Diagram
+from models.persistence import read_diagram
+from models.scope_blob import ScopeBlob
+
+# A diagram saved by radial_diagram.py: swimlanes keyed by name with their
+# outcomes nested, no center and no version
+LEGACY = {
+    'swimlanes': {
+        'Alpha': {'name': 'Alpha', 'angle': 30, 'id': 2, 'color': [0, 0, 0, 255],
+                  'outcomes': [{'id': 4, 'label': 'one', 'distance': 100, 'swimlane_id': 2}]},
+        'Beta': {'name': 'Beta', 'angle': 120, 'id': 3, 'color': [0, 0, 0, 255],
+                 'outcomes': [{'id': 5, 'label': 'three', 'distance': 50, 'swimlane_id': 3}]},
+    },
+    'blobs': [{'id': 6, 'points': [[0, 0], [10, 0], [10, 10]], 'color': [255, 0, 0, 50],
+               'label': 'blob', 'outcome_ids': [4, 5]}],
+}
+
+
+class DiagramStreamTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+    
+    def _write(self, data):
+        """
+        Write data as a JSON diagram file and return its path.
+        """
+        path = os.path.join(self.directory.name, 'diagram.json')
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return path
+    
+    def test_streams_current_file(self):
+        diagram = Diagram()
+        swimlane = diagram.add_swimlane(45, "Lane")
+        diagram.add_outcome(swimlane.id, 120, "Outcome")
+        path = self._write(diagram.to_dict())
+        
+        streamed = Diagram.stream_from_file(path)
+        self.assertEqual(streamed.to_dict(), diagram.to_dict())
+    
+    def test_streams_legacy_file(self):
+        path = self._write(LEGACY)
+        kinds = []
+        
+        streamed = Diagram.stream_from_file(path, lambda kind, obj: kinds.append(kind))
+        self.assertEqual(streamed.to_dict(), read_diagram(path).to_dict())
+        self.assertEqual(sorted(s.label for s in streamed.swimlanes.values()), ['Alpha', 'Beta'])
+        self.assertEqual(len(streamed.outcomes), 2)
+        self.assertEqual(kinds, ['center', 'swimlane', 'swimlane', 'outcome', 'outcome', 'blob'])
+        self.assertEqual(streamed.check_consistency(), [])
+    
+    def test_blobs_load_once_their_outcomes_do(self):
+        diagram = Diagram()
+        swimlane = diagram.add_swimlane(45, "Lane")
+        outcomes = [diagram.add_outcome(swimlane.id, 50 + 20 * i, f"o{i}") for i in range(4)]
+        blob = ScopeBlob([[0, 0], [10, 0], [10, 10]], label="first")
+        blob.start_outcome, blob.end_outcome = outcomes[0], outcomes[1]
+        diagram.add_blob(blob)
+        data = diagram.to_dict()
+        
+        # Blobs written before the outcomes they connect
+        path = self._write({'version': data['version'], 'center': data['center'],
+                            'swimlanes': data['swimlanes'], 'blobs': data['blobs'],
+                            'outcomes': data['outcomes']})
+        labels = []
+        streamed = Diagram.stream_from_file(path, lambda kind, obj: labels.append(getattr(obj, 'label', kind)))
+        
+        self.assertEqual(labels, ['center', 'Lane', 'o0', 'o1', 'first', 'o2', 'o3'])
+        self.assertEqual(streamed.check_consistency(), [])
+        self.assertIs(streamed.blobs[0].end_outcome, streamed.get_outcome_by_id(outcomes[1].id))
+    
+    def test_rejects_newer_file(self):
+        path = self._write({'version': SCHEMA_VERSION + 1, 'center': {'x': 0, 'y': 0},
+                            'swimlanes': [], 'outcomes': [], 'blobs': []})
+        with self.assertRaises(ValueError):
+            Diagram.stream_from_file(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
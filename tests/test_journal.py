@@ -0,0 +1,57 @@
+"""
+Tests for the autosave journal.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from models.diagram import Diagram
+from models.journal import JOURNAL_SUFFIX, DiagramJournal, recover
+
+
+class DiagramJournalTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'autosave')
+    
+    def test_recover_replays_records(self):
+        diagram = Diagram()
+        journal = DiagramJournal(self.path, fsync=False)
+        journal.start(diagram)
+        swimlane = diagram.add_swimlane(30.0, "Lane")
+        diagram.add_outcome(swimlane.id, 100, "Outcome")
+        journal.flush()
+        journal.wait()
+        
+        self.assertEqual(recover(self.path).to_dict(), diagram.to_dict())
+        journal.stop(remove=True)
+    
+    def test_journal_of_earlier_session_is_not_replayed(self):
+        # A session records changes, then exits without removing its journal
+        first = Diagram()
+        journal = DiagramJournal(self.path, fsync=False)
+        journal.start(first)
+        first.add_swimlane(30.0, "Earlier")
+        journal.flush()
+        journal.stop()
+        kept = self.path + '.earlier'
+        shutil.copy(self.path + JOURNAL_SUFFIX, kept)
+        
+        # The next session starts another diagram and crashes after writing
+        # its snapshot but before replacing the journal
+        second = Diagram()
+        second.add_swimlane(200.0, "Current")
+        journal = DiagramJournal(self.path, fsync=False)
+        journal.start(second)
+        journal.stop()
+        os.replace(kept, self.path + JOURNAL_SUFFIX)
+        
+        self.assertEqual(recover(self.path).to_dict(), second.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
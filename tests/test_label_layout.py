@@ -0,0 +1,121 @@
+"""
+Tests for the spatial hash and the label layout built on it.
+"""
+
+import math
+import random
+import time
+import unittest
+
+from PyQt5.QtCore import QPointF, QRectF
+
+from utils.spatial_hash import SpatialHash
+from views.label_layout import LabelLayout, candidates_around
+
+
+class _Label:
+    """
+    Stand-in for a label item: a fixed size and a position.
+    """
+    
+    def __init__(self, width=60, height=12):
+        self.bounds = QRectF(0, 0, width, height)
+        self.position = QPointF()
+    
+    def boundingRect(self):
+        return self.bounds
+    
+    def pos(self):
+        return self.position
+    
+    def setPos(self, pos):
+        self.position = QPointF(pos)
+
+
+def _radial_labels(count, swimlanes=72, extent=100, seed=1):
+    """
+    Labels for outcomes spread over radial swimlanes, crowding near the center
+    as a diagram's do; return (label, candidates) pairs.
+    """
+    rng = random.Random(seed)
+    labels = []
+    for _ in range(count):
+        angle = 2 * math.pi * rng.randrange(swimlanes) / swimlanes
+        distance = rng.uniform(20, extent)
+        center = QPointF(distance * math.cos(angle), distance * math.sin(angle))
+        labels.append((_Label(), candidates_around(center, 5, 60, 12)))
+    return labels
+
+
+def _layout_time(count):
+    layout = LabelLayout()
+    labels = _radial_labels(count)
+    start = time.perf_counter()
+    with layout.deferred():
+        for label, candidates in labels:
+            layout.place(label, candidates)
+    return time.perf_counter() - start
+
+
+class SpatialHashTest(unittest.TestCase):
+    
+    def setUp(self):
+        rng = random.Random(3)
+        self.grid = SpatialHash(64)
+        self.rects = {}
+        for key in range(2000):
+            x, y = rng.uniform(-300, 300), rng.uniform(-300, 300)
+            self.rects[key] = (x, y, x + rng.uniform(5, 80), y + rng.uniform(5, 20))
+            self.grid.insert(key, self.rects[key])
+    
+    def _brute_force(self, rect):
+        left, top, right, bottom = rect
+        return {key for key, (l, t, r, b) in self.rects.items()
+                if l < right and left < r and t < bottom and top < b}
+    
+    def test_query_matches_brute_force(self):
+        for rect in [(-50, -50, 50, 50), (0, 0, 60, 12), (290, 290, 400, 400), (-1000, -1000, 1000, 1000)]:
+            self.assertEqual(self.grid.query(rect), self._brute_force(rect))
+    
+    def test_query_limit(self):
+        rect = (-100, -100, 100, 100)
+        expected = self._brute_force(rect)
+        found = self.grid.query(rect, limit=10)
+        self.assertEqual(len(found), 11)
+        self.assertTrue(found <= expected)
+        # A limit above the number of overlaps changes nothing
+        self.assertEqual(self.grid.query(rect, limit=len(expected)), expected)
+
+
+class LabelLayoutTest(unittest.TestCase):
+    
+    def test_labels_avoid_overlap(self):
+        layout = LabelLayout()
+        first, second = _Label(), _Label()
+        layout.place(first, [QPointF(0, 0), QPointF(0, 20)])
+        layout.place(second, [QPointF(10, 5), QPointF(10, 40)])
+        self.assertEqual(layout.choices[second], 1)
+        self.assertEqual(second.pos(), QPointF(10, 40))
+    
+    def test_drag_places_labels_when_it_ends(self):
+        layout = LabelLayout()
+        first, second = _Label(), _Label()
+        layout.place(first, [QPointF(0, 0), QPointF(0, 20)])
+        layout.begin_drag()
+        layout.place(second, [QPointF(10, 5), QPointF(10, 40)])
+        self.assertEqual(second.pos(), QPointF(10, 5))
+        layout.end_drag()
+        self.assertEqual(second.pos(), QPointF(10, 40))
+    
+    def test_layout_time_close_to_linear(self):
+        # The area is crowded at both sizes, so every label tries all its
+        # candidates; best of two runs, to be robust against a busy machine
+        small = min(_layout_time(4000) for _ in range(2))
+        large = min(_layout_time(8000) for _ in range(2))
+        # Twice the labels in the same area: about 2x when linear, 3x or
+        # more when each query scans every rectangle nearby
+        self.assertLess(large / small, 2.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for the level-of-detail helpers and the per-frame zoom level.
+"""
+
+import unittest
+from unittest import mock
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QColor, QImage, QPainter, QTransform
+from PyQt5.QtWidgets import QStyleOptionGraphicsItem
+
+from commands.undo_history import UndoHistory
+from export.renderer import ensure_application
+from models.diagram import Diagram
+from views import level_of_detail
+from views.diagram_scene import DiagramScene
+from views.outcome_item import OutcomeItem
+
+
+class LevelOfDetailTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        ensure_application()
+    
+    def setUp(self):
+        thresholds = dict(level_of_detail.LOD_THRESHOLDS)
+        self.addCleanup(level_of_detail.set_thresholds, **thresholds)
+        self.image = QImage(20, 20, QImage.Format_ARGB32_Premultiplied)
+        self.painter = QPainter(self.image)
+        self.addCleanup(self.painter.end)
+    
+    def test_full_detail_above_every_threshold(self):
+        option = QStyleOptionGraphicsItem()
+        level_of_detail.set_thresholds(label_block=0.5, blob_polygon=0.6)
+        with level_of_detail.painting_frame(QTransform.fromScale(0.6, 0.6)):
+            self.assertIsNone(level_of_detail.reduced_level_of_detail(option, self.painter))
+        with level_of_detail.painting_frame(QTransform.fromScale(0.4, 0.4)):
+            self.assertAlmostEqual(level_of_detail.reduced_level_of_detail(option, self.painter), 0.4)
+        
+        level_of_detail.set_thresholds(blob_polygon=0.0)
+        with level_of_detail.painting_frame(QTransform.fromScale(0.55, 0.55)):
+            self.assertIsNone(level_of_detail.reduced_level_of_detail(option, self.painter))
+        
+        # Outside a frame the painter's transform is used
+        self.painter.scale(0.25, 0.25)
+        self.assertAlmostEqual(level_of_detail.reduced_level_of_detail(option, self.painter), 0.25)
+    
+    def test_render_paints_items_at_the_frame_level(self):
+        scene = DiagramScene(Diagram(), UndoHistory(limit=0, memory_budget=0))
+        scene.label_layout.enabled = False
+        scene.add_swimlane("Lane", 30)
+        scene.add_outcome("Lane", 120, "Outcome")
+        
+        levels = []
+        paint = OutcomeItem.paint
+        
+        def record(item, painter, option, widget=None):
+            levels.append((level_of_detail._frame_lod,
+                           option.levelOfDetailFromTransform(painter.worldTransform())))
+            return paint(item, painter, option, widget)
+        
+        image = QImage(300, 200, QImage.Format_ARGB32_Premultiplied)
+        image.fill(QColor('white'))
+        painter = QPainter(image)
+        painter.scale(0.5, 0.5)
+        with mock.patch.object(OutcomeItem, 'paint', record):
+            scene.render(painter, QRectF(0, 0, 600, 400), scene.itemsBoundingRect())
+        painter.end()
+        
+        self.assertTrue(levels)
+        for frame, item in levels:
+            self.assertAlmostEqual(frame, item)
+        self.assertIsNone(level_of_detail._frame_lod)
+
+
+if __name__ == '__main__':
+    unittest.main()
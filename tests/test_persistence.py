@@ -0,0 +1,56 @@
+"""
+Tests for reading and writing diagram files.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from models.diagram import Diagram
+from models.persistence import read_diagram
+from utils.id_generator import generate_unique_id
+
+
+class ReadDiagramTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+    
+    def test_objects_added_after_load_get_new_ids(self):
+        path = os.path.join(self.directory.name, 'diagram.json')
+        diagram = Diagram()
+        swimlanes = [diagram.add_swimlane(i * 30.0, f"S{i}") for i in range(12)]
+        diagram.add_outcome(swimlanes[0].id, 100, "O")
+        diagram.add_blob([[0, 0], [10, 0], [10, 10]])
+        
+        # Renumber as another session would have, with the IDs this process
+        # is about to generate
+        data = diagram.to_dict()
+        offset = generate_unique_id()
+        for kind in ('swimlanes', 'outcomes', 'blobs'):
+            for entry in data[kind]:
+                entry['id'] += offset
+        data['outcomes'][0]['swimlane_id'] += offset
+        for key in ('start_swimlane_id', 'end_swimlane_id', 'start_outcome_id', 'end_outcome_id'):
+            if data['blobs'][0][key] is not None:
+                data['blobs'][0][key] += offset
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        
+        loaded = read_diagram(path)
+        used = set(loaded.swimlanes) | set(loaded.outcomes) | {b.id for b in loaded.blobs}
+        swimlane = loaded.add_swimlane(10.0, "new")
+        new_outcome = loaded.add_outcome(swimlane.id, 50, "new")
+        blob = loaded.add_blob([[0, 0], [5, 0], [5, 5]])
+        
+        self.assertEqual(len(loaded.swimlanes), 13)
+        self.assertEqual(len(loaded.outcomes), 2)
+        self.assertEqual(len(loaded.blobs), 2)
+        self.assertFalse({swimlane.id, new_outcome.id, blob.id} & used)
+        self.assertEqual(loaded.check_consistency(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for reclaiming the point store spans of removed and replaced blobs.
+"""
+
+import os
+import tempfile
+import unittest
+
+from models.diagram import Diagram
+from models.scope_blob import ScopeBlob
+
+
+def _points(i, count=5):
+    return [[float(i), float(j)] for j in range(count)]
+
+
+class PointStoreTest(unittest.TestCase):
+    
+    def _live_points(self, diagram):
+        return sum(blob.point_count for blob in diagram.blobs)
+    
+    def test_removing_and_re_adding_stays_bounded(self):
+        diagram = Diagram()
+        blobs = [diagram.add_blob(_points(i), label=f"b{i}") for i in range(20)]
+        expected = {blob.id: blob.points for blob in blobs}
+        
+        # Replace every blob by a rebuilt copy many times, as checkpoint undo/redo does
+        for _ in range(30):
+            for blob in list(diagram.blobs):
+                data = blob.to_dict()
+                diagram.remove_blob(blob)
+                diagram.add_blob(ScopeBlob.from_dict(data))
+        
+        store = diagram.point_store
+        self.assertLessEqual(len(store), 2 * self._live_points(diagram))
+        self.assertLessEqual(store.dead, len(store) // 2)
+        self.assertEqual({blob.id: blob.points for blob in diagram.blobs}, expected)
+    
+    def test_removed_blob_keeps_its_points(self):
+        diagram = Diagram()
+        blobs = [diagram.add_blob(_points(i), label=f"b{i}") for i in range(4)]
+        removed = blobs[:3]
+        for blob in removed:
+            diagram.remove_blob(blob)
+        
+        # Three of four spans were dead, so the store was compacted
+        self.assertEqual(len(diagram.point_store), 5)
+        self.assertEqual(blobs[3].point_offset, 0)
+        self.assertEqual(blobs[3].points, _points(3))
+        for i, blob in enumerate(removed):
+            self.assertIsNone(blob.store)
+            self.assertEqual(blob.points, _points(i))
+        
+        diagram.add_blob(removed[0])
+        self.assertEqual(removed[0].points, _points(0))
+        self.assertIs(removed[0].store, diagram.point_store)
+    
+    def test_compacting_a_mapped_store(self):
+        diagram = Diagram()
+        for i in range(6):
+            diagram.add_blob(_points(i, 3 + i), label=f"b{i}")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'diagram.rdgb')
+            diagram.save_to_file(path)
+            loaded = Diagram.load_from_file(path)
+            self.assertTrue(loaded.point_store.is_mapped)
+            
+            expected = {blob.id: blob.points for blob in loaded.blobs[4:]}
+            loaded._remove_blobs(loaded.blobs[:4])
+            self.assertFalse(loaded.point_store.is_mapped)
+            self.assertEqual(len(loaded.point_store), self._live_points(loaded))
+            self.assertEqual({blob.id: blob.points for blob in loaded.blobs}, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
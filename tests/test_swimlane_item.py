@@ -0,0 +1,68 @@
+"""
+Tests for dragging a swimlane's resize handle.
+"""
+
+import unittest
+
+from PyQt5.QtCore import QPointF, Qt
+from PyQt5.QtWidgets import QGraphicsScene
+
+from commands.undo_history import UndoHistory
+from export.renderer import ensure_application
+from models.diagram import Diagram
+from views.diagram_scene import DiagramScene
+
+
+class _MouseEvent:
+    """
+    Stand-in for a QGraphicsSceneMouseEvent at a scene position.
+    """
+    
+    def __init__(self, scene_pos):
+        self._scene_pos = scene_pos
+    
+    def button(self):
+        return Qt.LeftButton
+    
+    def pos(self):
+        return self._scene_pos
+    
+    def scenePos(self):
+        return self._scene_pos
+    
+    def accept(self):
+        pass
+
+
+class ResizeHandleTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        ensure_application()
+    
+    def test_drag_switches_the_index_off_and_back(self):
+        history = UndoHistory(limit=0, memory_budget=0)
+        scene = DiagramScene(Diagram(), history)
+        scene.label_layout.enabled = False
+        scene.ANIMATION_NO_INDEX_ITEMS = 10
+        swimlane = scene.add_swimlane("Lane", 0)
+        for i in range(8):
+            scene.add_outcome("Lane", 60 + i * 10, f"o{i}")
+        handle = swimlane.item.resize_handle
+        
+        handle.mousePressEvent(_MouseEvent(QPointF(200, 0)))
+        self.assertEqual(scene.itemIndexMethod(), QGraphicsScene.NoIndex)
+        for step in range(1, 5):
+            handle.mouseMoveEvent(_MouseEvent(QPointF(200, step * 20)))
+        handle.mouseReleaseEvent(_MouseEvent(QPointF(200, 80)))
+        
+        self.assertEqual(scene.animation_depth, 0)
+        self.assertEqual(scene.itemIndexMethod(), QGraphicsScene.BspTreeIndex)
+        self.assertIsNone(handle.drag_pos)
+        self.assertFalse(handle.dragging)
+        self.assertEqual(history.count(), 1)
+        self.assertNotEqual(swimlane.angle, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
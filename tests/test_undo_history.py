@@ -0,0 +1,145 @@
+"""
+Tests for the undo history's snapshots, compaction and memory budget.
+"""
+
+import random
+import unittest
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QGraphicsItem
+
+from commands.swimlane_commands import RotateSwimlaneCommand
+from commands.undo_history import UndoHistory, diagram_state
+from export.renderer import ensure_application
+from models.diagram import Diagram
+from models.scope_blob import ScopeBlob
+from views.diagram_scene import DiagramScene
+
+
+def _same_state(first, second):
+    """
+    Check that two snapshots hold the same objects with the same values,
+    allowing for rounding in angles.
+    """
+    for kind in ('swimlanes', 'outcomes', 'blobs'):
+        if set(first[kind]) != set(second[kind]):
+            return False
+        for obj_id, entry in first[kind].items():
+            other = second[kind][obj_id]
+            for field, value in entry.items():
+                if isinstance(value, float):
+                    if abs(value - other[field]) > 1e-6:
+                        return False
+                elif value != other[field]:
+                    return False
+    return True
+
+
+class UndoHistoryTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        ensure_application()
+    
+    def _build(self, history, outcomes=12):
+        """
+        Build a scene with six swimlanes and some outcomes, recorded in a history.
+        """
+        diagram = Diagram()
+        scene = DiagramScene(diagram, history)
+        scene.label_layout.enabled = False
+        lanes = [scene.add_swimlane(f"L{i}", i * 60) for i in range(6)]
+        for i in range(outcomes):
+            scene.add_outcome(f"L{i % 6}", 80 + i % 150, f"o{i}")
+        history.set_scene(scene)
+        return diagram, scene, lanes
+    
+    def _rotate(self, history, lanes, steps, seed=1):
+        """
+        Push random swimlane rotations.
+        """
+        rng = random.Random(seed)
+        for _ in range(steps):
+            lane = rng.choice(lanes)
+            old = lane.item.geometry()[0]
+            new = (old + rng.uniform(5, 40)) % 360
+            lane.item.set_geometry(new)
+            history.push(RotateSwimlaneCommand(lane.item, old, new))
+    
+    def test_snapshots_match_the_model(self):
+        history = UndoHistory(limit=0, memory_budget=0, checkpoint_interval=3)
+        diagram, scene, lanes = self._build(history)
+        for step in range(12):
+            if step == 5:
+                # Removing a swimlane removes its outcomes as well
+                diagram.remove_swimlane(lanes.pop(0).id)
+            self._rotate(history, lanes, 1, seed=step)
+            if history.index() in history.snapshots:
+                state, size = history.snapshots[history.index()]
+                self.assertEqual(state, diagram_state(diagram))
+                self.assertGreater(size, 0)
+    
+    def test_base_snapshot_larger_than_budget(self):
+        history = UndoHistory(limit=0, memory_budget=24 * 1024, checkpoint_interval=5)
+        diagram, scene, lanes = self._build(history, outcomes=300)
+        initial = diagram_state(diagram)
+        self.assertGreater(history.snapshots[0][1], history.memory_budget)
+        
+        self._rotate(history, lanes, 60)
+        final = diagram_state(diagram)
+        
+        # The oldest commands were compacted, not dropped with the start of the history
+        self.assertIn(0, history.snapshots)
+        self.assertGreater(history.compactions, 0)
+        self.assertEqual(history.dropped, 0)
+        self.assertLessEqual(history.memory_usage() - history.snapshots[0][1],
+                             history.memory_budget)
+        
+        while history.canUndo():
+            history.undo()
+        self.assertTrue(_same_state(diagram_state(diagram), initial))
+        while history.canRedo():
+            history.redo()
+        self.assertTrue(_same_state(diagram_state(diagram), final))
+
+    
+    def test_blob_commands_keep_dictionaries(self):
+        stack = UndoHistory(limit=0, memory_budget=0)
+        diagram, scene, lanes = self._build(stack)
+        start, end = diagram.get_outcomes_for_swimlane(lanes[0].id)[:2]
+        blob = ScopeBlob([[0.0, 0.0], [30.0, 5.0], [10.0, 20.0]], QColor(200, 0, 0, 80), label="Scope")
+        blob.start_swimlane = blob.end_swimlane = lanes[0]
+        blob.start_outcome, blob.end_outcome = start, end
+        scene.add_blob_visual(diagram.add_blob(blob))
+        data = blob.to_dict()
+        
+        scene.change_item_color(blob.polygon_item, QColor(0, 0, 200, 80))
+        scene.delete_blob(blob.polygon_item)
+        delete = stack.command(1)
+        self.assertIsNone(diagram.get_blob_by_id(blob.id))
+        self.assertEqual(delete.data['points'], data['points'])
+        self.assertFalse(any(isinstance(value, QGraphicsItem) for value in vars(delete).values()))
+        
+        # Undo rebuilds the blob and its item from the dictionary
+        stack.undo()
+        rebuilt = diagram.get_blob_by_id(blob.id)
+        self.assertIsNot(rebuilt, blob)
+        self.assertIs(rebuilt.polygon_item.scene(), scene)
+        self.assertIn(rebuilt, start.associated_blobs)
+        
+        # The color change applies to the rebuilt item
+        stack.undo()
+        self.assertEqual(diagram.get_blob_by_id(blob.id).to_dict(), data)
+        
+        # Undo and redo of an added blob rebuild it as well
+        added = scene.create_blob(QPointF(0, 0), QPointF(50, 50), "Added")
+        added_data = added.to_dict()
+        stack.undo()
+        self.assertIsNone(diagram.get_blob_by_id(added.id))
+        stack.redo()
+        self.assertEqual(diagram.get_blob_by_id(added.id).to_dict(), added_data)
+        self.assertIs(diagram.get_blob_by_id(added.id).polygon_item.scene(), scene)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Atomic file replacement: write to a temporary file, then rename it over the target.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Permissions of the files mkstemp creates
+PRIVATE_FILE_MODE = 0o600
+
+# Cached result of new_file_mode()
+_new_file_mode = None
+
+
+def new_file_mode():
+    """
+    Get the permissions open() gives new files: 0o666 less the process umask.
+    
+    os.umask() can only read the umask by setting it, which races with other
+    threads creating files, so it is read from /proc/self/status instead
+    (Linux 4.7 and later). Where that is not available new files keep
+    mkstemp's private mode. The umask is read once and the result cached.
+    
+    Returns:
+        int: Permission bits
+    """
+    global _new_file_mode
+    
+    if _new_file_mode is None:
+        mode = PRIVATE_FILE_MODE
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('Umask:'):
+                        mode = 0o666 & ~int(line.split()[1], 8)
+                        break
+        except (OSError, ValueError, IndexError):
+            pass
+        _new_file_mode = mode
+    return _new_file_mode
+
+
+def fsync_path(path):
+    """
+    Flush a file's data to disk.
+    
+    The file is opened for writing: on Windows os.fsync() fails with EBADF
+    on a read-only descriptor. The file must therefore be writable.
+    
+    Args:
+        path (str): Path of the file
+    """
+    fd = os.open(path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(path):
+    """
+    Flush a directory entry change (e.g. a rename) to disk, where supported.
+    
+    Args:
+        path (str): Path of the directory
+    """
+    if os.name != 'posix':
+        return
+    try:
+        # Directories can only be opened read-only
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        # Some filesystems do not allow fsync on directories
+        pass
+
+
+@contextmanager
+def atomic_output(filename, fsync=True):
+    """
+    Context manager giving a temporary path to write instead of filename.
+    
+    The temporary file is created next to filename, so the final rename stays
+    on one filesystem. When the block exits normally the temporary file
+    replaces filename in one step; readers see either the old file or the
+    complete new one, never a partial write. If the block raises, the
+    temporary file is removed and filename is left untouched. The new file
+    keeps the permissions of the one it replaces, or gets new_file_mode().
+    
+    Args:
+        filename (str): Final path
+        fsync (bool, optional): Flush the data and the directory entry to disk
+            before returning. Defaults to True.
+            
+    Yields:
+        str: Temporary path to write to
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(filename) + '.', suffix='.tmp',
+                                     dir=directory)
+    os.close(fd)
+    try:
+        yield temp_path
+        
+        # Flush while the temporary file is still writable by its owner
+        if fsync:
+            fsync_path(temp_path)
+        
+        # mkstemp creates private files; match the file being replaced instead
+        try:
+            mode = os.stat(filename).st_mode & 0o7777
+        except OSError:
+            mode = new_file_mode()
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filename)
+        if fsync:
+            fsync_directory(directory)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,53 @@
+"""
+JSON encoding to and decoding from bytes, using orjson when it is installed.
+
+orjson is optional; without it the standard library json module is used, so
+the output is the same JSON either way (whitespace aside).
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def dumps(data, indent=None):
+    """
+    Serialize data to UTF-8 encoded JSON.
+    
+    Args:
+        data: JSON-compatible data (dicts with string keys, lists, str, int,
+            float, bool, None)
+        indent (int, optional): 2 to indent nested values by two spaces, as
+            json.dump(indent=2) does. Defaults to None (compact output).
+            
+    Returns:
+        bytes: The JSON document
+        
+    Raises:
+        ValueError: If indent is neither None nor 2
+    """
+    if indent not in (None, 2):
+        raise ValueError(f"Unsupported JSON indent: {indent}")
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=indent).encode('utf-8')
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """
+    Parse a JSON document.
+    
+    Args:
+        data (bytes or str): The JSON document
+        
+    Returns:
+        The parsed data
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -5,6 +5,11 @@ Utility functions for geometric calculations.
 import math
 from PyQt5.QtCore import QPointF, QLineF
 
+try:
+    import numpy as np
+except ImportError:  # Optional dependency, used by the batch functions
+    np = None
+
 
 def calculate_point_on_line(start_point, angle_rad, distance):
     """
@@ -78,3 +83,176 @@ def calculate_arc_points(center, start_point, end_point, num_points=20):
         points.append(QPointF(x, y))
     
     return points
+
+
+def point_xy(point):
+    """
+    Get the coordinates of a point in any of the supported representations.
+    
+    Args:
+        point: A QPointF, an {'x': .., 'y': ..} dict or an (x, y) sequence
+        
+    Returns:
+        tuple: (x, y)
+    """
+    if isinstance(point, QPointF):
+        return point.x(), point.y()
+    if isinstance(point, dict):
+        return point['x'], point['y']
+    return point[0], point[1]
+
+
+# Batch variants of the functions above. They take sequences (or numpy arrays)
+# and return numpy arrays, falling back to lists when numpy is not installed or
+# use_numpy is False.
+
+def _use_numpy(use_numpy):
+    """
+    Resolve the use_numpy argument of the batch functions.
+    """
+    if use_numpy is None:
+        return np is not None
+    if use_numpy and np is None:
+        raise ImportError("numpy is not installed")
+    return use_numpy
+
+
+def _xy_array(points):
+    """
+    Convert points to an (n, 2) float array.
+    """
+    if isinstance(points, np.ndarray):
+        return points.reshape(-1, 2).astype(float, copy=False)
+    return np.array([point_xy(p) for p in points], dtype=float).reshape(-1, 2)
+
+
+def calculate_points_on_lines(start_point, angles_rad, distances, use_numpy=None):
+    """
+    Calculate many points on lines from start_point, one per angle/distance pair.
+    
+    Batch version of calculate_point_on_line. A scalar angle or distance is
+    used for every point.
+    
+    Args:
+        start_point: The common starting point (QPointF or (x, y))
+        angles_rad: Angles in radians (sequence, array or scalar)
+        distances: Distances from the starting point (sequence, array or scalar)
+        use_numpy (bool, optional): Use numpy. Defaults to None (if installed).
+        
+    Returns:
+        numpy.ndarray: (n, 2) array of x, y, or a list of (x, y) tuples without numpy
+    """
+    sx, sy = point_xy(start_point)
+    if _use_numpy(use_numpy):
+        angles_rad = np.asarray(angles_rad, dtype=float)
+        distances = np.asarray(distances, dtype=float)
+        result = np.empty(np.broadcast(angles_rad, distances).shape + (2,))
+        result[..., 0] = sx + distances * np.cos(angles_rad)
+        result[..., 1] = sy + distances * np.sin(angles_rad)
+        return result.reshape(-1, 2)
+    
+    if not hasattr(angles_rad, '__len__'):
+        angles_rad = [angles_rad] * len(distances)
+    elif not hasattr(distances, '__len__'):
+        distances = [distances] * len(angles_rad)
+    cos, sin = math.cos, math.sin
+    return [(sx + d * cos(a), sy + d * sin(a)) for a, d in zip(angles_rad, distances)]
+
+
+def distances_points_to_line(points, line_start, line_end, use_numpy=None):
+    """
+    Calculate the distance from many points to one line segment.
+    
+    Batch version of distance_point_to_line.
+    
+    Args:
+        points: Points as an (n, 2) array, (x, y) sequences or QPointFs
+        line_start: Start of the segment (QPointF or (x, y))
+        line_end: End of the segment (QPointF or (x, y))
+        use_numpy (bool, optional): Use numpy. Defaults to None (if installed).
+        
+    Returns:
+        numpy.ndarray: (n,) distances, or a list without numpy
+    """
+    ax, ay = point_xy(line_start)
+    bx, by = point_xy(line_end)
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx * dx + dy * dy
+    
+    if _use_numpy(use_numpy):
+        xy = _xy_array(points)
+        px = xy[:, 0] - ax
+        py = xy[:, 1] - ay
+        if length_sq == 0:  # Line is a point
+            return np.hypot(px, py)
+        # Clamp the projection onto the segment
+        t = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0)
+        return np.hypot(px - t * dx, py - t * dy)
+    
+    result = []
+    for point in points:
+        px, py = point_xy(point)
+        px -= ax
+        py -= ay
+        t = 0.0 if length_sq == 0 else min(1.0, max(0.0, (px * dx + py * dy) / length_sq))
+        result.append(math.hypot(px - t * dx, py - t * dy))
+    return result
+
+
+def calculate_arc_point_array(center, radius, start_angle, end_angle, num_points=20, use_numpy=None):
+    """
+    Calculate evenly spaced points along an arc between two angles.
+    
+    Args:
+        center: Center of the arc (QPointF or (x, y))
+        radius (float): Radius of the arc
+        start_angle (float): Start angle in radians
+        end_angle (float): End angle in radians
+        num_points (int, optional): Number of points, including both ends. Defaults to 20.
+        use_numpy (bool, optional): Use numpy. Defaults to None (if installed).
+        
+    Returns:
+        numpy.ndarray: (num_points, 2) array of x, y, or a list of (x, y) tuples without numpy
+    """
+    if _use_numpy(use_numpy):
+        angles = np.linspace(start_angle, end_angle, num_points)
+        return calculate_points_on_lines(center, angles, radius, use_numpy=True)
+    
+    steps = max(num_points - 1, 1)
+    angles = [start_angle + (end_angle - start_angle) * i / steps for i in range(num_points)]
+    return calculate_points_on_lines(center, angles, radius, use_numpy=False)
+
+
+def calculate_arc_points_between(center, start_point, end_point, num_points=20, use_numpy=None):
+    """
+    Calculate points along an arc from start_point to end_point around center.
+    
+    Array version of calculate_arc_points, with the same rules for direction
+    and radius.
+    
+    Args:
+        center: Center of the arc (QPointF or (x, y))
+        start_point: Start of the arc (QPointF or (x, y))
+        end_point: End of the arc (QPointF or (x, y))
+        num_points (int, optional): Number of points. Defaults to 20.
+        use_numpy (bool, optional): Use numpy. Defaults to None (if installed).
+        
+    Returns:
+        numpy.ndarray: (num_points, 2) array of x, y, or a list of (x, y) tuples without numpy
+    """
+    cx, cy = point_xy(center)
+    x1, y1 = point_xy(start_point)
+    x2, y2 = point_xy(end_point)
+    start_angle = math.atan2(y1 - cy, x1 - cx)
+    end_angle = math.atan2(y2 - cy, x2 - cx)
+    
+    # Ensure we go the shorter way around
+    if abs(end_angle - start_angle) > math.pi:
+        if end_angle > start_angle:
+            start_angle += 2 * math.pi
+        else:
+            end_angle += 2 * math.pi
+    
+    radius = (math.hypot(x1 - cx, y1 - cy) + math.hypot(x2 - cx, y2 - cy)) / 2
+    return calculate_arc_point_array((cx, cy), radius, start_angle, end_angle, num_points, use_numpy)
@@ -13,6 +13,18 @@ def generate_unique_id():
     _NEXT_ID += 1
     return _NEXT_ID
 
+def reserve_id(value):
+    """
+    Make sure an ID that was not generated here, e.g. one loaded from a
+    file, is never generated later.
+    
+    Args:
+        value: The ID; anything other than an int is ignored
+    """
+    global _NEXT_ID
+    if isinstance(value, int) and value > _NEXT_ID:
+        _NEXT_ID = value
+
 # Alias for generate_unique_id for backward compatibility
 generate_id = generate_unique_id
 
@@ -0,0 +1,196 @@
+"""
+Event-based (streaming) JSON tokenizer.
+
+Reads a JSON document from a file object in chunks and yields parse events
+instead of building the whole document in memory:
+
+    ('start_map', None), ('map_key', key), ('end_map', None),
+    ('start_array', None), ('end_array', None),
+    ('string', str), ('number', int | float), ('boolean', bool), ('null', None)
+"""
+
+import re
+from json.decoder import scanstring
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Characters to keep buffered ahead of a number or literal so it is never split
+_LOOKAHEAD = 64
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+_LITERALS = (('true', 'boolean', True), ('false', 'boolean', False), ('null', 'null', None))
+
+_MAP = 0
+_ARRAY = 1
+
+
+def iter_json_events(fp, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Tokenize a JSON document into a stream of parse events.
+    
+    Args:
+        fp: Text file object to read from
+        chunk_size (int, optional): Number of characters to read at a time. Defaults to 64 KiB.
+        
+    Yields:
+        tuple: (event, value) pairs
+        
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    buf = ''
+    pos = 0
+    eof = False
+    stack = []
+    expect_key = False
+    
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        
+        # Refill when the buffer is exhausted or a number/literal might be split
+        if not eof and len(buf) - pos < _LOOKAHEAD:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        
+        if pos >= len(buf):
+            break
+        
+        char = buf[pos]
+        
+        if char == '"':
+            try:
+                value, end = scanstring(buf, pos + 1)
+            except ValueError:
+                if eof:
+                    raise
+                # The string continues past the end of the buffer
+                chunk = fp.read(chunk_size)
+                if not chunk:
+                    eof = True
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            pos = end
+            if expect_key:
+                expect_key = False
+                yield 'map_key', value
+            else:
+                yield 'string', value
+        elif char == ',':
+            pos += 1
+            expect_key = bool(stack) and stack[-1] == _MAP
+        elif char == ':':
+            pos += 1
+        elif char == '{':
+            pos += 1
+            stack.append(_MAP)
+            expect_key = True
+            yield 'start_map', None
+        elif char == '}':
+            pos += 1
+            stack.pop()
+            expect_key = False
+            yield 'end_map', None
+        elif char == '[':
+            pos += 1
+            stack.append(_ARRAY)
+            yield 'start_array', None
+        elif char == ']':
+            pos += 1
+            stack.pop()
+            yield 'end_array', None
+        elif char == '-' or '0' <= char <= '9':
+            match = _NUMBER.match(buf, pos)
+            if not match:
+                raise ValueError(f"Invalid number at position {pos}")
+            pos = match.end()
+            text = match.group(0)
+            if match.group(1) or match.group(2):
+                yield 'number', float(text)
+            else:
+                yield 'number', int(text)
+        else:
+            for literal, event, value in _LITERALS:
+                if buf.startswith(literal, pos):
+                    pos += len(literal)
+                    yield event, value
+                    break
+            else:
+                raise ValueError(f"Unexpected character {char!r} at position {pos}")
+    
+    if stack:
+        raise ValueError("Unexpected end of JSON document")
+
+
+def iter_items(events, prefixes):
+    """
+    Assemble complete values found at the given paths of an event stream.
+    
+    Paths are dotted, with ``item`` standing for any array element, e.g.
+    ``'swimlanes.item'`` yields each element of the top-level ``swimlanes``
+    array as soon as it has been parsed.
+    
+    Args:
+        events: Iterable of (event, value) pairs from iter_json_events
+        prefixes: Paths to extract
+        
+    Yields:
+        tuple: (prefix, value) pairs in document order
+    """
+    prefixes = set(prefixes)
+    path = []
+    
+    # State for the value currently being assembled
+    prefix = None
+    containers = []
+    keys = []
+    
+    for event, value in events:
+        if containers:
+            if event == 'map_key':
+                keys[-1] = value
+                continue
+            
+            if event == 'start_map' or event == 'start_array':
+                value = {} if event == 'start_map' else []
+            elif event == 'end_map' or event == 'end_array':
+                containers.pop()
+                keys.pop()
+                if not containers:
+                    yield prefix, result
+                continue
+            
+            parent = containers[-1]
+            if isinstance(parent, list):
+                parent.append(value)
+            else:
+                parent[keys[-1]] = value
+            
+            if event == 'start_map' or event == 'start_array':
+                containers.append(value)
+                keys.append(None)
+            continue
+        
+        if event == 'map_key':
+            path[-1] = value
+        elif event == 'end_map' or event == 'end_array':
+            path.pop()
+        else:
+            current = '.'.join(path)
+            if current in prefixes:
+                if event == 'start_map' or event == 'start_array':
+                    prefix = current
+                    result = {} if event == 'start_map' else []
+                    containers.append(result)
+                    keys.append(None)
+                else:
+                    yield current, value
+            elif event == 'start_map':
+                path.append(None)
+            elif event == 'start_array':
+                path.append('item')
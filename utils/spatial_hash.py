@@ -0,0 +1,165 @@
+"""
+Uniform-grid spatial hash for fast rectangle overlap queries.
+"""
+
+import math
+
+
+class SpatialHash:
+    """
+    Rectangles bucketed into the cells of a uniform grid.
+    
+    Each rectangle is stored in every cell it touches, so an overlap query
+    only looks at the rectangles in the cells the query touches. With cells
+    about the size of a typical rectangle, inserts, removals and queries cost
+    O(1) on average regardless of how many rectangles are stored.
+    
+    Rectangles are (left, top, right, bottom) tuples and are stored under a
+    hashable key (e.g. the item they belong to).
+    
+    Attributes:
+        cell_size (float): Width and height of a grid cell
+        cells (dict): (column, row) -> set of keys
+        rects (dict): key -> rectangle
+    """
+    
+    def __init__(self, cell_size=64):
+        """
+        Initialize an empty SpatialHash.
+        
+        Args:
+            cell_size (float, optional): Width and height of a grid cell. Defaults to 64.
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.rects = {}
+    
+    def __len__(self):
+        """
+        Return the number of stored rectangles.
+        """
+        return len(self.rects)
+    
+    def __contains__(self, key):
+        """
+        Check whether a key is stored.
+        """
+        return key in self.rects
+    
+    def clear(self):
+        """
+        Remove all rectangles.
+        """
+        self.cells.clear()
+        self.rects.clear()
+    
+    def _cell_range(self, rect):
+        """
+        Get the grid cells a rectangle touches.
+        
+        Args:
+            rect (tuple): (left, top, right, bottom)
+            
+        Returns:
+            tuple: (first column, last column, first row, last row)
+        """
+        size = self.cell_size
+        left, top, right, bottom = rect
+        return (int(math.floor(left / size)), int(math.floor(right / size)),
+                int(math.floor(top / size)), int(math.floor(bottom / size)))
+    
+    def insert(self, key, rect):
+        """
+        Store a rectangle, replacing any rectangle already stored for key.
+        
+        Args:
+            key: Hashable key
+            rect (tuple): (left, top, right, bottom)
+        """
+        if key in self.rects:
+            self.remove(key)
+        self.rects[key] = rect
+        first_col, last_col, first_row, last_row = self._cell_range(rect)
+        cells = self.cells
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                bucket = cells.get((col, row))
+                if bucket is None:
+                    cells[(col, row)] = {key}
+                else:
+                    bucket.add(key)
+    
+    def remove(self, key):
+        """
+        Remove the rectangle stored for key, if any.
+        
+        Args:
+            key: Hashable key
+            
+        Returns:
+            tuple: The removed rectangle, or None if key was not stored
+        """
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return None
+        first_col, last_col, first_row, last_row = self._cell_range(rect)
+        cells = self.cells
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                bucket = cells.get((col, row))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del cells[(col, row)]
+        return rect
+    
+    def get(self, key):
+        """
+        Get the rectangle stored for key.
+        
+        Args:
+            key: Hashable key
+            
+        Returns:
+            tuple: The rectangle, or None if key is not stored
+        """
+        return self.rects.get(key)
+    
+    def query(self, rect, limit=None):
+        """
+        Find the keys whose rectangles overlap a rectangle.
+        
+        Rectangles that only touch along an edge do not overlap.
+        
+        Args:
+            rect (tuple): (left, top, right, bottom)
+            limit (int, optional): Stop once more than this many keys are
+                found, for callers that only need to know an area is full.
+                Defaults to no limit.
+            
+        Returns:
+            set: Keys of overlapping rectangles
+        """
+        left, top, right, bottom = rect
+        first_col, last_col, first_row, last_row = self._cell_range(rect)
+        cells = self.cells
+        rects = self.rects
+        found = set()
+        # Test the keys bucket by bucket, so a limited query in a crowded
+        # area stops after a few buckets instead of gathering all of them
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                bucket = cells.get((col, row))
+                if not bucket:
+                    continue
+                for key in bucket:
+                    if key in found:
+                        continue
+                    other_left, other_top, other_right, other_bottom = rects[key]
+                    if other_left < right and left < other_right and other_top < bottom and top < other_bottom:
+                        found.add(key)
+                        if limit is not None and len(found) > limit:
+                            return found
+        return found
@@ -0,0 +1,249 @@
+"""
+Angular/radial index for fast swimlane and outcome hit-testing.
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+
+
+class RadialIndex:
+    """
+    Index of swimlanes sorted by angle and outcomes sorted by distance.
+    
+    Swimlanes are kept in a sorted-by-angle array so the closest swimlane to a
+    direction is found with a bisect lookup. Each swimlane keeps its own sorted
+    array of outcome distances, so the closest outcome along a swimlane is
+    found the same way. All lookups cost O(log n).
+    
+    Objects are stored by their ``id`` attribute and returned as-is, so the
+    index works for any model object exposing ``id`` and ``angle`` (swimlanes)
+    or ``id`` and ``distance`` (outcomes).
+    
+    Attributes:
+        angles (list): Sorted swimlane angles in degrees, normalized to [0, 360)
+        swimlane_ids (list): Swimlane IDs parallel to ``angles``
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty RadialIndex.
+        """
+        self.angles = []
+        self.swimlane_ids = []
+        self._swimlanes = {}  # swimlane_id -> (angle, swimlane)
+        self._distances = {}  # swimlane_id -> sorted list of distances
+        self._outcome_ids = {}  # swimlane_id -> outcome IDs parallel to distances
+        self._outcomes = {}  # outcome_id -> (swimlane_id, distance, outcome)
+    
+    def clear(self):
+        """
+        Remove everything from the index.
+        """
+        self.angles = []
+        self.swimlane_ids = []
+        self._swimlanes.clear()
+        self._distances.clear()
+        self._outcome_ids.clear()
+        self._outcomes.clear()
+    
+    def __len__(self):
+        """
+        Return the number of indexed swimlanes.
+        """
+        return len(self.angles)
+    
+    def add_swimlane(self, swimlane, angle=None):
+        """
+        Add a swimlane to the index, or move it if it is already indexed.
+        
+        Args:
+            swimlane: The swimlane to index
+            angle (float, optional): Angle in degrees. Defaults to swimlane.angle.
+        """
+        if swimlane.id in self._swimlanes:
+            self._remove_angle(swimlane.id)
+        
+        angle = (swimlane.angle if angle is None else angle) % 360
+        pos = bisect_right(self.angles, angle)
+        self.angles.insert(pos, angle)
+        self.swimlane_ids.insert(pos, swimlane.id)
+        self._swimlanes[swimlane.id] = (angle, swimlane)
+        self._distances.setdefault(swimlane.id, [])
+        self._outcome_ids.setdefault(swimlane.id, [])
+    
+    # Moving a swimlane is a remove/insert of its angle
+    update_swimlane = add_swimlane
+    
+    def remove_swimlane(self, swimlane_id):
+        """
+        Remove a swimlane and all outcomes indexed on it.
+        
+        Args:
+            swimlane_id: ID of the swimlane to remove
+        """
+        if swimlane_id not in self._swimlanes:
+            return
+        
+        self._remove_angle(swimlane_id)
+        del self._swimlanes[swimlane_id]
+        for outcome_id in self._outcome_ids.pop(swimlane_id, []):
+            self._outcomes.pop(outcome_id, None)
+        self._distances.pop(swimlane_id, None)
+    
+    def _remove_angle(self, swimlane_id):
+        """
+        Remove a swimlane's entry from the sorted angle arrays.
+        
+        Args:
+            swimlane_id: ID of the swimlane to remove
+        """
+        angle = self._swimlanes[swimlane_id][0]
+        pos = bisect_left(self.angles, angle)
+        while pos < len(self.angles) and self.swimlane_ids[pos] != swimlane_id:
+            pos += 1
+        if pos < len(self.angles):
+            del self.angles[pos]
+            del self.swimlane_ids[pos]
+    
+    def add_outcome(self, outcome, swimlane_id=None, distance=None):
+        """
+        Add an outcome to the index, or move it if it is already indexed.
+        
+        Args:
+            outcome: The outcome to index
+            swimlane_id (optional): Swimlane ID. Defaults to outcome.swimlane_id.
+            distance (float, optional): Distance from center. Defaults to outcome.distance.
+        """
+        if outcome.id in self._outcomes:
+            self.remove_outcome(outcome.id)
+        
+        swimlane_id = outcome.swimlane_id if swimlane_id is None else swimlane_id
+        distance = outcome.distance if distance is None else distance
+        distances = self._distances.setdefault(swimlane_id, [])
+        outcome_ids = self._outcome_ids.setdefault(swimlane_id, [])
+        
+        pos = bisect_right(distances, distance)
+        distances.insert(pos, distance)
+        outcome_ids.insert(pos, outcome.id)
+        self._outcomes[outcome.id] = (swimlane_id, distance, outcome)
+    
+    # Moving an outcome is a remove/insert of its distance
+    update_outcome = add_outcome
+    
+    def remove_outcome(self, outcome_id):
+        """
+        Remove an outcome from the index.
+        
+        Args:
+            outcome_id: ID of the outcome to remove
+        """
+        entry = self._outcomes.pop(outcome_id, None)
+        if entry is None:
+            return
+        
+        swimlane_id, distance, _ = entry
+        distances = self._distances[swimlane_id]
+        outcome_ids = self._outcome_ids[swimlane_id]
+        pos = bisect_left(distances, distance)
+        while pos < len(distances) and outcome_ids[pos] != outcome_id:
+            pos += 1
+        if pos < len(distances):
+            del distances[pos]
+            del outcome_ids[pos]
+    
+    def closest_swimlane(self, angle):
+        """
+        Find the swimlane whose angle is closest to the given angle.
+        
+        Args:
+            angle (float): Angle in degrees
+            
+        Returns:
+            The closest swimlane, or None if the index is empty
+        """
+        if not self.angles:
+            return None
+        
+        angle %= 360
+        pos = bisect_left(self.angles, angle)
+        # The closest angle is one of the two neighbours, wrapping around 360
+        before = self.angles[pos - 1]
+        after_pos = pos % len(self.angles)
+        after = self.angles[after_pos]
+        
+        diff_before = min((angle - before) % 360, (before - angle) % 360)
+        diff_after = min((after - angle) % 360, (angle - after) % 360)
+        best = pos - 1 if diff_before <= diff_after else after_pos
+        return self._swimlanes[self.swimlane_ids[best]][1]
+    
+    def closest_swimlane_to_point(self, center, point):
+        """
+        Find the swimlane closest in direction to a scene point.
+        
+        Args:
+            center (QPointF): Center of the diagram
+            point (QPointF): Point to test
+            
+        Returns:
+            The closest swimlane, or None if the index is empty
+        """
+        dx = point.x() - center.x()
+        dy = point.y() - center.y()
+        return self.closest_swimlane(math.degrees(math.atan2(dy, dx)))
+    
+    def closest_outcome(self, swimlane_id, distance):
+        """
+        Find the outcome on a swimlane whose distance is closest to the given one.
+        
+        Args:
+            swimlane_id: ID of the swimlane to search
+            distance (float): Distance from center
+            
+        Returns:
+            The closest outcome, or None if the swimlane has no outcomes
+        """
+        distances = self._distances.get(swimlane_id)
+        if not distances:
+            return None
+        
+        pos = bisect_left(distances, distance)
+        if pos == len(distances):
+            best = pos - 1
+        elif pos == 0:
+            best = 0
+        else:
+            best = pos if distances[pos] - distance < distance - distances[pos - 1] else pos - 1
+        return self._outcomes[self._outcome_ids[swimlane_id][best]][2]
+    
+    def closest_outcome_to_point(self, center, point, swimlane):
+        """
+        Find the outcome on a swimlane closest to a scene point.
+        
+        Outcomes on a swimlane are collinear, so the nearest one in the plane is
+        the one nearest to the point's projection onto the swimlane.
+        
+        Args:
+            center (QPointF): Center of the diagram
+            point (QPointF): Point to test
+            swimlane: The swimlane to search
+            
+        Returns:
+            The closest outcome, or None if the swimlane has no outcomes
+        """
+        angle_rad = math.radians(swimlane.angle)
+        dx = point.x() - center.x()
+        dy = point.y() - center.y()
+        projection = dx * math.cos(angle_rad) + dy * math.sin(angle_rad)
+        return self.closest_outcome(swimlane.id, projection)
+    
+    def outcomes_on_swimlane(self, swimlane_id):
+        """
+        Get the outcomes on a swimlane, sorted by distance from center.
+        
+        Args:
+            swimlane_id: ID of the swimlane
+            
+        Returns:
+            list: Outcomes ordered by distance
+        """
+        return [self._outcomes[outcome_id][2] for outcome_id in self._outcome_ids.get(swimlane_id, [])]
@@ -3,14 +3,60 @@ DiagramScene class for managing the visual representation of the diagram.
 """
 
 import math
+from contextlib import contextmanager
 from PyQt5.QtWidgets import QGraphicsScene, QGraphicsLineItem, QGraphicsEllipseItem, QMenu, QAction
-from PyQt5.QtCore import Qt, QPointF, pyqtSignal
-from PyQt5.QtGui import QPen, QColor, QBrush
+from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSignal
+from PyQt5.QtGui import QPen, QColor, QBrush, QFont, QTransform
+
+from styles.colors import COLORS
 
 from utils.geometry import calculate_point_on_line
+from utils.spatial_index import RadialIndex
 from commands.add_blob_command import AddBlobCommand
+from commands.batch_command import BatchCommand
 from commands.delete_blob_command import DeleteBlobCommand
 from commands.change_color_command import ChangeColorCommand
+from commands.swimlane_commands import RotateSwimlaneCommand
+from commands.transaction_command import TransactionCommand
+from views.label_layout import LabelLayout
+from views.update_coalescer import UpdateCoalescer
+from views.level_of_detail import below, painting_frame
+
+# Spatial index strategies, by name (see DiagramScene.set_index_mode):
+#   'auto'  BSP tree with its depth tuned to the number of items and a fixed
+#           scene rect sized from the longest swimlane; switched off while a
+#           gesture moves many items every frame (see begin_animation)
+#   'bsp'   BSP tree with Qt's default depth and the growing scene rect
+#   'none'  no index: every query tests every item
+INDEX_MODES = {
+    'auto': QGraphicsScene.BspTreeIndex,
+    'bsp': QGraphicsScene.BspTreeIndex,
+    'none': QGraphicsScene.NoIndex,
+}
+
+# Items per BSP leaf the 'auto' depth aims for, and the depth limits
+BSP_LEAF_ITEMS = 4
+MIN_BSP_DEPTH = 5
+MAX_BSP_DEPTH = 12
+
+
+def bsp_depth_for(count):
+    """
+    Choose a BSP tree depth for a number of items.
+    
+    Qt's own choice grows too deep for large diagrams (depth 15 for 20,000
+    items, 17 for 100,000): building the index and moving items get many
+    times slower, while queries gain little past depth 12 (see
+    benchmarks/bench_scene_index.py).
+    
+    Args:
+        count (int): Number of items in the scene
+        
+    Returns:
+        int: Depth giving about BSP_LEAF_ITEMS items per leaf
+    """
+    depth = round(math.log2(max(count, 1) / BSP_LEAF_ITEMS))
+    return min(max(depth, MIN_BSP_DEPTH), MAX_BSP_DEPTH)
 
 
 class DiagramScene(QGraphicsScene):
@@ -27,12 +73,33 @@ class DiagramScene(QGraphicsScene):
         end_swimlane: Ending swimlane for blob creation
         start_outcome: Starting outcome for blob creation
         end_outcome: Ending outcome for blob creation
+        radial_index (RadialIndex): Angle/distance index for closest swimlane/outcome queries
+        label_layout (LabelLayout): Places item labels so they do not overlap
+        update_coalescer (UpdateCoalescer): Applies drag updates once per frame
+        transaction (TransactionCommand): The open transaction, or None
+        bulk_depth (int): Nesting depth of bulk_update() blocks
+        show_center (bool): Whether the center indicator is drawn in the background
+        index_mode (str): Spatial index strategy, a key of INDEX_MODES
+        animation_depth (int): Nesting depth of begin_animation() calls
     """
     
     blob_created = pyqtSignal(object)
     blob_deleted = pyqtSignal(object)
     
-    def __init__(self, diagram, undo_stack, parent=None):
+    # Spacing of the distance rings drawn around the center, in scene units
+    RING_SPACING = 50
+    CENTER_RADIUS = 5
+    
+    # Room around the longest swimlane for labels, and the step the fixed
+    # scene rect grows by (changing it rebuilds the index)
+    SCENE_MARGIN = 100
+    SCENE_RECT_STEP = 250
+    
+    # Items a gesture must move every frame for the 'auto' index mode to
+    # switch the index off until the gesture ends
+    ANIMATION_NO_INDEX_ITEMS = 500
+    
+    def __init__(self, diagram, undo_stack, parent=None, index_mode='auto'):
         """
         Initialize a new DiagramScene.
         
@@ -40,6 +107,7 @@ class DiagramScene(QGraphicsScene):
             diagram (Diagram): The diagram model
             undo_stack (QUndoStack): Stack for undo/redo commands
             parent (QObject, optional): Parent object. Defaults to None.
+            index_mode (str, optional): A key of INDEX_MODES. Defaults to 'auto'.
         """
         super().__init__(parent)
         self.diagram = diagram
@@ -48,6 +116,7 @@ class DiagramScene(QGraphicsScene):
         # Keep radius for other calculations but not for swimlane length
         self.radius = 300  # Default radius
         self.selected_item = None
+        self.show_center = False
         
         # For blob creation
         self.start_swimlane = None
@@ -55,32 +124,423 @@ class DiagramScene(QGraphicsScene):
         self.start_outcome = None
         self.end_outcome = None
         
+        # Index for closest swimlane/outcome lookups, kept up to date by the items
+        self.radial_index = RadialIndex()
+        self.label_layout = LabelLayout()
+        
+        # Drags schedule their geometry updates here instead of applying every mouse event
+        self.update_coalescer = UpdateCoalescer(self)
+        
+        # Changes recorded during a gesture, pushed as one undo entry
+        self.transaction = None
+        self._transaction_depth = 0
+        
+        # Inside bulk_update(), background invalidation waits until the end
+        self.bulk_depth = 0
+        self._background_dirty = False
+        
+        # Spatial index; begin_animation() may switch it off during a gesture
+        self.index_mode = None
+        self.animation_depth = 0
+        self._animation_no_index = False
+        self.set_index_mode(index_mode)
+        
         # Initialize the scene
         self.init_scene()
     
-    def init_scene(self):
+    def init_scene(self, loader=None, callback=None):
         """
         Initialize the scene with visual elements from the diagram model.
+        
+        Args:
+            loader (DiagramStreamLoader, optional): If given, the scene adopts the
+                loader's diagram and adds items as the loader parses them, instead
+                of waiting for the whole file. Defaults to None.
+            callback (callable, optional): Called with (kind, object) after each
+                streamed item is added, e.g. to process events. Defaults to None.
+        """
+        self.reset()
+        
+        if loader is None:
+            self.add_model_visuals(self.model_items())
+            return
+        
+        # Labels are laid out together once all items exist
+        with self.label_layout.deferred():
+            self.diagram = loader.diagram
+            for kind, obj in loader:
+                self.add_model_visual(kind, obj)
+                if callback:
+                    callback(kind, obj)
+        
+    def reset(self, diagram=None):
         """
-        # Clear the scene
+        Remove all items, optionally switching to another diagram, without
+        adding new ones (see init_scene and views.scene_loader.SceneLoader).
+        
+        Args:
+            diagram (Diagram, optional): The diagram to show from now on.
+                Defaults to None (keep the current one).
+        """
+        if diagram is not None:
+            self.diagram = diagram
+            self.center = diagram.center
         self.clear()
+        self.radial_index.clear()
+        self.label_layout.clear()
+        self.show_center = False
+        self.animation_depth = 0
+        self._animation_no_index = False
+        self.setItemIndexMethod(INDEX_MODES[self.index_mode])
+        # The scene is empty, so retuning the index costs nothing now
+        self.tune_index()
+        self.update_scene_rect()
+        self.invalidate_background()
+    
+    def set_index_mode(self, mode):
+        """
+        Set how the scene indexes its items for itemAt(), items() and painting.
         
-        # Add center point indicator
-        center_point = QGraphicsEllipseItem(self.center.x() - 5, self.center.y() - 5, 10, 10)
-        center_point.setBrush(QBrush(Qt.black))
-        self.addItem(center_point)
+        Switching modes rebuilds the index of a scene that has items.
         
-        # Add swimlanes
-        for swimlane in self.diagram.swimlanes.values():
-            self.add_swimlane_visual(swimlane)
+        Args:
+            mode (str): A key of INDEX_MODES
+            
+        Raises:
+            ValueError: If mode is not a known index mode
+        """
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode: {mode}")
+        self.index_mode = mode
+        self.setItemIndexMethod(INDEX_MODES[mode])
+        if mode == 'auto':
+            self.tune_index()
+            self.update_scene_rect()
+        else:
+            if mode == 'bsp':
+                self.setBspTreeDepth(0)
+            # A null rect makes the scene rect grow with the items again
+            self.setSceneRect(QRectF())
+    
+    def expected_item_count(self):
+        """
+        Estimate the number of items the diagram's objects need.
         
-        # Add outcomes
-        for outcome in self.diagram.outcomes.values():
-            self.add_outcome_visual(outcome)
+        Returns:
+            int: A line and a label per swimlane and per outcome, plus the blobs
+        """
+        return 2 * (len(self.diagram.swimlanes) + len(self.diagram.outcomes)) + len(self.diagram.blobs)
+    
+    def tune_index(self, count=None):
+        """
+        Set the BSP tree depth for a number of items ('auto' mode only).
+        
+        Changing the depth rebuilds the index, so reset() tunes it for the
+        diagram while the scene is still empty rather than as items come and go.
+        
+        Args:
+            count (int, optional): Number of items. Defaults to expected_item_count().
+        """
+        if self.index_mode != 'auto' or self.itemIndexMethod() != QGraphicsScene.BspTreeIndex:
+            return
+        depth = bsp_depth_for(self.expected_item_count() if count is None else count)
+        if depth != self.bspTreeDepth():
+            self.setBspTreeDepth(depth)
+    
+    def update_scene_rect(self, swimlane=None, rect=None):
+        """
+        Fit the fixed scene rect ('auto' mode only) around the center, out to
+        the longest swimlane plus SCENE_MARGIN.
+        
+        A fixed rect gives the BSP tree stable bounds and makes sceneRect()
+        cheap; a growing one is recomputed from every item's bounds after
+        items move. Qt rebuilds the index whenever the rect changes, so while
+        the diagram is edited the rect only grows, in SCENE_RECT_STEP steps,
+        instead of following every frame of a resize drag.
+        
+        Args:
+            swimlane (Swimlane, optional): A swimlane that was added or
+                lengthened; the rect grows to fit it. Defaults to None (fit all
+                swimlanes, shrinking the rect if they got shorter).
+            rect (QRectF, optional): Scene area the rect grows to include, e.g.
+                a new blob's bounds. Defaults to None.
+        """
+        if self.index_mode != 'auto':
+            return
+        current = self.sceneRect()
+        if swimlane is None and rect is None:
+            length = max((s.length for s in self.diagram.swimlanes.values()), default=self.radius)
+            fitted = self._rect_around_center(length)
+        else:
+            fitted = current
+            if swimlane is not None and not current.contains(self._rect_around_center(swimlane.length, 0)):
+                fitted = fitted.united(self._rect_around_center(swimlane.length))
+            if rect is not None:
+                fitted = fitted.united(rect)
+        if fitted != current:
+            self.setSceneRect(fitted)
+    
+    def _rect_around_center(self, length, step=None):
+        """
+        Get the square around the center reaching SCENE_MARGIN past length,
+        its half width rounded up to a multiple of step (SCENE_RECT_STEP if None).
+        """
+        half = length + self.SCENE_MARGIN
+        step = self.SCENE_RECT_STEP if step is None else step
+        if step:
+            half = math.ceil(half / step) * step
+        return QRectF(self.center.x() - half, self.center.y() - half, 2 * half, 2 * half)
+    
+    def begin_animation(self, moving):
+        """
+        Note that a gesture or animation starts moving items every frame.
+        
+        Every move updates the BSP index. In 'auto' mode, when at least
+        ANIMATION_NO_INDEX_ITEMS items move, the index is switched off until
+        the matching end_animation(): painting then tests every item, which
+        costs less than re-indexing the moving ones each frame, and the index
+        is rebuilt once at the end. Smaller gestures keep the index, since
+        that rebuild is a visible pause on large diagrams.
+        
+        Calls nest: only the outermost end_animation() restores the index.
+        
+        Args:
+            moving (int): Number of items the gesture moves every frame
+            
+        Returns:
+            bool: True if the index was switched off
+        """
+        self.animation_depth += 1
+        if self.animation_depth == 1 and self.index_mode == 'auto' and \
+                moving >= self.ANIMATION_NO_INDEX_ITEMS:
+            self._animation_no_index = True
+            self.setItemIndexMethod(QGraphicsScene.NoIndex)
+        return self._animation_no_index
+    
+    def end_animation(self):
+        """
+        Note that the gesture started with begin_animation() has ended,
+        rebuilding the index if it was switched off.
+        """
+        if not self.animation_depth:
+            return
+        self.animation_depth -= 1
+        if self.animation_depth or not self._animation_no_index:
+            return
+        self._animation_no_index = False
+        self.setItemIndexMethod(INDEX_MODES[self.index_mode])
+        # Set the depth before the new index first sorts the items
+        self.tune_index()
         
-        # Add blobs
+    def model_items(self):
+        """
+        Iterate over the diagram's objects in the order their items are added:
+        the center, swimlanes, outcomes, then blobs.
+        
+        Yields:
+            tuple: (kind, object), as add_model_visual takes them
+        """
+        yield 'center', self.diagram.center
+        for swimlane in self.diagram.swimlanes.values():
+            yield 'swimlane', swimlane
+        for outcome in self.diagram.outcomes.values():
+            yield 'outcome', outcome
         for blob in self.diagram.blobs:
-            self.add_blob_visual(blob)
+            yield 'blob', blob
+    
+    def add_model_visual(self, kind, obj):
+        """
+        Add the visual representation of a streamed model object.
+        
+        Args:
+            kind (str): 'center', 'swimlane', 'outcome' or 'blob'
+            obj: The model object (a QPointF for 'center')
+        """
+        if kind == 'center':
+            self.center = obj
+            self.add_center_visual()
+        elif kind == 'swimlane':
+            self.add_swimlane_visual(obj)
+        elif kind == 'outcome':
+            self.add_outcome_visual(obj)
+        elif kind == 'blob':
+            self.add_blob_visual(obj)
+    
+    def add_model_visuals(self, objects):
+        """
+        Add the visual representations of many model objects in one pass.
+        
+        Outcome positions are computed in one batch (Diagram.outcome_positions)
+        instead of with a swimlane lookup per outcome, labels are laid out
+        together at the end, and the views repaint and the background is
+        invalidated once (see bulk_update).
+        
+        The BSP index is left on: Qt queues inserted items and indexes them
+        all in one pass when the scene is next queried or painted. Switching
+        to NoIndex for the build and back instead makes Qt re-insert every
+        item, which is slower (see benchmarks/bench_scene_build.py).
+        
+        Args:
+            objects (iterable): (kind, object) pairs, as add_model_visual
+                takes them; swimlanes must come before their outcomes
+        """
+        with self.bulk_update(), self.label_layout.deferred():
+            positions = self.diagram.outcome_positions()
+            for kind, obj in objects:
+                if kind == 'outcome':
+                    self.add_outcome_visual(obj, positions.get(obj.id))
+                else:
+                    self.add_model_visual(kind, obj)
+    
+    def add_center_visual(self):
+        """
+        Add the center point indicator.
+        
+        The indicator is drawn with the distance rings and the unselected
+        swimlanes in the background layer (see drawBackground), which views
+        cache with QGraphicsView.CacheBackground.
+        """
+        self.show_center = True
+        self.update_scene_rect()
+        self.invalidate_background()
+    
+    def invalidate_background(self):
+        """
+        Discard the cached background so views redraw it.
+        
+        Call this when anything drawn by drawBackground changes: a swimlane's
+        angle, length or color, or the set of swimlanes. Inside bulk_update()
+        the background is invalidated once, when the block ends.
+        """
+        if self.bulk_depth:
+            self._background_dirty = True
+            return
+        self.invalidate(self.sceneRect(), QGraphicsScene.BackgroundLayer)
+    
+    @contextmanager
+    def bulk_update(self):
+        """
+        Context manager for changing many items at once, e.g. by a BatchCommand.
+        
+        Inside the block, labels are placed together when it ends (see
+        LabelLayout.batch), the cached background is invalidated at most once,
+        and the views do not repaint; they repaint once when the outermost
+        block ends.
+        """
+        self.bulk_depth += 1
+        viewports = [view.viewport() for view in self.views()] if self.bulk_depth == 1 else []
+        for viewport in viewports:
+            viewport.setUpdatesEnabled(False)
+        try:
+            with self.label_layout.batch():
+                yield self
+        finally:
+            self.bulk_depth -= 1
+            if not self.bulk_depth:
+                if self._background_dirty:
+                    self._background_dirty = False
+                    self.invalidate_background()
+                for viewport in viewports:
+                    viewport.setUpdatesEnabled(True)
+                    viewport.update()
+    
+    def swimlane_changed(self, swimlane):
+        """
+        Note that a swimlane's angle, length or color changed.
+        
+        Only swimlanes drawn in the background invalidate it; a selected
+        swimlane (e.g. one being dragged) is drawn by its own item. The change
+        is also recorded in the diagram's journal, if any, and the scene rect
+        grows if the swimlane no longer fits.
+        
+        Args:
+            swimlane (Swimlane): The swimlane that changed
+        """
+        self.diagram.record_change('swimlanes', swimlane)
+        self.update_scene_rect(swimlane)
+        item = getattr(swimlane, 'item', None)
+        if item is None or item.in_background():
+            self.invalidate_background()
+    
+    def render(self, painter, target=QRectF(), source=QRectF(), mode=Qt.KeepAspectRatio):
+        """
+        Render a region of the scene into a painter, computing the items' zoom
+        level once for the whole frame.
+        
+        Args:
+            painter (QPainter): The painter
+            target (QRectF, optional): Target rect. Defaults to the painter's device.
+            source (QRectF, optional): Scene region. Defaults to the scene rect.
+            mode (Qt.AspectRatioMode, optional): How source is fitted into target.
+                Defaults to Qt.KeepAspectRatio.
+        """
+        # Same defaults as QGraphicsScene.render
+        size = QRectF(target)
+        if size.isNull() and painter.device() is not None:
+            size = QRectF(0, 0, painter.device().width(), painter.device().height())
+        region = QRectF(source) if not source.isNull() else self.sceneRect()
+        if size.isEmpty() or region.isEmpty():
+            return super().render(painter, target, source, mode)
+        
+        # Items are painted with the source-to-target scale on top of the painter's transform
+        sx = size.width() / region.width()
+        sy = size.height() / region.height()
+        if mode == Qt.KeepAspectRatio:
+            sx = sy = min(sx, sy)
+        elif mode == Qt.KeepAspectRatioByExpanding:
+            sx = sy = max(sx, sy)
+        with painting_frame(QTransform.fromScale(sx, sy) * painter.worldTransform()):
+            super().render(painter, target, source, mode)
+    
+    def drawBackground(self, painter, rect):
+        """
+        Draw the static parts of the diagram: distance rings, unselected
+        swimlanes and the center indicator.
+        
+        Args:
+            painter (QPainter): The painter
+            rect (QRectF): The exposed area in scene coordinates
+        """
+        super().drawBackground(painter, rect)
+        if not self.show_center and not self.diagram.swimlanes:
+            return
+        
+        lod = painter.worldTransform().m11()
+        center = self.center
+        painter.save()
+        try:
+            # Distance rings out to the longest swimlane
+            lines = [swimlane.item for swimlane in self.diagram.swimlanes.values()
+                     if getattr(swimlane, 'item', None) is not None]
+            extent = max((item.line().length() for item in lines), default=0)
+            ring_color = QColor(COLORS['divider'])
+            painter.setPen(QPen(ring_color, 0, Qt.DotLine))
+            painter.setBrush(Qt.NoBrush)
+            rings = [self.RING_SPACING * i for i in range(1, int(extent // self.RING_SPACING) + 1)]
+            for radius in rings:
+                painter.drawEllipse(center, radius, radius)
+            
+            # Ring distance labels
+            if rings and not below('label_block', lod):
+                painter.setPen(QColor(COLORS['text_secondary']))
+                painter.setFont(QFont("Arial", 7))
+                for radius in rings:
+                    painter.drawText(QPointF(center.x() + radius + 2, center.y() - 2), str(radius))
+            
+            # Swimlanes that are not selected
+            thin = below('swimlane_thin', lod)
+            for item in lines:
+                if item.in_background():
+                    painter.setPen(QPen(item.normal_pen.color(), 0) if thin else item.normal_pen)
+                    painter.drawLine(item.line())
+            
+            # Center indicator
+            if self.show_center:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QBrush(Qt.black))
+                painter.drawEllipse(center, self.CENTER_RADIUS, self.CENTER_RADIUS)
+        finally:
+            painter.restore()
     
     def add_swimlane_visual(self, swimlane):
         """
@@ -95,20 +555,27 @@ class DiagramScene(QGraphicsScene):
         swimlane_item = SwimlaneItem(swimlane, self)
         self.addItem(swimlane_item)
         swimlane.item = swimlane_item
+        self.radial_index.add_swimlane(swimlane)
+        self.update_scene_rect(swimlane)
+        self.invalidate_background()
     
-    def add_outcome_visual(self, outcome):
+    def add_outcome_visual(self, outcome, position=None):
         """
         Add visual representation of an outcome.
         
         Args:
             outcome (Outcome): The outcome model
+            position (tuple, optional): Precomputed (x, y) scene position, e.g.
+                from Diagram.outcome_positions(). Defaults to None (computed
+                from the swimlane).
         """
         from views.outcome_item import OutcomeItem
         
         # Create outcome item
-        outcome_item = OutcomeItem(outcome, self)
+        outcome_item = OutcomeItem(outcome, self, position=position)
         self.addItem(outcome_item)
         outcome.item = outcome_item
+        self.radial_index.add_outcome(outcome)
     
     def add_blob_visual(self, blob):
         """
@@ -123,6 +590,151 @@ class DiagramScene(QGraphicsScene):
         blob_item = ScopeBlobItem(blob, self)
         self.addItem(blob_item)
         blob.polygon_item = blob_item
+        self.update_scene_rect(rect=blob_item.sceneBoundingRect())
+    
+    def remove_model_visual(self, kind, obj):
+        """
+        Remove the visual representation of a model object, keeping the model.
+        
+        Args:
+            kind (str): 'swimlane', 'outcome' or 'blob'
+            obj: The model object
+        """
+        if kind == 'blob':
+            item = getattr(obj, 'polygon_item', None)
+            obj.polygon_item = None
+        else:
+            item = getattr(obj, 'item', None)
+            obj.item = None
+        if item is None:
+            return
+        
+        label_item = getattr(item, 'label_item', None)
+        if label_item is not None:
+            self.label_layout.remove(label_item)
+            if label_item.scene() is self:
+                self.removeItem(label_item)
+        if kind == 'swimlane':
+            self.radial_index.remove_swimlane(obj.id)
+            self.invalidate_background()
+        elif kind == 'outcome':
+            self.label_layout.remove_obstacle(item)
+            self.radial_index.remove_outcome(obj.id)
+        if item.scene() is self:
+            self.removeItem(item)
+    
+    def apply_model_changes(self, changes, undo=False):
+        """
+        Bring the diagram and its items to the state described by a model diff.
+        
+        Used by CheckpointCommand (see commands/undo_history.py), which stores
+        compacted undo history as model dictionaries instead of items. Items
+        are created and removed as needed.
+        
+        Args:
+            changes (dict): 'swimlanes', 'outcomes' and 'blobs', each mapping
+                id -> (old dict or None, new dict or None)
+            undo (bool, optional): Apply the old dictionaries instead of the new
+                ones. Defaults to False.
+        """
+        from models.swimlane import Swimlane
+        from models.outcome import Outcome
+        from models.scope_blob import ScopeBlob
+        
+        def targets(kind):
+            for obj_id, (old, new) in changes.get(kind, {}).items():
+                yield obj_id, old if undo else new
+        
+        diagram = self.diagram
+        with self.bulk_update():
+            # Blobs are recreated rather than updated, so remove all changed ones first
+            for blob_id, data in targets('blobs'):
+                blob = diagram.get_blob_by_id(blob_id)
+                if blob is not None:
+                    self.remove_model_visual('blob', blob)
+                    diagram.remove_blob(blob)
+            
+            # Remove outcomes, then swimlanes, so nothing is removed twice
+            for outcome_id, data in targets('outcomes'):
+                outcome = diagram.get_outcome_by_id(outcome_id)
+                if data is None and outcome is not None:
+                    self.remove_model_visual('outcome', outcome)
+                    diagram.remove_outcome(outcome_id)
+            for swimlane_id, data in targets('swimlanes'):
+                swimlane = diagram.get_swimlane_by_id(swimlane_id)
+                if data is None and swimlane is not None:
+                    self.remove_model_visual('swimlane', swimlane)
+                    diagram.remove_swimlane(swimlane_id)
+            
+            for swimlane_id, data in targets('swimlanes'):
+                if data is None:
+                    continue
+                swimlane = diagram.get_swimlane_by_id(swimlane_id)
+                if swimlane is None:
+                    swimlane = diagram.add_swimlane(Swimlane.from_dict(data))
+                    self.add_swimlane_visual(swimlane)
+                    continue
+                item = swimlane.item
+                if swimlane.label != data.get('label', ""):
+                    swimlane.label = data.get('label', "")
+                    diagram.record_change('swimlanes', swimlane)
+                    item.label_item.setPlainText(swimlane.label)
+                    item.update_label_position()
+                color = QColor(data['color']) if data.get('color') else None
+                if color is not None and color != swimlane.color:
+                    item.set_color(color)
+                geometry = (data['angle'], data.get('length', 250))
+                if geometry != item.geometry():
+                    item.set_geometry(*geometry)
+            
+            for outcome_id, data in targets('outcomes'):
+                if data is None:
+                    continue
+                outcome = diagram.get_outcome_by_id(outcome_id)
+                if outcome is None:
+                    outcome = diagram.add_outcome(Outcome.from_dict(data))
+                    self.add_outcome_visual(outcome)
+                    continue
+                item = outcome.item
+                if (outcome.swimlane_id, outcome.distance) != (data['swimlane_id'], data['distance']):
+                    diagram.move_outcome(outcome, data['swimlane_id'], data['distance'])
+                    self.radial_index.update_outcome(outcome)
+                    item.follow_swimlane(diagram.get_swimlane_by_id(outcome.swimlane_id))
+                if outcome.label != data.get('label', ""):
+                    outcome.label = data.get('label', "")
+                    diagram.record_change('outcomes', outcome)
+                    item.label_item.setPlainText(outcome.label)
+                    item.update_label_position()
+            
+            for blob_id, data in targets('blobs'):
+                if data is not None:
+                    blob = ScopeBlob.from_dict(data, diagram.swimlanes, diagram.outcomes)
+                    self.add_blob_visual(diagram.add_blob(blob))
+    
+    def find_closest_swimlane(self, pos):
+        """
+        Find the swimlane closest in direction to a scene position.
+        
+        Args:
+            pos (QPointF): The scene position
+            
+        Returns:
+            Swimlane: The closest swimlane, or None if there are no swimlanes
+        """
+        return self.radial_index.closest_swimlane_to_point(self.center, pos)
+    
+    def find_closest_outcome(self, pos, swimlane):
+        """
+        Find the outcome on a swimlane closest to a scene position.
+        
+        Args:
+            pos (QPointF): The scene position
+            swimlane (Swimlane): The swimlane to search
+            
+        Returns:
+            Outcome: The closest outcome, or None if the swimlane has no outcomes
+        """
+        return self.radial_index.closest_outcome_to_point(self.center, pos, swimlane)
     
     def create_blob(self, start_point, end_point, label=""):
         """
@@ -142,11 +754,12 @@ class DiagramScene(QGraphicsScene):
         # Create and execute command
         command = AddBlobCommand(self, points, label)
         self.undo_stack.push(command)
+        blob = self.diagram.get_blob_by_id(command.blob_id)
         
         # Emit signal
-        self.blob_created.emit(command.blob)
+        self.blob_created.emit(blob)
         
-        return command.blob
+        return blob
     
     def calculate_blob_points(self, start_point, end_point, width=40):
         """
@@ -200,28 +813,202 @@ class DiagramScene(QGraphicsScene):
         # Emit signal
         self.blob_deleted.emit(blob_item.blob)
     
-    def change_item_color(self, item, new_color):
+    def delete_blobs(self, blob_items):
         """
-        Change the color of an item.
+        Delete several blobs as one undo entry, repainting once.
         
         Args:
-            item: The item whose color is being changed
-            new_color: The new color for the item
+            blob_items (list): The visual representations of the blobs
+            
+        Returns:
+            BatchCommand: The pushed command, or None if there was nothing to delete
+        """
+        blobs = [blob_item.blob for blob_item in blob_items]
+        command = self.push_batch("Delete Blobs", [DeleteBlobCommand(self, blob_item) for blob_item in blob_items])
+        for blob in blobs if command else []:
+            self.blob_deleted.emit(blob)
+        return command
+    
+    def push_batch(self, text, commands):
+        """
+        Push commands as one undo entry, applied together inside bulk_update().
+        
+        A single command is pushed as it is.
+        
+        Args:
+            text (str): Text shown in the undo history
+            commands (list): The commands
+            
+        Returns:
+            QUndoCommand: The pushed command, or None if commands was empty
+        """
+        if not commands:
+            return None
+        command = commands[0] if len(commands) == 1 else BatchCommand(self, text, commands)
+        with self.bulk_update():
+            self.undo_stack.push(command)
+        return command
+    
+    def item_color(self, item):
+        """
+        Get the color of an item that supports changing it.
+        
+        Args:
+            item: The item
+            
+        Returns:
+            QColor: The item's color, or None if it has none
         """
-        # Get old color
-        old_color = None
         if hasattr(item, 'get_color'):
-            old_color = item.get_color()
+            return item.get_color()
         elif hasattr(item, 'color'):
-            old_color = item.color
+            return item.color
         elif hasattr(item, 'blob') and hasattr(item.blob, 'color'):
-            old_color = item.blob.color
+            return item.blob.color
+        return None
+    
+    def change_item_color(self, item, new_color):
+        """
+        Change the color of an item.
         
+        Args:
+            item: The item whose color is being changed
+            new_color: The new color for the item
+        """
+        old_color = self.item_color(item)
         if old_color:
             # Create and execute command
             command = ChangeColorCommand(item, old_color, new_color)
             self.undo_stack.push(command)
     
+    def change_items_color(self, items, new_color):
+        """
+        Change the color of several items as one undo entry, repainting once.
+        
+        Items without a color are skipped.
+        
+        Args:
+            items (list): The items
+            new_color (QColor): The new color
+            
+        Returns:
+            QUndoCommand: The pushed command, or None if no item has a color
+        """
+        commands = []
+        for item in items:
+            old_color = self.item_color(item)
+            if old_color:
+                commands.append(ChangeColorCommand(item, old_color, new_color))
+        return self.push_batch("Change Color", commands)
+    
+    def distribute_swimlanes(self, swimlanes=None, start_angle=None):
+        """
+        Rotate swimlanes so they are evenly spaced around the center, keeping
+        their order, as one undo entry.
+        
+        Args:
+            swimlanes (list, optional): The swimlanes. Defaults to all of them.
+            start_angle (float, optional): Angle of the first swimlane in degrees.
+                Defaults to its current angle.
+                
+        Returns:
+            QUndoCommand: The pushed command, or None if no swimlane moved
+        """
+        if swimlanes is None:
+            swimlanes = list(self.diagram.swimlanes.values())
+        swimlanes = sorted(swimlanes, key=lambda swimlane: swimlane.angle % 360)
+        if not swimlanes:
+            return None
+        if start_angle is None:
+            start_angle = swimlanes[0].angle
+        
+        step = 360.0 / len(swimlanes)
+        commands = []
+        for index, swimlane in enumerate(swimlanes):
+            old_angle = swimlane.angle
+            new_angle = (start_angle + index * step) % 360
+            if abs(new_angle - old_angle % 360) > 1e-9 and getattr(swimlane, 'item', None):
+                commands.append(RotateSwimlaneCommand(swimlane.item, old_angle, new_angle))
+        return self.push_batch("Distribute Swimlanes", commands)
+    
+    def begin_transaction(self, text):
+        """
+        Start collecting changes into one undo entry, e.g. when a drag starts.
+        
+        Transactions nest: only the outermost commit_transaction() pushes.
+        
+        Args:
+            text (str): Text shown in the undo history
+            
+        Returns:
+            TransactionCommand: The open transaction
+        """
+        self._transaction_depth += 1
+        if self.transaction is None:
+            self.transaction = TransactionCommand(text)
+        return self.transaction
+    
+    def record(self, command):
+        """
+        Record a change that has already been made.
+        
+        Inside a transaction the command is kept, merged with earlier changes
+        to the same item, until the transaction is committed. Outside one it
+        is pushed to the undo stack straight away.
+        
+        Args:
+            command (QUndoCommand): Command describing the change
+        """
+        if self.transaction is None:
+            self.undo_stack.push(command)
+            return
+        if hasattr(command, 'gesture'):
+            command.gesture = self.transaction.gesture
+        self.transaction.record(command)
+    
+    def commit_transaction(self):
+        """
+        Close the current transaction and push its changes as one undo entry.
+        
+        Nothing is pushed if the transaction made no net change.
+        
+        Returns:
+            QUndoCommand: The pushed command, or None
+        """
+        if self.transaction is None:
+            return None
+        self._transaction_depth -= 1
+        if self._transaction_depth > 0:
+            return None
+        
+        transaction = self.transaction
+        self.transaction = None
+        commands = transaction.live_commands()
+        if not commands:
+            return None
+        if len(commands) == 1:
+            command = commands[0]
+            command.setText(transaction.text())
+        else:
+            transaction.commands = commands
+            command = transaction
+        self.undo_stack.push(command)
+        return command
+    
+    def rollback_transaction(self):
+        """
+        Close the current transaction, reverting its changes without pushing anything.
+        """
+        if self.transaction is None:
+            return
+        transaction = self.transaction
+        self.transaction = None
+        self._transaction_depth = 0
+        try:
+            transaction.undo()
+        except Exception as e:
+            print(f"Error rolling back transaction: {str(e)}")
+    
     def contextMenuEvent(self, event):
         """
         Handle context menu events.
@@ -297,8 +1084,8 @@ class DiagramScene(QGraphicsScene):
         # Create swimlane model
         swimlane = Swimlane(label=label, angle=angle, color=color, length=length)
         
-        # Add to diagram
-        self.diagram.add_swimlane(swimlane)
+        # Add to diagram (which may store it as a different object)
+        swimlane = self.diagram.add_swimlane(swimlane)
         
         # Add visual representation
         self.add_swimlane_visual(swimlane)
@@ -332,8 +1119,8 @@ class DiagramScene(QGraphicsScene):
         # Create outcome model
         outcome = Outcome(swimlane_id=swimlane.id, distance=distance, label=label)
         
-        # Add to diagram
-        self.diagram.add_outcome(outcome)
+        # Add to diagram (which may store it as a different object)
+        outcome = self.diagram.add_outcome(outcome)
         
         # Add visual representation
         self.add_outcome_visual(outcome)
@@ -0,0 +1,284 @@
+"""
+DiagramView class for showing a DiagramScene.
+"""
+
+import time
+from collections import deque
+
+from PyQt5.QtWidgets import QGraphicsView
+from PyQt5.QtCore import Qt, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QColor, QRegion
+
+from views.level_of_detail import painting_frame
+
+# Viewport update modes by name. 'minimal' repaints only the exposed areas of
+# changed items; 'bounding' repaints one rect enclosing them; 'full' repaints
+# the whole viewport on every change.
+UPDATE_MODES = {
+    'minimal': QGraphicsView.MinimalViewportUpdate,
+    'bounding': QGraphicsView.BoundingRectViewportUpdate,
+    'smart': QGraphicsView.SmartViewportUpdate,
+    'full': QGraphicsView.FullViewportUpdate,
+}
+
+
+class RepaintStats:
+    """
+    Repaint counts and repainted area over a sliding time window.
+    
+    Attributes:
+        window (float): Length of the window in seconds
+        total (int): Number of repaints recorded since creation
+        events (deque): (time, fraction of the viewport repainted) per repaint
+    """
+    
+    def __init__(self, window=1.0):
+        """
+        Initialize a new RepaintStats.
+        
+        Args:
+            window (float, optional): Length of the window in seconds. Defaults to 1.0.
+        """
+        self.window = window
+        self.total = 0
+        self.events = deque()
+    
+    def record(self, region, viewport_rect, now=None):
+        """
+        Record one repaint.
+        
+        Args:
+            region (QRegion): The repainted region
+            viewport_rect (QRect): The whole viewport
+            now (float, optional): Time of the repaint. Defaults to the current time.
+        """
+        now = time.perf_counter() if now is None else now
+        viewport_area = max(1, viewport_rect.width() * viewport_rect.height())
+        area = sum(rect.width() * rect.height() for rect in region.intersected(viewport_rect).rects())
+        self.events.append((now, area / viewport_area))
+        self.total += 1
+        self.expire(now)
+    
+    def expire(self, now=None):
+        """
+        Forget repaints older than the window.
+        
+        Args:
+            now (float, optional): Current time. Defaults to the current time.
+        """
+        now = time.perf_counter() if now is None else now
+        while self.events and self.events[0][0] < now - self.window:
+            self.events.popleft()
+    
+    def repaints_per_second(self):
+        """
+        Get the repaint rate over the window.
+        
+        Returns:
+            float: Repaints per second
+        """
+        self.expire()
+        return len(self.events) / self.window
+    
+    def average_area(self):
+        """
+        Get the average share of the viewport repainted over the window.
+        
+        Returns:
+            float: Fraction between 0 and 1
+        """
+        self.expire()
+        if not self.events:
+            return 0.0
+        return sum(fraction for _, fraction in self.events) / len(self.events)
+    
+    def reset(self):
+        """
+        Forget all recorded repaints.
+        """
+        self.total = 0
+        self.events.clear()
+
+
+class DiagramView(QGraphicsView):
+    """
+    View for a DiagramScene with zoom and partial viewport updates.
+    
+    Only the parts of the viewport touched by changed items are repainted
+    ('minimal' update mode by default). An optional overlay outlines the
+    regions repainted recently and shows the repaint rate, to check that an
+    interaction does not repaint more than it needs to.
+    
+    Attributes:
+        stats (RepaintStats): Repaint statistics, kept while the overlay is shown
+        show_repaints (bool): Whether the repaint overlay is shown
+        flashes (deque): (time, QRect) of recently repainted rects for the overlay
+    """
+    
+    MIN_ZOOM = 0.05
+    MAX_ZOOM = 8.0
+    ZOOM_STEP = 1.2
+    
+    # How long repainted rects stay outlined, and how often the overlay refreshes, in seconds
+    FLASH_TIME = 0.4
+    OVERLAY_INTERVAL = 0.25
+    
+    zoom_changed = pyqtSignal(float)
+    
+    def __init__(self, scene=None, parent=None, update_mode='minimal'):
+        """
+        Initialize a new DiagramView.
+        
+        Args:
+            scene (QGraphicsScene, optional): The scene to show. Defaults to None.
+            parent (QWidget, optional): Parent widget. Defaults to None.
+            update_mode (str, optional): A key of UPDATE_MODES. Defaults to 'minimal'.
+        """
+        super().__init__(scene, parent)
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
+        self.set_update_mode(update_mode)
+        
+        # The scene's background (rings, swimlanes, center) only changes when a
+        # swimlane does; the scene invalidates this cache then
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        
+        self.stats = RepaintStats()
+        self.show_repaints = False
+        self.flashes = deque()
+        
+        # Repaints caused by the overlay itself are not counted
+        self._overlay_region = QRegion()
+        self._overlay_timer = QTimer(self)
+        self._overlay_timer.setInterval(int(self.OVERLAY_INTERVAL * 1000))
+        self._overlay_timer.timeout.connect(self.refresh_overlay)
+    
+    def set_update_mode(self, mode):
+        """
+        Set how much of the viewport is repainted when items change.
+        
+        Args:
+            mode (str): A key of UPDATE_MODES
+            
+        Raises:
+            ValueError: If mode is not a known update mode
+        """
+        if mode not in UPDATE_MODES:
+            raise ValueError(f"Unknown viewport update mode: {mode}")
+        self.update_mode = mode
+        self.setViewportUpdateMode(UPDATE_MODES[mode])
+    
+    def zoom(self):
+        """
+        Get the current zoom level.
+        
+        Returns:
+            float: Scale factor (1.0 = 100%)
+        """
+        return self.transform().m11()
+    
+    def set_zoom(self, zoom):
+        """
+        Set the zoom level, within MIN_ZOOM and MAX_ZOOM.
+        
+        Args:
+            zoom (float): Scale factor (1.0 = 100%)
+        """
+        zoom = max(self.MIN_ZOOM, min(self.MAX_ZOOM, zoom))
+        current = self.zoom()
+        if zoom == current:
+            return
+        self.scale(zoom / current, zoom / current)
+        self.zoom_changed.emit(zoom)
+    
+    def wheelEvent(self, event):
+        """
+        Zoom in or out around the mouse.
+        
+        Args:
+            event: The wheel event
+        """
+        steps = event.angleDelta().y() / 120
+        if not steps:
+            return super().wheelEvent(event)
+        self.set_zoom(self.zoom() * self.ZOOM_STEP ** steps)
+        event.accept()
+    
+    def set_show_repaints(self, show):
+        """
+        Show or hide the repaint overlay.
+        
+        Args:
+            show (bool): Whether to show the overlay
+        """
+        self.show_repaints = bool(show)
+        self.stats.reset()
+        self.flashes.clear()
+        if self.show_repaints:
+            self._overlay_timer.start()
+        else:
+            self._overlay_timer.stop()
+        self.viewport().update()
+    
+    def stats_rect(self):
+        """
+        Get the viewport area used by the statistics text.
+        
+        Returns:
+            QRect: The text area
+        """
+        metrics = self.fontMetrics()
+        return QRect(4, 4, metrics.horizontalAdvance("9999 repaints/s, 100% of view each") + 8,
+                     metrics.height() + 6)
+    
+    def refresh_overlay(self):
+        """
+        Repaint the statistics text and the outlines that have expired.
+        """
+        now = time.perf_counter()
+        region = QRegion(self.stats_rect())
+        while self.flashes and self.flashes[0][0] < now - self.FLASH_TIME:
+            region += QRegion(self.flashes.popleft()[1].adjusted(-1, -1, 1, 1))
+        self._overlay_region += region
+        self.viewport().update(region)
+    
+    def paintEvent(self, event):
+        """
+        Paint the scene, then the repaint overlay if it is shown.
+        
+        Items have no scaling of their own, so every item is painted at the
+        view's zoom level, computed once for the frame.
+        
+        Args:
+            event (QPaintEvent): The paint event
+        """
+        if not self.show_repaints:
+            with painting_frame(self.transform()):
+                return super().paintEvent(event)
+        
+        region = event.region()
+        from_overlay = not self._overlay_region.isEmpty() and self._overlay_region.contains(region.boundingRect())
+        self._overlay_region = QRegion()
+        now = time.perf_counter()
+        if not from_overlay:
+            self.stats.record(region, self.viewport().rect(), now)
+            for rect in region.rects():
+                self.flashes.append((now, rect))
+        
+        with painting_frame(self.transform()):
+            super().paintEvent(event)
+        
+        painter = QPainter(self.viewport())
+        try:
+            painter.setPen(QPen(QColor(255, 0, 0, 160), 1))
+            for flashed, rect in self.flashes:
+                painter.drawRect(rect.adjusted(0, 0, -1, -1))
+            
+            text = (f"{self.stats.repaints_per_second():.0f} repaints/s, "
+                    f"{self.stats.average_area() * 100:.0f}% of view each")
+            painter.fillRect(self.stats_rect(), QColor(0, 0, 0, 160))
+            painter.setPen(Qt.white)
+            painter.drawText(self.stats_rect().adjusted(4, 0, -4, 0), Qt.AlignVCenter | Qt.AlignLeft, text)
+        finally:
+            painter.end()
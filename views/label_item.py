@@ -0,0 +1,227 @@
+"""
+LabelItem class: a lightweight, cached text label for diagram items.
+"""
+
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QGraphicsItem
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QStaticText, QTransform, QPixmapCache
+
+from views.level_of_detail import reduced_level_of_detail, below
+
+# Laid-out text shared by all labels, keyed by (text, font)
+STATIC_TEXT_CACHE_SIZE = 4096
+_static_text_cache = OrderedDict()
+
+# Minimum size of Qt's pixmap cache, which holds every label's cached
+# rendering; Qt's 10 MB default fits only a few thousand labels
+PIXMAP_CACHE_LIMIT_KB = 64 * 1024
+
+
+def shared_static_text(text, font):
+    """
+    Get the laid-out glyphs for a text in a font, shared between labels.
+    
+    Labels with the same text and font (e.g. repeated outcome names) reuse
+    one QStaticText; the least recently used entries are dropped once the
+    cache holds STATIC_TEXT_CACHE_SIZE texts.
+    
+    Args:
+        text (str): The text
+        font (QFont): The font
+        
+    Returns:
+        QStaticText: The prepared text
+    """
+    key = (text, font.key())
+    static_text = _static_text_cache.get(key)
+    if static_text is not None:
+        _static_text_cache.move_to_end(key)
+        return static_text
+    
+    static_text = QStaticText(text)
+    static_text.setTextFormat(Qt.PlainText)
+    static_text.setPerformanceHint(QStaticText.AggressiveCaching)
+    static_text.prepare(QTransform(), font)
+    _static_text_cache[key] = static_text
+    if len(_static_text_cache) > STATIC_TEXT_CACHE_SIZE:
+        _static_text_cache.popitem(last=False)
+    return static_text
+
+
+def reserve_pixmap_cache(limit_kb=PIXMAP_CACHE_LIMIT_KB):
+    """
+    Grow Qt's pixmap cache to at least limit_kb kilobytes.
+    
+    Args:
+        limit_kb (int, optional): Minimum cache size. Defaults to PIXMAP_CACHE_LIMIT_KB.
+    """
+    if QPixmapCache.cacheLimit() < limit_kb:
+        QPixmapCache.setCacheLimit(limit_kb)
+
+
+def clear_static_text_cache():
+    """
+    Drop all shared laid-out texts.
+    """
+    _static_text_cache.clear()
+
+
+class LabelItem(QGraphicsItem):
+    """
+    Plain text label that caches its rendering.
+    
+    A drop-in replacement for the QGraphicsTextItem labels: it supports
+    setPlainText, toPlainText, setFont, font, setDefaultTextColor and
+    defaultTextColor, and its bounding rect includes the same 4 pixel margin.
+    The glyph layout is shared through shared_static_text, and the painted
+    label is kept in a device-coordinate pixmap cache, so repaints that do not
+    change the text, font, color or zoom are a single pixmap blit.
+    
+    When zoomed out the label is drawn as a block, then not at all (see
+    views.level_of_detail).
+    
+    Attributes:
+        text (str): The label text
+        label_font (QFont): The font
+        color (QColor): The text color
+        static_text (QStaticText): Shared laid-out text
+        rect (QRectF): Bounding rect, including the margin
+    """
+    
+    MARGIN = 4
+    
+    def __init__(self, text="", parent=None, font=None):
+        """
+        Initialize a new LabelItem.
+        
+        Args:
+            text (str, optional): The text. Defaults to "".
+            parent (QGraphicsItem, optional): Parent item. Defaults to None.
+            font (QFont, optional): The font; passing it here instead of calling
+                setFont() lays the text out once. Defaults to the default font.
+        """
+        super().__init__(parent)
+        self.text = text
+        self.label_font = QFont() if font is None else QFont(font)
+        self.color = QColor(Qt.black)
+        self.static_text = None
+        self.rect = QRectF()
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        reserve_pixmap_cache()
+        self.relayout()
+    
+    def relayout(self):
+        """
+        Lay out the text again after the text or font changed.
+        """
+        self.prepareGeometryChange()
+        self.static_text = shared_static_text(self.text, self.label_font)
+        size = QFontMetricsF(self.label_font).size(0, self.text or " ")
+        self.rect = QRectF(0, 0, size.width() + 2 * self.MARGIN, size.height() + 2 * self.MARGIN)
+        self.update()
+    
+    def setPlainText(self, text):
+        """
+        Set the label text.
+        
+        Args:
+            text (str): The new text
+        """
+        if text != self.text:
+            self.text = text
+            self.relayout()
+    
+    def toPlainText(self):
+        """
+        Get the label text.
+        
+        Returns:
+            str: The text
+        """
+        return self.text
+    
+    def setFont(self, font):
+        """
+        Set the label font.
+        
+        Args:
+            font (QFont): The new font
+        """
+        self.label_font = QFont(font)
+        self.relayout()
+    
+    def font(self):
+        """
+        Get the label font.
+        
+        Returns:
+            QFont: The font
+        """
+        return QFont(self.label_font)
+    
+    def setDefaultTextColor(self, color):
+        """
+        Set the text color.
+        
+        Args:
+            color (QColor): The new color
+        """
+        color = QColor(color)
+        if color != self.color:
+            self.color = color
+            self.update()
+    
+    def defaultTextColor(self):
+        """
+        Get the text color.
+        
+        Returns:
+            QColor: The color
+        """
+        return QColor(self.color)
+    
+    def boundingRect(self):
+        """
+        Get the bounding rect of the label.
+        
+        Returns:
+            QRectF: The rect in item coordinates
+        """
+        return self.rect
+    
+    def text_block_rect(self):
+        """
+        Get the block drawn in place of the text when zoomed out.
+        
+        Returns:
+            QRectF: The x-height band of the text, in item coordinates
+        """
+        text_rect = self.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        inset = max(0.0, (text_rect.height() - QFontMetricsF(self.label_font).xHeight()) / 2)
+        return text_rect.adjusted(0, inset, 0, -inset)
+    
+    def paint(self, painter, option, widget=None):
+        """
+        Paint the text, a block or nothing depending on the zoom level.
+        
+        Args:
+            painter (QPainter): The painter
+            option (QStyleOptionGraphicsItem): The paint option
+            widget (QWidget, optional): The widget being painted on
+        """
+        if not self.text:
+            return
+        lod = reduced_level_of_detail(option, painter)
+        if lod is not None:
+            if below('label_hidden', lod):
+                return
+            if below('label_block', lod):
+                color = QColor(self.color)
+                color.setAlpha(color.alpha() // 2)
+                painter.fillRect(self.text_block_rect(), color)
+                return
+        painter.setPen(self.color)
+        painter.setFont(self.label_font)
+        painter.drawStaticText(QPointF(self.MARGIN, self.MARGIN), self.static_text)
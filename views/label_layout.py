@@ -0,0 +1,411 @@
+"""
+LabelLayout class: places item labels so they do not overlap.
+"""
+
+from contextlib import contextmanager
+
+from PyQt5.QtCore import QPointF
+
+from utils.spatial_hash import SpatialHash
+
+
+def _overlap_area(rect, other):
+    """
+    Get the overlapping area of two (left, top, right, bottom) rectangles.
+    """
+    width = min(rect[2], other[2]) - max(rect[0], other[0])
+    height = min(rect[3], other[3]) - max(rect[1], other[1])
+    return width * height if width > 0 and height > 0 else 0.0
+
+
+def candidates_around(center, radius, width, height, gap=5):
+    """
+    Get candidate label positions around a round marker, preferred first.
+    
+    The first candidate is centered below the marker (where outcome labels
+    have always gone), followed by above, right, left and the four diagonals.
+    
+    Args:
+        center (QPointF): Center of the marker in scene coordinates
+        radius (float): Radius of the marker
+        width (float): Label width
+        height (float): Label height
+        gap (float, optional): Space between marker and label. Defaults to 5.
+        
+    Returns:
+        list: Top-left label positions (QPointF)
+    """
+    x, y = center.x(), center.y()
+    near = radius + gap
+    return [
+        QPointF(x - width / 2, y + near),
+        QPointF(x - width / 2, y - near - height),
+        QPointF(x + near, y - height / 2),
+        QPointF(x - near - width, y - height / 2),
+        QPointF(x + near * 0.7, y + near * 0.7),
+        QPointF(x - near * 0.7 - width, y + near * 0.7),
+        QPointF(x + near * 0.7, y - near * 0.7 - height),
+        QPointF(x - near * 0.7 - width, y - near * 0.7 - height),
+    ]
+
+
+class LabelLayout:
+    """
+    Collision-avoiding placement of labels.
+    
+    Every label is registered with a list of candidate positions in order of
+    preference. A label takes the first candidate that does not overlap an
+    already placed label, or the one with the least overlap if all do. Placed
+    label rectangles are kept in a SpatialHash, so each placement only checks
+    nearby labels and a full layout stays close to linear in the number of
+    labels.
+    
+    Updates are incremental: when one label is placed again (e.g. its outcome
+    moved), only the labels it had displaced from around its old rectangle
+    are placed again, and they do not cascade further. Labels with a single
+    position (swimlane labels) and obstacles (outcome markers) push aside the
+    labels they land on in the same way. While many labels are added at
+    once, use deferred() to lay them out in one pass at the end, while
+    a group of labels moves together, batch() to place them once, and
+    during a drag, begin_drag() to place them once when it ends.
+    
+    Where more than CROWDED rectangles overlap a candidate there is no room
+    to find anyway, so that candidate is not scored and obstacles there do
+    not push labels around; this keeps updates in overfull areas cheap.
+    
+    Attributes:
+        grid (SpatialHash): Rectangles of the placed labels
+        candidates (dict): label -> list of candidate positions (QPointF)
+        choices (dict): label -> index of the chosen candidate
+        obstacles (dict): key -> rectangle of other things labels should not cover
+        enabled (bool): If False, labels always take their first candidate
+    """
+    
+    CROWDED = 24
+    
+    def __init__(self, cell_size=64):
+        """
+        Initialize an empty LabelLayout.
+        
+        Args:
+            cell_size (float, optional): Grid cell size in scene units, about
+                the size of a label. Defaults to 64.
+        """
+        self.grid = SpatialHash(cell_size)
+        self.candidates = {}
+        self.choices = {}
+        self.obstacles = {}
+        self.enabled = True
+        self._deferred = 0
+        self._batch = None
+        self._batch_obstacles = []
+        self._drag_depth = 0
+        self._drag_labels = {}
+        self._drag_obstacles = {}
+    
+    def __len__(self):
+        """
+        Return the number of placed labels.
+        """
+        return len(self.candidates)
+    
+    def clear(self):
+        """
+        Forget all labels and obstacles.
+        """
+        self.grid.clear()
+        self.candidates.clear()
+        self.choices.clear()
+        self.obstacles.clear()
+        self._drag_depth = 0
+        self._drag_labels.clear()
+        self._drag_obstacles.clear()
+    
+    def set_obstacle(self, key, rect):
+        """
+        Add or move something labels should avoid covering, e.g. an outcome marker.
+        
+        Obstacles are never moved by the layout; labels already covering one
+        are placed again.
+        
+        Args:
+            key: Hashable key, e.g. the marker item
+            rect (QRectF): Area in scene coordinates
+        """
+        rect = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        old_rect = self.obstacles.get(key)
+        if rect == old_rect:
+            return
+        self.obstacles[key] = rect
+        self.grid.insert(key, rect)
+        if self._deferred:
+            return
+        if self._drag_depth:
+            # Labels it lands on are placed again when the drag ends
+            self._drag_obstacles.setdefault(key, old_rect)
+            return
+        if self._batch is not None:
+            self._batch_obstacles.append((old_rect, rect))
+            return
+        self._update([], [(old_rect, rect)])
+    
+    def remove_obstacle(self, key):
+        """
+        Remove an obstacle.
+        
+        Args:
+            key: The obstacle's key
+        """
+        if self.obstacles.pop(key, None) is not None:
+            self.grid.remove(key)
+    
+    def place(self, label, candidates):
+        """
+        Place a label at the best of its candidate positions.
+        
+        Labels near the label's old rectangle that had been pushed off their
+        preferred position are placed again, so a label moving away frees
+        room for its old neighbors. A label with a single position pushes
+        aside the labels it lands on.
+        
+        Args:
+            label (QGraphicsItem): The label; its position is set
+            candidates (list): Top-left positions (QPointF), preferred first
+        """
+        candidates = list(candidates)
+        self.candidates[label] = candidates
+        if self._deferred:
+            # Laid out when the outermost deferred() block ends
+            if candidates:
+                label.setPos(candidates[0])
+            return
+        if self._drag_depth:
+            # Placed properly when the drag ends
+            if candidates:
+                label.setPos(candidates[0])
+            self._drag_labels[label] = None
+            return
+        if self._batch is not None:
+            # Placed when the batch() block ends
+            self._batch[label] = None
+            return
+        self._update([label])
+    
+    @contextmanager
+    def deferred(self, relayout=True):
+        """
+        Context manager that lays out all labels placed inside it in one pass
+        when it exits, instead of one at a time.
+        
+        Inside the block, labels are moved to their preferred position.
+        
+        Args:
+            relayout (bool, optional): Lay out the labels when the outermost
+                block exits. Pass False to lay them out later instead, e.g. a
+                few at a time with relayout_steps(). Defaults to True.
+        """
+        self._deferred += 1
+        try:
+            yield self
+        finally:
+            self._deferred -= 1
+            if not self._deferred and relayout:
+                self.relayout()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Context manager that places the labels and obstacles changed inside
+        it once when it exits, e.g. the outcomes of a rotated swimlane.
+        
+        Unlike deferred(), only the changed labels and their neighbors are
+        placed again, so it suits a few dozen labels changing together.
+        """
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = {}
+        self._batch_obstacles = []
+        try:
+            yield self
+        finally:
+            labels, obstacles = list(self._batch), self._batch_obstacles
+            self._batch = None
+            self._batch_obstacles = []
+            if not self._deferred:
+                self._update(labels, obstacles)
+    
+    def begin_drag(self):
+        """
+        Start a drag: until the matching end_drag(), labels that move take
+        their preferred position without looking for free room, and moving
+        obstacles do not push labels aside.
+        
+        Finding free room costs about a millisecond per label in crowded
+        areas, too slow to repeat every frame for all the labels a drag moves.
+        Calls nest: only the outermost end_drag() places the labels.
+        """
+        self._drag_depth += 1
+    
+    def end_drag(self):
+        """
+        End a drag started with begin_drag(), placing the labels and
+        obstacles it moved, and their neighbors, once.
+        """
+        if not self._drag_depth:
+            return
+        self._drag_depth -= 1
+        if self._drag_depth:
+            return
+        labels = [label for label in self._drag_labels if label in self.candidates]
+        obstacles = [(old_rect, self.obstacles[key]) for key, old_rect in self._drag_obstacles.items()
+                     if key in self.obstacles]
+        self._drag_labels.clear()
+        self._drag_obstacles.clear()
+        if not self._deferred:
+            self._update(labels, obstacles)
+    
+    def _update(self, labels, obstacles=()):
+        """
+        Place labels again after they or obstacles changed, then their neighbors.
+        
+        Args:
+            labels (list): Labels whose candidates changed
+            obstacles (list): (old rectangle or None, new rectangle) of obstacles
+                that were added or moved
+        """
+        freed = [old for old, new in obstacles if old is not None]
+        covering = [new for old, new in obstacles]
+        for label in labels:
+            old_rect = self.grid.remove(label)
+            new_rect = self._place(label)
+            if new_rect == old_rect:
+                continue
+            if old_rect is not None:
+                freed.append(old_rect)
+            if len(self.candidates[label]) == 1:
+                covering.append(new_rect)
+        
+        neighbors = set()
+        for rect in freed:
+            neighbors |= self._displaced_by(rect)
+        for rect in covering:
+            covered = self.grid.query(rect, self.CROWDED)
+            if len(covered) <= self.CROWDED:
+                neighbors |= covered
+        neighbors.difference_update(labels)
+        self._replace(neighbors)
+    
+    def _displaced_by(self, rect):
+        """
+        Find the labels near a freed rectangle that had been pushed off their
+        preferred position.
+        
+        Args:
+            rect (tuple): A (left, top, right, bottom) rectangle that was freed
+            
+        Returns:
+            set: Labels that may move to a better position now
+        """
+        # Skip crowded areas, where there is no room to move labels to anyway
+        nearby = self.grid.query(rect, self.CROWDED)
+        if len(nearby) > self.CROWDED:
+            return set()
+        return {label for label in nearby if self.choices.get(label)}
+    
+    def remove(self, label):
+        """
+        Remove a label, letting its displaced neighbors move back.
+        
+        Args:
+            label (QGraphicsItem): The label
+        """
+        rect = self.grid.remove(label)
+        self.candidates.pop(label, None)
+        self.choices.pop(label, None)
+        if rect is not None:
+            self._replace(self._displaced_by(rect))
+    
+    def _replace(self, labels):
+        """
+        Place labels again, skipping obstacles and labels with only one position.
+        
+        Args:
+            labels (iterable): Keys from the grid
+        """
+        for label in list(labels):
+            if len(self.candidates.get(label, ())) > 1:
+                self.grid.remove(label)
+                self._place(label)
+    
+    def relayout(self):
+        """
+        Place every label again from scratch, in the order they were added.
+        """
+        for _ in self.relayout_steps():
+            pass
+    
+    def relayout_steps(self):
+        """
+        Place every label again from scratch, one label per step, so a long
+        layout can be spread over several event loop passes.
+        
+        Labels not placed yet are left out of the collision checks until
+        their step, so the layout is only complete once the steps run out.
+        
+        Yields:
+            QGraphicsItem: The label just placed
+        """
+        self.grid.clear()
+        for key, rect in self.obstacles.items():
+            self.grid.insert(key, rect)
+        for label in list(self.candidates):
+            if label in self.candidates:
+                self._place(label)
+                yield label
+    
+    def _place(self, label):
+        """
+        Choose a candidate for a label that is not in the grid, and add it.
+        
+        Args:
+            label (QGraphicsItem): The label
+            
+        Returns:
+            tuple: The label's new (left, top, right, bottom) rectangle
+        """
+        bounds = label.boundingRect()
+        width, height = bounds.width(), bounds.height()
+        candidates = self.candidates[label]
+        
+        best_index, best_rect, best_overlap = 0, None, None
+        for index, pos in enumerate(candidates):
+            rect = (pos.x(), pos.y(), pos.x() + width, pos.y() + height)
+            if not self.enabled:
+                best_index, best_rect = index, rect
+                break
+            hits = self.grid.query(rect, self.CROWDED)
+            if not hits:
+                best_index, best_rect = index, rect
+                break
+            if len(hits) > self.CROWDED:
+                if best_rect is None:
+                    best_index, best_rect = index, rect
+                continue
+            rects = self.grid.rects
+            overlap = sum(_overlap_area(rect, rects[other]) for other in hits)
+            if best_overlap is None or overlap < best_overlap:
+                best_index, best_rect, best_overlap = index, rect, overlap
+        
+        if best_rect is None:
+            # No candidates: leave the label where it is
+            pos = label.pos()
+            best_rect = (pos.x(), pos.y(), pos.x() + width, pos.y() + height)
+        else:
+            position = candidates[best_index]
+            if label.pos() != position:
+                label.setPos(position)
+        
+        self.choices[label] = best_index
+        self.grid.insert(label, best_rect)
+        return best_rect
@@ -0,0 +1,191 @@
+"""
+Level-of-detail rendering helpers for the diagram items.
+
+When the view is zoomed out, items are drawn with less detail: labels become
+solid blocks and then disappear, outcomes become single pixels and blob
+outlines are drawn as simplified polygons. The zoom level comes from
+QStyleOptionGraphicsItem.levelOfDetailFromTransform, where 1.0 is 100%.
+
+Computing it costs a few microseconds per item, so DiagramView and
+DiagramScene.render compute it once per frame inside painting_frame(), and at
+or above the largest threshold items paint exactly as without level of detail.
+"""
+
+from contextlib import contextmanager
+
+from PyQt5.QtGui import QPen, QPolygonF
+from PyQt5.QtWidgets import QStyleOptionGraphicsItem
+
+# Zoom levels below which each simplification is used. Change them with
+# set_thresholds(); items pick up new values on their next repaint.
+LOD_THRESHOLDS = {
+    'label_block': 0.5,      # labels drawn as solid blocks instead of text
+    'label_hidden': 0.2,     # labels not drawn at all
+    'outcome_pixel': 0.3,    # outcomes drawn as a single pixel
+    'blob_polygon': 0.6,     # blob paths drawn as simplified polygons
+    'swimlane_thin': 0.3,    # swimlanes drawn with a 1 pixel pen
+}
+
+# Largest error allowed when simplifying a blob outline, in device pixels
+SIMPLIFY_TOLERANCE = 1.5
+
+# Zoom level at and above which no simplification applies, kept in sync by set_thresholds()
+_full_detail = max(LOD_THRESHOLDS.values())
+
+# Zoom level of the frame being painted, set by painting_frame(), or None
+_frame_lod = None
+
+# Cosmetic 1 pixel pens by color, for paint_outcome_pixel
+_pixel_pens = {}
+
+
+def set_thresholds(**thresholds):
+    """
+    Change one or more level-of-detail thresholds.
+    
+    Args:
+        **thresholds: New zoom levels keyed by LOD_THRESHOLDS names,
+            e.g. set_thresholds(label_hidden=0.1)
+            
+    Raises:
+        ValueError: If a name is not a known threshold
+    """
+    global _full_detail
+    for name, value in thresholds.items():
+        if name not in LOD_THRESHOLDS:
+            raise ValueError(f"Unknown level-of-detail threshold: {name}")
+        LOD_THRESHOLDS[name] = float(value)
+    _full_detail = max(LOD_THRESHOLDS.values())
+
+
+@contextmanager
+def painting_frame(transform):
+    """
+    Paint a frame whose items all share one zoom level, so they do not each
+    compute it. Only valid while items have no scaling transforms of their own.
+    
+    Args:
+        transform (QTransform): Transform from scene to device coordinates
+    """
+    global _frame_lod
+    previous = _frame_lod
+    _frame_lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(transform)
+    try:
+        yield
+    finally:
+        _frame_lod = previous
+
+
+def level_of_detail(option, painter):
+    """
+    Get the zoom level an item is being painted at.
+    
+    Args:
+        option (QStyleOptionGraphicsItem): The paint option
+        painter (QPainter): The painter
+        
+    Returns:
+        float: Scale from item to device coordinates (1.0 = 100%)
+    """
+    if _frame_lod is not None:
+        return _frame_lod
+    return option.levelOfDetailFromTransform(painter.worldTransform())
+
+
+def reduced_level_of_detail(option, painter):
+    """
+    Get the zoom level an item is being painted at, if any threshold applies.
+    
+    Args:
+        option (QStyleOptionGraphicsItem): The paint option
+        painter (QPainter): The painter
+        
+    Returns:
+        float: The zoom level, or None if it is at or above every threshold and
+            the item should paint in full detail
+    """
+    lod = _frame_lod
+    if lod is None:
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+    return lod if lod < _full_detail else None
+
+
+def below(name, lod):
+    """
+    Check whether a zoom level is below a named threshold.
+    
+    Args:
+        name (str): Threshold name from LOD_THRESHOLDS
+        lod (float): Zoom level
+        
+    Returns:
+        bool: True if the simplified drawing should be used
+    """
+    return lod < LOD_THRESHOLDS[name]
+
+
+def simplify_polygon(polygon, tolerance):
+    """
+    Drop polygon vertices closer than tolerance to the last kept vertex.
+    
+    This radial-distance simplification is linear in the number of vertices
+    and keeps the first and last vertex.
+    
+    Args:
+        polygon (QPolygonF): The polygon
+        tolerance (float): Minimum distance between kept vertices
+        
+    Returns:
+        QPolygonF: The simplified polygon
+    """
+    count = polygon.count()
+    if count <= 3:
+        return QPolygonF(polygon)
+    
+    limit = tolerance * tolerance
+    first = polygon.at(0)
+    kept = [first]
+    last_x, last_y = first.x(), first.y()
+    for i in range(1, count - 1):
+        point = polygon.at(i)
+        dx = point.x() - last_x
+        dy = point.y() - last_y
+        if dx * dx + dy * dy >= limit:
+            kept.append(point)
+            last_x, last_y = point.x(), point.y()
+    kept.append(polygon.at(count - 1))
+    return QPolygonF(kept)
+
+
+def tolerance_bucket(lod):
+    """
+    Round a zoom level down to a power of two, so cached simplified shapes
+    can be reused while zooming.
+    
+    Args:
+        lod (float): Zoom level
+        
+    Returns:
+        float: The bucket's zoom level
+    """
+    bucket = 1.0
+    while bucket > lod and bucket > 1e-4:
+        bucket /= 2
+    return bucket
+
+
+def paint_outcome_pixel(painter, rect, color):
+    """
+    Draw an outcome as one device pixel at the center of its rect.
+    
+    Args:
+        painter (QPainter): The painter
+        rect (QRectF): The outcome's ellipse rect
+        color (QColor): The pixel color
+    """
+    rgba = color.rgba()
+    pen = _pixel_pens.get(rgba)
+    if pen is None:
+        pen = _pixel_pens[rgba] = QPen(color, 0)
+    painter.setPen(pen)
+    painter.drawPoint(rect.center())
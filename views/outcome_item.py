@@ -3,11 +3,15 @@ OutcomeItem class for visual representation of outcomes.
 """
 
 import math
-from PyQt5.QtWidgets import QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsItem
+from PyQt5.QtWidgets import QGraphicsEllipseItem, QGraphicsItem
 from PyQt5.QtCore import Qt, QPointF, QRectF
 from PyQt5.QtGui import QPen, QBrush, QColor, QFont
 
+from commands.move_command import MoveCommand
 from utils.geometry import calculate_point_on_line
+from views.label_item import LabelItem
+from views.label_layout import candidates_around
+from views.level_of_detail import reduced_level_of_detail, below, paint_outcome_pixel
 
 
 class OutcomeItem(QGraphicsEllipseItem):
@@ -20,10 +24,13 @@ class OutcomeItem(QGraphicsEllipseItem):
         normal_pen (QPen): Pen for normal state
         hover_pen (QPen): Pen for hover state
         selected_pen (QPen): Pen for selected state
-        label_item (QGraphicsTextItem): Text item for the label
+        label_item (LabelItem): Text item for the label
+        following (bool): Whether the item is being moved along with its swimlane
+        drag_positions (dict): Outcome item -> position after the last recorded
+            drag step, while a drag is in progress
     """
     
-    def __init__(self, outcome, diagram_scene, radius=10):
+    def __init__(self, outcome, diagram_scene, radius=10, position=None):
         """
         Initialize a new OutcomeItem.
         
@@ -31,24 +38,32 @@ class OutcomeItem(QGraphicsEllipseItem):
             outcome (Outcome): The outcome model
             diagram_scene (DiagramScene): The scene this item belongs to
             radius (float, optional): Radius of the outcome circle. Defaults to 10.
+            position (tuple, optional): Precomputed (x, y) scene position of the
+                outcome. Defaults to None (computed from its swimlane).
         """
-        # Find the swimlane
-        swimlane = diagram_scene.diagram.get_swimlane_by_id(outcome.swimlane_id)
-        if not swimlane:
-            raise ValueError(f"Swimlane with ID {outcome.swimlane_id} not found")
-        
-        # Calculate position on the swimlane
-        center = diagram_scene.center
-        angle_rad = math.radians(swimlane.angle)
-        distance = outcome.distance
-        position = calculate_point_on_line(center, angle_rad, distance)
+        if position is None:
+            # Find the swimlane
+            swimlane = diagram_scene.diagram.get_swimlane_by_id(outcome.swimlane_id)
+            if not swimlane:
+                raise ValueError(f"Swimlane with ID {outcome.swimlane_id} not found")
+            
+            # Calculate position on the swimlane
+            center = diagram_scene.center
+            angle_rad = math.radians(swimlane.angle)
+            distance = outcome.distance
+            point = calculate_point_on_line(center, angle_rad, distance)
+            x, y = point.x(), point.y()
+        else:
+            x, y = position
         
         # Create ellipse
-        super().__init__(position.x() - radius, position.y() - radius, radius * 2, radius * 2)
+        super().__init__(x - radius, y - radius, radius * 2, radius * 2)
         
         self.outcome = outcome
         self.diagram_scene = diagram_scene
         self.radius = radius
+        self.following = False
+        self.drag_positions = None
         
         # Set up appearance
         self.setBrush(QBrush(QColor(255, 255, 255)))
@@ -61,15 +76,13 @@ class OutcomeItem(QGraphicsEllipseItem):
         # Set initial pen
         self.setPen(self.normal_pen)
         
-        # Make item selectable and movable
-        self.setFlag(QGraphicsItem.ItemIsSelectable)
-        self.setFlag(QGraphicsItem.ItemIsMovable)
-        self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
+        # Make item selectable and movable (one flags change instead of three)
+        self.setFlags(QGraphicsItem.ItemIsSelectable | QGraphicsItem.ItemIsMovable |
+                      QGraphicsItem.ItemSendsGeometryChanges)
         self.setAcceptHoverEvents(True)
         
         # Add label
-        self.label_item = QGraphicsTextItem(outcome.label)
-        self.label_item.setFont(QFont("Arial", 8))
+        self.label_item = LabelItem(outcome.label, font=QFont("Arial", 8))
         
         # Position label
         self.update_label_position()
@@ -80,15 +93,16 @@ class OutcomeItem(QGraphicsEllipseItem):
     def update_label_position(self):
         """
         Update the position of the label based on the ellipse position.
-        """
-        # Position label below the ellipse
-        rect = self.rect()
-        center_x = rect.x() + rect.width() / 2
-        bottom_y = rect.y() + rect.height() + 5
         
-        # Center the label on the point
-        label_width = self.label_item.boundingRect().width()
-        self.label_item.setPos(center_x - label_width / 2, bottom_y)
+        The label goes below the ellipse, or beside it if another label is
+        already there (see LabelLayout).
+        """
+        rect = self.rect().translated(self.pos())
+        layout = self.diagram_scene.label_layout
+        layout.set_obstacle(self, rect)
+        label_rect = self.label_item.boundingRect()
+        candidates = candidates_around(rect.center(), rect.width() / 2, label_rect.width(), label_rect.height())
+        layout.place(self.label_item, candidates)
     
     def update_model(self):
         """
@@ -101,24 +115,13 @@ class OutcomeItem(QGraphicsEllipseItem):
         dy = item_center.y() - center.y()
         distance = math.sqrt(dx * dx + dy * dy)
         
-        # Calculate angle to determine which swimlane we're on
-        angle_rad = math.atan2(dy, dx)
-        angle_deg = math.degrees(angle_rad) % 360
-        
-        # Find closest swimlane
-        closest_swimlane = None
-        min_angle_diff = float('inf')
-        
-        for swimlane in self.diagram_scene.diagram.swimlanes.values():
-            angle_diff = min((swimlane.angle - angle_deg) % 360, (angle_deg - swimlane.angle) % 360)
-            if angle_diff < min_angle_diff:
-                min_angle_diff = angle_diff
-                closest_swimlane = swimlane
+        # Find closest swimlane using the scene's radial index
+        closest_swimlane = self.diagram_scene.find_closest_swimlane(item_center)
         
         if closest_swimlane:
             # Update outcome model
-            self.outcome.swimlane_id = closest_swimlane.id
-            self.outcome.distance = distance
+            self.diagram_scene.diagram.move_outcome(self.outcome, closest_swimlane.id, distance)
+            self.diagram_scene.radial_index.update_outcome(self.outcome)
             
             # Snap to swimlane line
             self.snap_to_swimlane(closest_swimlane)
@@ -135,13 +138,46 @@ class OutcomeItem(QGraphicsEllipseItem):
         distance = self.outcome.distance
         position = calculate_point_on_line(center, angle_rad, distance)
         
-        # Update ellipse position
+        # Update ellipse position; a position change also moves the label
         rect = self.rect()
-        self.setPos(position.x() - rect.width() / 2 - rect.x(), 
-                    position.y() - rect.height() / 2 - rect.y())
+        new_pos = QPointF(position.x() - rect.width() / 2 - rect.x(),
+                          position.y() - rect.height() / 2 - rect.y())
+        if new_pos == self.pos():
+            self.update_label_position()
+        else:
+            self.setPos(new_pos)
         
-        # Update label position
-        self.update_label_position()
+    def follow_swimlane(self, swimlane):
+        """
+        Move the outcome with its swimlane after the swimlane was rotated or
+        resized, keeping it on that swimlane.
+        
+        Unlike a drag, this does not look for the closest swimlane again, so
+        an outcome passing over another swimlane stays on its own.
+        
+        Args:
+            swimlane (Swimlane): The outcome's swimlane
+        """
+        self.following = True
+        try:
+            self.snap_to_swimlane(swimlane)
+        finally:
+            self.following = False
+    
+    def paint(self, painter, option, widget=None):
+        """
+        Paint the outcome, as a single pixel when zoomed far out.
+        
+        Args:
+            painter (QPainter): The painter
+            option (QStyleOptionGraphicsItem): The paint option
+            widget (QWidget, optional): The widget being painted on
+        """
+        lod = reduced_level_of_detail(option, painter)
+        if lod is not None and below('outcome_pixel', lod):
+            paint_outcome_pixel(painter, self.rect(), self.pen().color())
+            return
+        super().paint(painter, option, widget)
     
     def itemChange(self, change, value):
         """
@@ -157,15 +193,61 @@ class OutcomeItem(QGraphicsEllipseItem):
         if change == QGraphicsItem.ItemSelectedChange:
             # Update pen based on selection state
             self.setPen(value and self.selected_pen or self.normal_pen)
-        elif change == QGraphicsItem.ItemPositionChange and self.scene():
-            # Update label position when item is moved
-            self.update_label_position()
         elif change == QGraphicsItem.ItemPositionHasChanged and self.scene():
-            # Update model when position has changed
-            self.update_model()
+            # Update label position and model when position has changed
+            self.update_label_position()
+            if not self.following:
+                self.update_model()
         
         return super().itemChange(change, value)
     
+    def mousePressEvent(self, event):
+        """
+        Handle mouse press events; a left-button drag becomes one undo entry.
+        
+        Args:
+            event (QGraphicsSceneMouseEvent): The mouse event
+        """
+        super().mousePressEvent(event)
+        if event.button() == Qt.LeftButton and self.drag_positions is None:
+            # Qt moves all selected items together
+            self.drag_positions = {item: item.pos() for item in self.diagram_scene.selectedItems()
+                                   if isinstance(item, OutcomeItem)}
+            self.drag_positions.setdefault(self, self.pos())
+            self.diagram_scene.begin_transaction("Move Outcome")
+            # Labels are placed properly once, when the drag ends
+            self.diagram_scene.label_layout.begin_drag()
+    
+    def mouseMoveEvent(self, event):
+        """
+        Handle mouse move events, recording the moves of the dragged outcomes.
+        
+        Args:
+            event (QGraphicsSceneMouseEvent): The mouse event
+        """
+        super().mouseMoveEvent(event)
+        if self.drag_positions is None:
+            return
+        for item, last_pos in self.drag_positions.items():
+            pos = item.pos()
+            if pos != last_pos:
+                # Steps of one drag merge into one MoveCommand per outcome
+                self.diagram_scene.record(MoveCommand(item, last_pos, pos))
+                self.drag_positions[item] = pos
+    
+    def mouseReleaseEvent(self, event):
+        """
+        Handle mouse release events, ending the drag's undo entry.
+        
+        Args:
+            event (QGraphicsSceneMouseEvent): The mouse event
+        """
+        super().mouseReleaseEvent(event)
+        if event.button() == Qt.LeftButton and self.drag_positions is not None:
+            self.drag_positions = None
+            self.diagram_scene.label_layout.end_drag()
+            self.diagram_scene.commit_transaction()
+    
     def hoverEnterEvent(self, event):
         """
         Handle hover enter events.
@@ -236,6 +318,7 @@ class OutcomeItem(QGraphicsEllipseItem):
         text, ok = QInputDialog.getText(None, "Edit Label", "Label:", text=self.outcome.label)
         if ok and text:
             self.outcome.label = text
+            self.diagram_scene.diagram.record_change('outcomes', self.outcome)
             self.label_item.setPlainText(text)
             self.update_label_position()
     
@@ -0,0 +1,250 @@
+"""
+SceneLoader class: loads a diagram file on a worker thread and fills the scene
+in time-sliced chunks.
+"""
+
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from models.diagram import Diagram
+
+
+class _ReadTask(QRunnable):
+    """
+    Thread pool task reading a diagram file into a model.
+    """
+    
+    def __init__(self, read, filename, generation, done):
+        super().__init__()
+        self.read = read
+        self.filename = filename
+        self.generation = generation
+        self.done = done
+    
+    def run(self):
+        # Never raise on a pool thread; report the error instead
+        try:
+            diagram = self.read(self.filename)
+        except Exception as e:
+            self.done.emit(self.generation, None, str(e))
+            return
+        self.done.emit(self.generation, diagram, None)
+
+
+class SceneLoader(QObject):
+    """
+    Loads a diagram into a DiagramScene without freezing the GUI.
+    
+    The file is parsed and the model built on a thread pool thread. The
+    graphics items are then created on the GUI thread a slice at a time:
+    each slice adds items for at most slice_time seconds and returns to the
+    event loop, so the view paints the items added so far, the progress
+    dialog updates and cancel clicks are handled between slices. Once all
+    items exist the labels are laid out, also in slices.
+    
+    Repainting a large scene between slices can take longer than a slice, so
+    a slice runs for at least as long as the event loop took since the
+    previous one: at least half of the time goes to loading, and the GUI is
+    never blocked for much longer than one repaint.
+    
+    The scene is only cleared when the parsed model arrives, so canceling or
+    failing while parsing leaves it untouched. Canceling while the items are
+    being added leaves an empty scene; the caller decides what to show.
+    
+    Attributes:
+        scene (DiagramScene): The scene to fill
+        read (callable): Function reading a file into a Diagram; runs on the worker thread
+        slice_time (float): Minimum seconds of item creation per event loop pass
+        diagram (Diagram): The diagram being loaded, once parsed
+        timings (dict): Seconds from load() to 'parsed', 'first_slice' (the
+            first items are in the scene) and 'total'
+    """
+    
+    progress = pyqtSignal(int, int)  # items added, total (0 while parsing)
+    finished = pyqtSignal(object)  # the loaded Diagram
+    failed = pyqtSignal(str)  # error message
+    canceled = pyqtSignal()
+    
+    _read_done = pyqtSignal(int, object, object)
+    
+    DEFAULT_SLICE_TIME = 0.012  # within a 60 Hz frame
+    
+    def __init__(self, scene, read=None, slice_time=DEFAULT_SLICE_TIME, parent=None):
+        """
+        Initialize a new SceneLoader.
+        
+        Args:
+            scene (DiagramScene): The scene to fill
+            read (callable, optional): Function taking a filename and returning a
+                Diagram; it must not touch the scene. Defaults to Diagram.load_from_file.
+            slice_time (float, optional): Seconds of item creation per event loop
+                pass. Defaults to DEFAULT_SLICE_TIME.
+            parent (QObject, optional): Parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self.scene = scene
+        self.read = read or Diagram.load_from_file
+        self.slice_time = slice_time
+        self.diagram = None
+        self.timings = {}
+        self._generation = 0
+        self._parsing = False
+        self._steps = None
+        self._done = 0
+        self._total = 0
+        self._start = 0.0
+        self._slice_end = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._add_slice)
+        self._read_done.connect(self._parsed)
+    
+    def is_loading(self):
+        """
+        Check whether a load is in progress.
+        
+        Returns:
+            bool: True while parsing or adding items
+        """
+        return self._parsing or self._steps is not None
+    
+    def load(self, filename):
+        """
+        Start loading a file; returns immediately.
+        
+        Any load in progress is canceled first. finished, failed or canceled
+        is emitted when the load ends.
+        
+        Args:
+            filename (str): Path of the diagram file
+        """
+        if self.is_loading():
+            self.cancel()
+        self._generation += 1
+        self._parsing = True
+        self.diagram = None
+        self.timings = {}
+        self._start = time.perf_counter()
+        self.progress.emit(0, 0)
+        QThreadPool.globalInstance().start(
+            _ReadTask(self.read, filename, self._generation, self._read_done))
+    
+    def populate(self, diagram):
+        """
+        Show an already built diagram, adding its items in time slices.
+        
+        Args:
+            diagram (Diagram): The diagram
+        """
+        if self.is_loading():
+            self.cancel()
+        self._generation += 1
+        self.timings = {}
+        self._start = time.perf_counter()
+        self._begin(diagram)
+    
+    def cancel(self):
+        """
+        Stop the load in progress, if any, and emit canceled.
+        
+        A file being parsed is still read to the end on the worker thread,
+        but its result is dropped.
+        """
+        if not self.is_loading():
+            return
+        # Results of the current read are now stale
+        self._generation += 1
+        self._parsing = False
+        if self._steps is not None:
+            self._timer.stop()
+            self._steps.close()
+            self._steps = None
+            self.scene.reset()
+        self.canceled.emit()
+    
+    def _parsed(self, generation, diagram, error):
+        """
+        Receive the result of a worker thread read, on the GUI thread.
+        """
+        if generation != self._generation:
+            return
+        self._parsing = False
+        self.timings['parsed'] = time.perf_counter() - self._start
+        if error is not None:
+            self.failed.emit(error)
+            return
+        self._begin(diagram)
+    
+    def _begin(self, diagram):
+        """
+        Clear the scene and start adding the diagram's items.
+        """
+        self.diagram = diagram
+        self.scene.reset(diagram)
+        self._steps = self._load_steps()
+        self._done = 0
+        self._slice_end = None
+        # One step per item, then one per swimlane or outcome label
+        self._total = 1 + 2 * (len(diagram.swimlanes) + len(diagram.outcomes)) + len(diagram.blobs)
+        self._add_slice()
+    
+    def _load_steps(self):
+        """
+        Generator doing the work of a load, one item or label per step.
+        """
+        scene = self.scene
+        layout = scene.label_layout
+        positions = scene.diagram.outcome_positions()
+        # Labels go to their preferred position until the whole layout runs
+        with layout.deferred(relayout=False):
+            for kind, obj in scene.model_items():
+                if kind == 'outcome':
+                    scene.add_outcome_visual(obj, positions.get(obj.id))
+                else:
+                    scene.add_model_visual(kind, obj)
+                yield
+        for _ in layout.relayout_steps():
+            yield
+    
+    def _add_slice(self):
+        """
+        Run load steps until the slice time is used up, then yield to the event loop.
+        """
+        now = time.perf_counter()
+        # Keep up with the time spent painting and handling events since the last slice
+        budget = self.slice_time
+        if self._slice_end is not None:
+            budget = max(budget, now - self._slice_end)
+        deadline = now + budget
+        try:
+            for _ in self._steps:
+                self._done += 1
+                if time.perf_counter() >= deadline:
+                    break
+            else:
+                self._finish()
+                return
+        except Exception as e:
+            print(f"Error adding loaded items: {e}")
+            self._steps = None
+            self.failed.emit(str(e))
+            return
+        
+        if 'first_slice' not in self.timings:
+            self.timings['first_slice'] = time.perf_counter() - self._start
+        self.progress.emit(min(self._done, self._total), self._total)
+        self._slice_end = time.perf_counter()
+        self._timer.start()
+    
+    def _finish(self):
+        """
+        Report the loaded diagram.
+        """
+        self._steps = None
+        now = time.perf_counter() - self._start
+        self.timings.setdefault('first_slice', now)
+        self.timings['total'] = now
+        self.progress.emit(self._total, self._total)
+        self.finished.emit(self.diagram)
@@ -8,6 +8,8 @@ from PyQt5.QtCore import Qt, QPointF
 from PyQt5.QtGui import QPen, QBrush, QColor, QPainterPath
 
 from utils.geometry import calculate_point_on_line
+from views.level_of_detail import (SIMPLIFY_TOLERANCE, reduced_level_of_detail, below, simplify_polygon,
+                                   tolerance_bucket)
 
 
 class ScopeBlobItem(QGraphicsPathItem):
@@ -20,6 +22,7 @@ class ScopeBlobItem(QGraphicsPathItem):
         normal_pen (QPen): Pen for normal state
         hover_pen (QPen): Pen for hover state
         selected_pen (QPen): Pen for selected state
+        simplified (dict): Simplified outlines of the path, keyed by zoom bucket
     """
     
     def __init__(self, blob, diagram_scene):
@@ -34,6 +37,7 @@ class ScopeBlobItem(QGraphicsPathItem):
         
         self.blob = blob
         self.diagram_scene = diagram_scene
+        self.simplified = {}
         
         # Set up appearance
         self.setBrush(QBrush(blob.color.lighter(150)))
@@ -61,10 +65,16 @@ class ScopeBlobItem(QGraphicsPathItem):
         Update the path based on the blob's connected outcomes.
         """
         # Get outcomes
-        start_outcome = self.diagram_scene.diagram.get_outcome_by_id(self.blob.start_outcome_id)
-        end_outcome = self.diagram_scene.diagram.get_outcome_by_id(self.blob.end_outcome_id)
+        start_outcome = self.blob.start_outcome
+        end_outcome = self.blob.end_outcome
         
         if not start_outcome or not end_outcome:
+            # Free-standing blob: draw its own outline
+            if self.blob.point_count or self.blob.points:
+                path = QPainterPath()
+                path.addPolygon(self.blob.to_polygon())
+                path.closeSubpath()
+                self.setPath(path)
             return
         
         # Get swimlanes
@@ -142,6 +152,50 @@ class ScopeBlobItem(QGraphicsPathItem):
         
         self.setPath(path)
     
+    def setPath(self, path):
+        """
+        Set the path and forget the simplified outlines of the old one.
+        
+        Args:
+            path (QPainterPath): The new path
+        """
+        super().setPath(path)
+        self.simplified = {}
+    
+    def simplified_polygon(self, lod):
+        """
+        Get the path flattened and simplified for a zoom level.
+        
+        Args:
+            lod (float): Zoom level
+            
+        Returns:
+            QPolygonF: The simplified outline
+        """
+        bucket = tolerance_bucket(lod)
+        polygon = self.simplified.get(bucket)
+        if polygon is None:
+            polygon = simplify_polygon(self.path().toFillPolygon(), SIMPLIFY_TOLERANCE / bucket)
+            self.simplified[bucket] = polygon
+        return polygon
+    
+    def paint(self, painter, option, widget=None):
+        """
+        Paint the blob, as a simplified polygon when zoomed out.
+        
+        Args:
+            painter (QPainter): The painter
+            option (QStyleOptionGraphicsItem): The paint option
+            widget (QWidget, optional): The widget being painted on
+        """
+        lod = reduced_level_of_detail(option, painter)
+        if lod is not None and below('blob_polygon', lod):
+            painter.setPen(self.pen())
+            painter.setBrush(self.brush())
+            painter.drawPolygon(self.simplified_polygon(lod))
+            return
+        super().paint(painter, option, widget)
+    
     def itemChange(self, change, value):
         """
         Handle item changes.
@@ -205,6 +259,35 @@ class ScopeBlobItem(QGraphicsPathItem):
         # Show menu
         menu.exec_(event.screenPos())
     
+    def get_color(self):
+        """
+        Get the color of the blob.
+        
+        Returns:
+            QColor: The color of the blob
+        """
+        return self.blob.color
+    
+    def set_color(self, color):
+        """
+        Set the color of the blob.
+        
+        An opaque color keeps the blob's current transparency.
+        
+        Args:
+            color (QColor): The new color
+        """
+        color = QColor(color)
+        if color.alpha() == 255:
+            color.setAlpha(self.blob.color.alpha())
+        self.blob.color = color
+        self.diagram_scene.diagram.record_change('blobs', self.blob)
+        self.setBrush(QBrush(color.lighter(150)))
+        self.normal_pen = QPen(color, 2)
+        self.hover_pen = QPen(color, 3)
+        self.selected_pen = QPen(color, 3, Qt.DashLine)
+        self.setPen(self.isSelected() and self.selected_pen or self.normal_pen)
+    
     def show_color_dialog(self):
         """
         Show color dialog for changing blob color.
@@ -219,4 +302,4 @@ class ScopeBlobItem(QGraphicsPathItem):
         """
         Delete this blob.
         """
-        self.diagram_scene.delete_blob(self.blob)
+        self.diagram_scene.delete_blob(self)
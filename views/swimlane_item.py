@@ -3,11 +3,14 @@ SwimlaneItem class for visual representation of swimlanes.
 """
 
 import math
-from PyQt5.QtWidgets import QGraphicsLineItem, QGraphicsTextItem, QGraphicsItem, QGraphicsRectItem
+from PyQt5.QtWidgets import QGraphicsLineItem, QGraphicsItem, QGraphicsRectItem, QStyle
 from PyQt5.QtCore import Qt, QPointF
 from PyQt5.QtGui import QPen, QColor, QFont, QBrush
 
+from commands.swimlane_commands import RotateSwimlaneCommand, ResizeSwimlaneCommand
 from utils.geometry import calculate_point_on_line
+from views.label_item import LabelItem
+from views.level_of_detail import reduced_level_of_detail, below
 
 
 class ResizeHandle(QGraphicsRectItem):
@@ -18,6 +21,8 @@ class ResizeHandle(QGraphicsRectItem):
         parent_item (SwimlaneItem): The parent swimlane item
         dragging (bool): Whether the handle is being dragged
         start_pos (QPointF): Starting position for drag operations
+        drag_pos (QPointF): Latest mouse position, applied by apply_drag
+        drag_geometry (tuple): Swimlane (angle, length) after the last applied drag step
     """
     
     def __init__(self, parent=None):
@@ -37,6 +42,8 @@ class ResizeHandle(QGraphicsRectItem):
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)
         self.dragging = False
         self.start_pos = None
+        self.drag_pos = None
+        self.drag_geometry = None
     
     def hoverEnterEvent(self, event):
         """
@@ -69,6 +76,16 @@ class ResizeHandle(QGraphicsRectItem):
             self.dragging = True
             self.start_pos = event.pos()
             self.setCursor(Qt.ClosedHandCursor)
+            
+            # The whole drag becomes one undo entry
+            scene = self.parent_item.diagram_scene
+            self.drag_geometry = self.parent_item.geometry()
+            scene.begin_transaction("Resize Swimlane")
+            # Labels are placed properly once, when the drag ends
+            scene.label_layout.begin_drag()
+            # The outcomes and their labels move with the line every frame
+            outcomes = scene.diagram.get_outcomes_for_swimlane(self.parent_item.swimlane.id)
+            scene.begin_animation(2 * len(outcomes) + 3)
             event.accept()
         else:
             super().mousePressEvent(event)
@@ -81,8 +98,16 @@ class ResizeHandle(QGraphicsRectItem):
             event: The mouse event
         """
         if event.button() == Qt.LeftButton and self.dragging:
+            # Apply the last position before the drag ends
+            scene = self.parent_item.diagram_scene
+            scene.update_coalescer.flush(self)
+            scene.label_layout.end_drag()
+            scene.commit_transaction()
+            scene.end_animation()
             self.dragging = False
             self.start_pos = None
+            self.drag_pos = None
+            self.drag_geometry = None
             self.setCursor(Qt.CrossCursor)
             event.accept()
         else:
@@ -98,8 +123,19 @@ class ResizeHandle(QGraphicsRectItem):
         if not self.dragging:
             return super().mouseMoveEvent(event)
         
-        # Get scene position of mouse
-        scene_pos = event.scenePos()
+        # Only the latest position matters; it is applied once per frame
+        self.drag_pos = event.scenePos()
+        self.parent_item.diagram_scene.update_coalescer.schedule(self, self.apply_drag)
+        event.accept()
+    
+    def apply_drag(self):
+        """
+        Move the end of the swimlane to the latest drag position, and update
+        its label, model and outcomes.
+        """
+        if self.drag_pos is None:
+            return
+        scene_pos = self.drag_pos
         
         # Get center of swimlane (should be fixed)
         center = self.parent_item.line().p1()
@@ -126,12 +162,14 @@ class ResizeHandle(QGraphicsRectItem):
         self.parent_item.update_model()
         
         # Update outcomes on this swimlane
-        for outcome in self.parent_item.swimlane.outcomes:
-            outcome.calculate_position()
-            if hasattr(outcome, 'item') and outcome.item:
-                outcome.item.setPos(outcome.position - QPointF(5, 5))
-        
-        event.accept()
+        self.parent_item.move_outcomes()
+        
+        # Record the step; steps of one drag merge into one undo entry
+        geometry = self.parent_item.geometry()
+        if self.drag_geometry is not None and geometry != self.drag_geometry:
+            self.parent_item.diagram_scene.record(
+                ResizeSwimlaneCommand(self.parent_item, self.drag_geometry, geometry))
+            self.drag_geometry = geometry
 
 
 class SwimlaneItem(QGraphicsLineItem):
@@ -144,12 +182,14 @@ class SwimlaneItem(QGraphicsLineItem):
         normal_pen (QPen): Pen for normal state
         hover_pen (QPen): Pen for hover state
         selected_pen (QPen): Pen for selected state
-        label_item (QGraphicsTextItem): Text item for the label
+        label_item (LabelItem): Text item for the label
         is_resizing (bool): Whether the swimlane is being resized
         is_rotating (bool): Whether the swimlane is being rotated
         start_pos (QPointF): Starting position for drag operations
         start_angle (float): Starting angle for rotation operations
         start_length (float): Starting length for resize operations
+        drag_pos (QPointF): Latest mouse position, applied by apply_drag
+        drag_geometry (tuple): Swimlane (angle, length) after the last applied drag step
         resize_handle (ResizeHandle): The resize handle
     """
     
@@ -185,8 +225,7 @@ class SwimlaneItem(QGraphicsLineItem):
         self.setAcceptHoverEvents(True)
         
         # Add label
-        self.label_item = QGraphicsTextItem(swimlane.label)
-        self.label_item.setFont(QFont("Arial", 10))
+        self.label_item = LabelItem(swimlane.label, font=QFont("Arial", 10))
         self.label_item.setDefaultTextColor(swimlane.color)
         
         # Position label at the end of the line
@@ -207,6 +246,8 @@ class SwimlaneItem(QGraphicsLineItem):
         self.start_pos = None
         self.start_angle = None
         self.start_length = None
+        self.drag_pos = None
+        self.drag_geometry = None
     
     def update_label_position(self):
         """
@@ -219,10 +260,11 @@ class SwimlaneItem(QGraphicsLineItem):
         label_x = line.p2().x() + offset * math.cos(angle_rad)
         label_y = line.p2().y() + offset * math.sin(angle_rad)
         
-        # Center the label on the point
+        # Center the label on the point; outcome labels keep clear of it
         label_width = self.label_item.boundingRect().width()
         label_height = self.label_item.boundingRect().height()
-        self.label_item.setPos(label_x - label_width / 2, label_y - label_height / 2)
+        position = QPointF(label_x - label_width / 2, label_y - label_height / 2)
+        self.diagram_scene.label_layout.place(self.label_item, [position])
     
     def get_color(self):
         """
@@ -246,6 +288,7 @@ class SwimlaneItem(QGraphicsLineItem):
         self.selected_pen = QPen(color, 3, Qt.DashLine)
         self.setPen(self.isSelected() and self.selected_pen or self.normal_pen)
         self.label_item.setDefaultTextColor(color)
+        self.diagram_scene.swimlane_changed(self.swimlane)
     
     def update_model(self):
         """
@@ -257,6 +300,47 @@ class SwimlaneItem(QGraphicsLineItem):
         dy = line.p2().y() - line.p1().y()
         angle_rad = math.atan2(dy, dx)
         self.swimlane.angle = math.degrees(angle_rad) % 360
+        # Keep the stored length when only the angle changed, rather than
+        # the length recomputed from the rotated end point
+        length = math.sqrt(dx * dx + dy * dy)
+        if abs(length - self.swimlane.length) > 1e-6:
+            self.swimlane.length = length
+        self.diagram_scene.radial_index.update_swimlane(self.swimlane)
+        self.diagram_scene.swimlane_changed(self.swimlane)
+    
+    def geometry(self):
+        """
+        Get the swimlane's angle and length.
+        
+        Returns:
+            tuple: (angle in degrees, length)
+        """
+        return (self.swimlane.angle, self.swimlane.length)
+    
+    def set_geometry(self, angle, length=None):
+        """
+        Set the swimlane's angle and length, and move its line, label and
+        outcomes to match.
+        
+        Args:
+            angle (float): Angle in degrees
+            length (float, optional): Length. Defaults to keeping the current length.
+        """
+        self.swimlane.angle = angle % 360
+        if length is not None:
+            self.swimlane.length = length
+        self.update_line_and_label()
+        self.diagram_scene.radial_index.update_swimlane(self.swimlane)
+        self.move_outcomes()
+    
+    def move_outcomes(self):
+        """
+        Move the outcomes on this swimlane onto its current line.
+        """
+        with self.diagram_scene.label_layout.batch():
+            for outcome in self.diagram_scene.diagram.get_outcomes_for_swimlane(self.swimlane.id):
+                if getattr(outcome, 'item', None):
+                    outcome.item.follow_swimlane(self.swimlane)
     
     def mousePressEvent(self, event):
         """
@@ -289,11 +373,22 @@ class SwimlaneItem(QGraphicsLineItem):
             else:
                 # Otherwise, start rotating
                 self.is_rotating = True
-                # Calculate current angle
+                # Calculate current angle; the length is kept while rotating
                 dx = line.p2().x() - line.p1().x()
                 dy = line.p2().y() - line.p1().y()
+                self.start_length = math.sqrt(dx*dx + dy*dy)
                 self.start_angle = math.atan2(dy, dx)
             
+            # The whole drag becomes one undo entry
+            self.drag_geometry = self.geometry()
+            self.diagram_scene.begin_transaction(self.is_resizing and "Resize Swimlane" or "Rotate Swimlane")
+            # Labels are placed properly once, when the drag ends
+            self.diagram_scene.label_layout.begin_drag()
+            if self.is_rotating:
+                # The outcomes and their labels turn with the line every frame
+                outcomes = self.diagram_scene.diagram.get_outcomes_for_swimlane(self.swimlane.id)
+                self.diagram_scene.begin_animation(2 * len(outcomes) + 2)
+            
             # Accept the event
             event.accept()
             
@@ -309,14 +404,32 @@ class SwimlaneItem(QGraphicsLineItem):
         Args:
             event (QGraphicsSceneMouseEvent): The mouse event
         """
-        if self.is_resizing and self.start_pos is not None and self.start_angle is not None and self.start_length is not None:
+        if (self.is_resizing or self.is_rotating) and self.start_pos is not None:
+            # Only the latest position matters; it is applied once per frame
+            self.drag_pos = event.pos()
+            self.diagram_scene.update_coalescer.schedule(self, self.apply_drag)
+            event.accept()
+        else:
+            # Don't allow moving the entire swimlane
+            # Only allow resizing and rotating from the end
+            event.ignore()
+    
+    def apply_drag(self):
+        """
+        Resize or rotate the line to the latest drag position, and update its
+        label and model.
+        """
+        if self.drag_pos is None:
+            return
+        
+        if self.is_resizing and self.start_angle is not None and self.start_length is not None:
             # Get line endpoints
             line = self.line()
             center = QPointF(line.p1())
             
             # Calculate vector from center to current mouse position
-            dx = event.pos().x() - center.x()
-            dy = event.pos().y() - center.y()
+            dx = self.drag_pos.x() - center.x()
+            dy = self.drag_pos.y() - center.y()
             
             # Calculate new length while maintaining angle
             new_length = math.sqrt(dx*dx + dy*dy)
@@ -333,16 +446,19 @@ class SwimlaneItem(QGraphicsLineItem):
             # Update model
             self.update_model()
             
-            # Accept the event
-            event.accept()
-        elif self.is_rotating and self.start_pos is not None and self.start_length is not None:
+            # Record the step; steps of one drag merge into one undo entry
+            geometry = self.geometry()
+            if self.drag_geometry is not None and geometry != self.drag_geometry:
+                self.diagram_scene.record(ResizeSwimlaneCommand(self, self.drag_geometry, geometry))
+                self.drag_geometry = geometry
+        elif self.is_rotating and self.start_length is not None:
             # Get line endpoints
             line = self.line()
             center = QPointF(line.p1())
             
             # Calculate vector from center to current mouse position
-            dx = event.pos().x() - center.x()
-            dy = event.pos().y() - center.y()
+            dx = self.drag_pos.x() - center.x()
+            dy = self.drag_pos.y() - center.y()
             
             # Calculate new angle
             new_angle = math.atan2(dy, dx)
@@ -357,12 +473,15 @@ class SwimlaneItem(QGraphicsLineItem):
             # Update model
             self.update_model()
             
-            # Accept the event
-            event.accept()
-        else:
-            # Don't allow moving the entire swimlane
-            # Only allow resizing and rotating from the end
-            event.ignore()
+            # Outcomes turn with the swimlane
+            self.move_outcomes()
+            
+            # Record the step; steps of one drag merge into one undo entry
+            geometry = self.geometry()
+            if self.drag_geometry is not None and geometry != self.drag_geometry:
+                self.diagram_scene.record(
+                    RotateSwimlaneCommand(self, self.drag_geometry[0], geometry[0]))
+                self.drag_geometry = geometry
     
     def mouseReleaseEvent(self, event):
         """
@@ -372,12 +491,21 @@ class SwimlaneItem(QGraphicsLineItem):
             event (QGraphicsSceneMouseEvent): The mouse event
         """
         if event.button() == Qt.LeftButton and (self.is_resizing or self.is_rotating):
+            # Apply the last position before the drag ends
+            self.diagram_scene.update_coalescer.flush(self)
+            self.diagram_scene.label_layout.end_drag()
+            self.diagram_scene.commit_transaction()
+            if self.is_rotating:
+                self.diagram_scene.end_animation()
+            
             # Reset state
             self.is_resizing = False
             self.is_rotating = False
             self.start_pos = None
             self.start_angle = None
             self.start_length = None
+            self.drag_pos = None
+            self.drag_geometry = None
             
             # Accept the event
             event.accept()
@@ -385,6 +513,37 @@ class SwimlaneItem(QGraphicsLineItem):
         # Call parent method
         super().mouseReleaseEvent(event)
     
+    def in_background(self):
+        """
+        Check whether the line is drawn by the scene's cached background
+        rather than by this item.
+        
+        Returns:
+            bool: True unless the swimlane is selected
+        """
+        return not self.isSelected()
+    
+    def paint(self, painter, option, widget=None):
+        """
+        Paint the line, with a 1 pixel pen when zoomed far out.
+        
+        While the swimlane is in the background layer only the hover
+        highlight is painted here.
+        
+        Args:
+            painter (QPainter): The painter
+            option (QStyleOptionGraphicsItem): The paint option
+            widget (QWidget, optional): The widget being painted on
+        """
+        if self.in_background() and not option.state & QStyle.State_MouseOver:
+            return
+        lod = reduced_level_of_detail(option, painter)
+        if lod is not None and below('swimlane_thin', lod):
+            painter.setPen(QPen(self.pen().color(), 0))
+            painter.drawLine(self.line())
+            return
+        super().paint(painter, option, widget)
+    
     def itemChange(self, change, value):
         """
         Handle item changes.
@@ -401,6 +560,9 @@ class SwimlaneItem(QGraphicsLineItem):
             self.setPen(value and self.selected_pen or self.normal_pen)
             # Show/hide resize handle based on selection state
             self.resize_handle.setVisible(bool(value))
+        elif change == QGraphicsItem.ItemSelectedHasChanged and self.scene():
+            # The line moves between the background layer and this item
+            self.diagram_scene.invalidate_background()
         
         return super().itemChange(change, value)
     
@@ -469,6 +631,7 @@ class SwimlaneItem(QGraphicsLineItem):
         text, ok = QInputDialog.getText(None, "Edit Label", "Label:", text=self.swimlane.label)
         if ok and text:
             self.swimlane.label = text
+            self.diagram_scene.diagram.record_change('swimlanes', self.swimlane)
             self.label_item.setPlainText(text)
             self.update_label_position()
 
@@ -490,6 +653,7 @@ class SwimlaneItem(QGraphicsLineItem):
         
         # Update line
         self.setLine(center.x(), center.y(), end_point.x(), end_point.y())
+        self.diagram_scene.swimlane_changed(self.swimlane)
         
         # Update label position
         self.update_label_position()
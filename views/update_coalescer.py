@@ -0,0 +1,113 @@
+"""
+UpdateCoalescer class: runs pending geometry updates once per event-loop pass.
+"""
+
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class UpdateCoalescer(QObject):
+    """
+    Collects pending updates and applies each one once per frame.
+    
+    Mouse move events can arrive much faster than the view repaints. Instead
+    of recomputing geometry on every event, an item schedules an update under
+    a key (usually itself); further events for the same key before the update
+    runs only replace the pending callback. A zero-timeout timer runs all
+    pending updates once the events already queued have been handled, which
+    is before the next repaint.
+    
+    Attributes:
+        pending (OrderedDict): key -> callback, in the order first scheduled
+        events (int): Number of updates scheduled
+        passes (int): Number of updates actually run
+        flushes (int): Number of times the pending updates were run
+    """
+    
+    def __init__(self, parent=None):
+        """
+        Initialize a new UpdateCoalescer.
+        
+        Args:
+            parent (QObject, optional): Parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self.pending = OrderedDict()
+        self.events = 0
+        self.passes = 0
+        self.flushes = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+    
+    def schedule(self, key, callback):
+        """
+        Run callback on the next pass, replacing any update pending for key.
+        
+        Args:
+            key: Hashable key, e.g. the item being dragged
+            callback (callable): Function to call without arguments
+        """
+        self.events += 1
+        self.pending[key] = callback
+        if not self._timer.isActive():
+            self._timer.start()
+    
+    def cancel(self, key):
+        """
+        Drop the update pending for key, if any.
+        
+        Args:
+            key: The key the update was scheduled under
+        """
+        self.pending.pop(key, None)
+    
+    def flush(self, key=None):
+        """
+        Run pending updates now.
+        
+        Args:
+            key (optional): Only run the update pending for this key. Defaults
+                to running all of them.
+        """
+        if key is not None:
+            callback = self.pending.pop(key, None)
+            callbacks = [callback] if callback is not None else []
+        else:
+            callbacks = list(self.pending.values())
+            self.pending.clear()
+            self._timer.stop()
+        if not callbacks:
+            return
+        
+        self.flushes += 1
+        for callback in callbacks:
+            self.passes += 1
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error running coalesced update: {str(e)}")
+    
+    def stats(self):
+        """
+        Get the number of updates scheduled versus run.
+        
+        Returns:
+            dict: events, passes, flushes and the ratio of events to passes
+        """
+        return {
+            'events': self.events,
+            'passes': self.passes,
+            'flushes': self.flushes,
+            'ratio': self.events / self.passes if self.passes else 0.0,
+        }
+    
+    def reset_stats(self):
+        """
+        Reset the event and pass counts.
+        """
+        self.events = 0
+        self.passes = 0
+        self.flushes = 0